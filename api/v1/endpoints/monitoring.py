@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from core.email_outbox import email_outbox
+from core.oauth2 import require_admin
+from dependencies.database_redis import get_redis_pool_stats
+from dependencies.pool_monitor import get_pool_stats
+from dependencies.query_monitor import get_query_stats
+from dependencies.session import replica_router
+from repositories.base.query_builder import get_query_builder_stats
+
+# Internal pool, replica, query and queue statistics: admins only (/health stays public)
+router = APIRouter(prefix="/monitoring", dependencies=[Depends(require_admin)])
+
+
+@router.get("/redis-pool", status_code=status.HTTP_200_OK)
+async def redis_pool_stats():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=get_redis_pool_stats())
+
+
+@router.get("/db-replicas", status_code=status.HTTP_200_OK)
+async def db_replicas_health():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=replica_router.get_health())
+
+
+@router.get("/db-pool", status_code=status.HTTP_200_OK)
+async def db_pool_stats():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=get_pool_stats())
+
+
+@router.get("/db-queries", status_code=status.HTTP_200_OK)
+async def db_query_stats():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=get_query_stats())
+
+
+@router.get("/query-builder", status_code=status.HTTP_200_OK)
+async def query_builder_stats():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=get_query_builder_stats())
+
+
+@router.get("/email-outbox", status_code=status.HTTP_200_OK)
+async def email_outbox_stats():
+    return JSONResponse(status_code=status.HTTP_200_OK, content=await email_outbox.get_stats())
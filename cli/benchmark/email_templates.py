@@ -0,0 +1,65 @@
+"""
+Renders/sec of every email template, before/after precompilation (utils/email_template_manager.py).
+
+Variants:
+    lookup     `env.get_template` + render on every send (previous behaviour)
+    compiled   precompiled template (`render_template`)
+    async      `render_template_async` from the event loop (thread hop for large templates)
+    fragment   `render_fragment` with a fixed context (LRU hit)
+
+Usage (from the project root):
+    python -m cli.benchmark.email_templates --number 2000
+    python -m cli.benchmark.email_templates --template verification.html
+"""
+
+import argparse
+import asyncio
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from jinja2 import Environment
+
+from utils.email_template_manager import TEMPLATE_EXTENSIONS, EmailTemplateManager
+
+CONTEXT = {
+    "display_name": "Nguyễn Văn A",
+    "phone_number": "+84 912 345 678",
+    "code_number": "123456",
+    "email": "user@example.com",
+    "base_frontend_url": "https://example.com",
+}
+
+
+def make_variants(manager: EmailTemplateManager, template_name: str) -> Dict[str, Callable[[], Any]]:
+    # Environment of the previous manager (default `auto_reload`: stat the file on every lookup)
+    legacy_env = Environment(loader=manager.env.loader, autoescape=True)
+    loop = asyncio.new_event_loop()
+    return {
+        "lookup": lambda: legacy_env.get_template(template_name).render(**CONTEXT),
+        "compiled": lambda: manager.render_template(template_name, **CONTEXT),
+        "async": lambda: loop.run_until_complete(
+            manager.render_template_async(template_name, **CONTEXT)
+        ),
+        "fragment": lambda: manager.render_fragment(template_name, **CONTEXT),
+    }
+
+
+def main(number: int, template: Optional[str]) -> None:
+    manager = EmailTemplateManager()
+    template_names: List[str] = (
+        [template] if template else manager.env.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    )
+
+    print(f"{'template':<24} {'variant':<10} {'renders/s':>12} {'µs/render':>10}")
+    for template_name in template_names:
+        for variant, fn in make_variants(manager, template_name).items():
+            seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+            print(f"{template_name:<24} {variant:<10} {1 / seconds:>12,.0f} {seconds * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="Renders per measurement")
+    parser.add_argument("--template", help="Benchmark one template only (default: all)")
+    args = parser.parse_args()
+    main(args.number, args.template)
@@ -0,0 +1,107 @@
+"""
+Per-request latency spent in logging, before/after the queue-based pipeline (utils/logger.py).
+
+Pipelines:
+    sync     colorized StreamHandler called inline at DEBUG (previous `setup_logger`)
+    queue    NonBlockingQueueHandler + QueueListener thread, colorized
+    json     queue pipeline with compact JSON lines (production format)
+    sampled  json with INFO lines sampled (--sample-rate)
+
+Each simulated request is a coroutine logging --lines INFO lines (the auth and service logs
+of a typical request); the console is replaced by a sink taking --write-latency-us per write
+(a busy terminal / container log driver).
+
+Usage (from the project root):
+    python -m cli.benchmark.logging_pipeline --requests 2000 --lines 5 --write-latency-us 50
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import queue
+import statistics
+import time
+from logging.handlers import QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import JSONLineFormatter, NonBlockingQueueHandler, SamplingFilter, _build_formatter
+
+
+class SlowSink(io.TextIOBase):
+    """Discards writes after blocking `latency` seconds (releasing the GIL, like a real write)."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return len(text)
+
+
+def build_logger(
+    pipeline: str, sink: SlowSink, sample_rate: float
+) -> Tuple[logging.Logger, Optional[QueueListener]]:
+    logger = logging.getLogger(f"benchmark.{pipeline}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+
+    stream_handler = logging.StreamHandler(sink)
+    stream_handler.setFormatter(
+        JSONLineFormatter() if pipeline in ("json", "sampled") else _build_formatter("color")
+    )
+    if pipeline == "sync":
+        logger.addHandler(stream_handler)
+        return logger, None
+
+    log_queue: queue.Queue = queue.Queue(maxsize=100000)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if pipeline == "sampled":
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+    logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return logger, listener
+
+
+async def handle_request(logger: logging.Logger, lines: int, user: Dict[str, str]) -> None:
+    for i in range(lines):
+        logger.info("Handled step %d for user %s", i, user["id"])
+        await asyncio.sleep(0)
+
+
+async def run(pipeline: str, requests: int, lines: int, sink: SlowSink, sample_rate: float) -> List[float]:
+    logger, listener = build_logger(pipeline, sink, sample_rate)
+    user = {"id": "7f1c2b1e-4d7a-4a8e-9a7e-0b8f7c3d2e1a"}
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await handle_request(logger, lines, user)
+        latencies.append(time.perf_counter() - start)
+    if listener is not None:
+        listener.stop()
+    return latencies
+
+
+def main(requests: int, lines: int, write_latency_us: float, sample_rate: float) -> None:
+    sink = SlowSink(write_latency_us / 1e6)
+    print(f"{'pipeline':<8} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for pipeline in ("sync", "queue", "json", "sampled"):
+        latencies = sorted(asyncio.run(run(pipeline, requests, lines, sink, sample_rate)))
+        print(
+            f"{pipeline:<8} {statistics.mean(latencies) * 1e6:>9.1f} "
+            f"{latencies[len(latencies) // 2] * 1e6:>9.1f} "
+            f"{latencies[int(len(latencies) * 0.99)] * 1e6:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Simulated requests")
+    parser.add_argument("--lines", type=int, default=5, help="INFO lines per request")
+    parser.add_argument("--write-latency-us", type=float, default=50, help="Cost of one console write")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="INFO share kept by `sampled`")
+    args = parser.parse_args()
+    main(args.requests, args.lines, args.write_latency_us, args.sample_rate)
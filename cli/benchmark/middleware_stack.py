@@ -0,0 +1,144 @@
+"""
+Compare the middleware stacks in-process (no network, no server).
+
+Stacks (built explicitly, in the order of `main.configure_middleware`, without the optional
+query counter and request timing middlewares):
+    legacy  CORS + Starlette SessionMiddleware + GZip + BaseHTTPMiddleware auth session check
+    asgi    CORS + LazySessionMiddleware + GZip + pure ASGI AuthSessionMiddleware
+    bare    CORS + GZip only (lower bound)
+
+Endpoints:
+    health     public route: the auth session check is skipped
+    protected  route outside the public prefixes: the auth session check runs, for the user
+               seeded in `request.state.user_id` by an outer middleware (as the upstream
+               authentication does). Needs the Redis of REDIS_URL (session activity).
+
+Usage (from the project root):
+    python -m cli.benchmark.middleware_stack --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.env import env
+from middleware.auth_session_middleware import AuthSessionMiddleware, check_auth_session_middleware
+from middleware.cookie_session_middleware import LazySessionMiddleware
+from middleware.cors_middleware import add_cors_middleware
+
+ENDPOINTS = {
+    "health": ("GET", "/api/v1/health"),
+    "protected": ("GET", "/api/v1/benchmark/protected"),
+}
+
+
+class SeedUserMiddleware:
+    """Sets `request.state.user_id`, as the upstream authentication does."""
+
+    def __init__(self, app: ASGIApp, user_id: str):
+        self.app = app
+        self.user_id = user_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["user_id"] = self.user_id
+        await self.app(scope, receive, send)
+
+
+def build_app(stack: str, user_id: str) -> FastAPI:
+    app = FastAPI()
+    add_cors_middleware(app)
+    if stack == "legacy":
+        app.add_middleware(SessionMiddleware, secret_key=env.JWT_SECRET_KEY)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.middleware("http")(check_auth_session_middleware)
+    elif stack == "asgi":
+        app.add_middleware(LazySessionMiddleware, secret_key=env.JWT_SECRET_KEY)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.add_middleware(AuthSessionMiddleware)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Outermost: the user is known before the auth session check runs
+    app.add_middleware(SeedUserMiddleware, user_id=user_id)
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/benchmark/protected")
+    async def protected():
+        return {"user_id": user_id}
+
+    return app
+
+
+async def run(
+    app: FastAPI,
+    method: str,
+    path: str,
+    total: int,
+    concurrency: int,
+    headers: Dict[str, str],
+) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = total
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing, dependency resolution and lazy imports
+        for _ in range(min(50, total)):
+            await client.request(method, path, headers=headers)
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.request(method, path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "status": ",".join(f"{code}x{count}" for code, count in sorted(statuses.items())),
+    }
+
+
+async def main(total: int, concurrency: int, stacks: List[str], user_id: str):
+    print(f"{'stack':<8} {'endpoint':<10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}  status")
+    for name, (method, path) in ENDPOINTS.items():
+        for stack in stacks:
+            result = await run(build_app(stack, user_id), method, path, total, concurrency, {})
+            print(
+                f"{stack:<8} {name:<10} {result['rps']:>10.0f} {result['p50_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f}  {result['status']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stacks", nargs="+", default=["legacy", "asgi", "bare"])
+    parser.add_argument(
+        "--user-id", default=str(uuid.uuid4()), help="User seeded for the protected endpoint"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.stacks, args.user_id))
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of `query_builder` (repositories/base/query_builder.py): statement build
+time before/after memoizing the key -> column/operator resolution of filter keys.
+
+Cases:
+    resolve   key -> column/operator resolution alone ("display_name__ilike")
+    eq        one equality filter
+    complex   AND of range, like, in and null filters with an OR group and an order_by
+    include   eq filter with a selectinload include
+
+"before" resolves every key again (`_resolve_column.__wrapped__`), "after" uses the memo.
+Building the SQLAlchemy expressions dominates a full build, so the end-to-end gain is small;
+SQL compilation itself is cached by SQLAlchemy on the statement structure.
+
+Usage (from the project root):
+    python -m cli.benchmark.query_builder --number 5000
+"""
+
+import argparse
+import timeit
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from databases.users import Users
+from repositories.base import query_builder as query_builder_module
+from repositories.base.query_builder import query_builder
+
+CASES: Dict[str, Dict[str, Any]] = {
+    "eq": {"filter": {"email": "user@example.com"}},
+    "complex": {
+        "filter": {
+            "created_at__gte": "2024-01-01",
+            "display_name__ilike": "nguyen",
+            "email__in": ["a@example.com", "b@example.com", "c@example.com"],
+            "deleted_at__isnull": True,
+            "0": [{"is_verified": True}, {"phone_number__like": "+84"}],
+        },
+        "order_by": "-created_at,email",
+    },
+    "include": {"filter": {"email": "user@example.com"}, "include": "user_sessions"},
+}
+
+
+@contextmanager
+def unmemoized() -> Iterator[None]:
+    """Resolve filter keys on every call, as before the memo (the baseline)."""
+    memoized = query_builder_module._resolve_column
+    query_builder_module._resolve_column = memoized.__wrapped__
+    try:
+        yield
+    finally:
+        query_builder_module._resolve_column = memoized
+
+
+def measure(kwargs: Dict[str, Any], number: int) -> float:
+    build = lambda: query_builder(Users, **kwargs)  # noqa: E731
+    return min(timeit.repeat(build, number=number, repeat=5)) / number
+
+
+def main(number: int) -> None:
+    print(f"{'case':<10} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    resolve = query_builder_module._resolve_column
+    before = min(timeit.repeat(lambda: resolve.__wrapped__(Users, "display_name__ilike"), number=number, repeat=5))
+    after = min(timeit.repeat(lambda: resolve(Users, "display_name__ilike"), number=number, repeat=5))
+    print(f"{'resolve':<10} {before / number * 1e6:>10.2f} {after / number * 1e6:>10.2f} {before / after:>7.2f}x")
+    for name, kwargs in CASES.items():
+        with unmemoized():
+            statement = str(query_builder(Users, **kwargs))
+            before = measure(kwargs, number)
+        # Same SQL either way
+        assert str(query_builder(Users, **kwargs)) == statement
+        after = measure(kwargs, number)
+        print(f"{name:<10} {before * 1e6:>10.1f} {after * 1e6:>10.1f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000, help="Builds per measurement")
+    args = parser.parse_args()
+    main(args.number)
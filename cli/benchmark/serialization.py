@@ -0,0 +1,130 @@
+"""
+Micro-benchmarks of the JSON paths before/after the serializer layer (utils/serializer.py).
+
+Cases:
+    render    JSONResponse render of encoded content        vs  FastJSONResponse render
+    response  JSONResponse(jsonable_encoder(content))       vs  FastJSONResponse(content), as
+              returned directly by an endpoint (no jsonable_encoder pre-walk)
+    cache     _convert_uuids_to_strings + json.dumps/loads  vs  serializer.dumps/loads
+    log       UTF8JSONFormatter json round-trip (indent=2)  vs  serializer-backed formatter
+
+Usage (from the project root):
+    python -m cli.benchmark.serialization --rows 100 --number 2000
+"""
+
+import argparse
+import json
+import logging
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils import serializer
+from utils.logger import UTF8JSONFormatter
+from utils.serializer import FastJSONResponse
+
+
+def convert_uuids_to_strings(data: Dict) -> Dict:
+    """Previous `CacheCRUDBase._convert_uuids_to_strings`, kept here as the baseline."""
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, uuid.UUID):
+            result[key] = str(value)
+        elif isinstance(value, dict):
+            result[key] = convert_uuids_to_strings(value)
+        elif isinstance(value, list):
+            result[key] = [
+                convert_uuids_to_strings(item) if isinstance(item, dict)
+                else str(item) if isinstance(item, uuid.UUID)
+                else item
+                for item in value
+            ]
+        else:
+            result[key] = value
+    return result
+
+
+class StdlibUTF8JSONFormatter(logging.Formatter):
+    """Previous `UTF8JSONFormatter`, kept here as the baseline."""
+
+    def format(self, record):
+        if isinstance(record.msg, dict):
+            record.msg = json.dumps(record.msg, ensure_ascii=False)
+        elif isinstance(record.msg, str):
+            try:
+                record.msg = json.dumps(json.loads(record.msg), ensure_ascii=False, indent=2)
+            except json.JSONDecodeError:
+                pass
+        return super().format(record)
+
+
+def make_user(i: int) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "email": f"user{i}@example.com",
+        "full_name": f"Nguyễn Văn {i}",
+        "is_active": i % 2 == 0,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "role": {"id": uuid.uuid4(), "name": "admin", "permissions": [uuid.uuid4() for _ in range(5)]},
+    }
+
+
+def make_cases(rows: int) -> Dict[str, Dict[str, Callable[[], Any]]]:
+    users: List[Dict[str, Any]] = [make_user(i) for i in range(rows)]
+    page = {"items": users, "total": rows, "page": 1, "page_size": rows}
+    encoded = jsonable_encoder(page)
+    cached = json.dumps(convert_uuids_to_strings(page))
+    log_json = json.dumps(convert_uuids_to_strings(users[0]))
+    log_text = "Making GET request to: https://graph.facebook.com/v19.0/me"
+
+    def log_record(msg):
+        return logging.LogRecord("bench", logging.INFO, __file__, 1, msg, None, None)
+
+    before_formatter, after_formatter = StdlibUTF8JSONFormatter(), UTF8JSONFormatter()
+
+    return {
+        "render": {
+            "before": lambda: JSONResponse(encoded).body,
+            "after": lambda: FastJSONResponse(encoded).body,
+        },
+        "response": {
+            "before": lambda: JSONResponse(jsonable_encoder(page)).body,
+            "after": lambda: FastJSONResponse(page).body,
+        },
+        "cache set": {
+            "before": lambda: json.dumps(convert_uuids_to_strings(page)),
+            "after": lambda: serializer.dumps(page),
+        },
+        "cache get": {
+            "before": lambda: json.loads(cached),
+            "after": lambda: serializer.loads(cached),
+        },
+        "log json": {
+            "before": lambda: before_formatter.format(log_record(log_json)),
+            "after": lambda: after_formatter.format(log_record(log_json)),
+        },
+        "log text": {
+            "before": lambda: before_formatter.format(log_record(log_text)),
+            "after": lambda: after_formatter.format(log_record(log_text)),
+        },
+    }
+
+
+def main(rows: int, number: int) -> None:
+    print(f"{'case':<10} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for name, variants in make_cases(rows).items():
+        before = min(timeit.repeat(variants["before"], number=number, repeat=3)) / number
+        after = min(timeit.repeat(variants["after"], number=number, repeat=3)) / number
+        print(f"{name:<10} {before * 1e6:>10.1f} {after * 1e6:>10.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="Users per payload")
+    parser.add_argument("--number", type=int, default=2000, help="Iterations per measurement")
+    args = parser.parse_args()
+    main(args.rows, args.number)
@@ -13,8 +13,61 @@ class Env(BaseSettings):
     ENV: str = os.environ.get("ENV")
     API_V1_STR: str = os.environ.get("API_V1_STR")
 
+    # Logging: level and format ("color" or compact one-line "json") default per ENV, and the
+    # share of INFO/DEBUG lines kept (WARNING and above are never sampled out)
+    LOG_LEVEL: str = os.environ.get(
+        "LOG_LEVEL", "DEBUG" if os.environ.get("ENV") in ["local", "dev"] else "INFO"
+    ).upper()
+    LOG_FORMAT: str = os.environ.get(
+        "LOG_FORMAT", "color" if os.environ.get("ENV") in ["local", "dev", "test"] else "json"
+    ).lower()
+    LOG_INFO_SAMPLE_RATE: float = float(os.environ.get("LOG_INFO_SAMPLE_RATE", 1.0))
+    # Records buffered for the log writer thread; beyond it records are dropped, not waited for
+    LOG_QUEUE_SIZE: int = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
     # Redis configuration
     REDIS_URL: str = os.environ.get("REDIS_URL")
+    REDIS_MAX_CONNECTIONS: int = int(os.environ.get("REDIS_MAX_CONNECTIONS", 50))
+    REDIS_POOL_TIMEOUT: float = float(os.environ.get("REDIS_POOL_TIMEOUT", 5))
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    REDIS_SOCKET_TIMEOUT: float = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 5))
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = float(os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 5))
+
+    # Auth cache configuration (in-process TTL/LRU in front of Redis)
+    AUTH_CACHE_LOCAL_TTL: int = int(os.environ.get("AUTH_CACHE_LOCAL_TTL", 30))
+    AUTH_CACHE_LOCAL_MAX_SIZE: int = int(os.environ.get("AUTH_CACHE_LOCAL_MAX_SIZE", 10000))
+    AUTH_CACHE_REDIS_TTL: int = int(os.environ.get("AUTH_CACHE_REDIS_TTL", 300))
+
+    # Seconds a cached list count (count strategy "cached") stays valid
+    COUNT_CACHE_TTL: int = int(os.environ.get("COUNT_CACHE_TTL", 30))
+
+    # Read-through ORM cache configuration (CachedORMCRUD), negative entries live shorter
+    ORM_CACHE_TTL: int = int(os.environ.get("ORM_CACHE_TTL", 300))
+    ORM_CACHE_NEGATIVE_TTL: int = int(os.environ.get("ORM_CACHE_NEGATIVE_TTL", 30))
+
+    # Session activity configuration (idle timeout and write-behind of last activity)
+    SESSION_IDLE_TIMEOUT: int = int(os.environ.get("SESSION_IDLE_TIMEOUT", 1800))
+    SESSION_ACTIVITY_TOUCH_INTERVAL: int = int(os.environ.get("SESSION_ACTIVITY_TOUCH_INTERVAL", 60))
+    SESSION_ACTIVITY_FLUSH_INTERVAL: int = int(os.environ.get("SESSION_ACTIVITY_FLUSH_INTERVAL", 5))
+    # Reject requests whose session was never started by `session_activity.start_session` (enable
+    # once sign-in and token refresh seed sessions; otherwise the first request starts it)
+    SESSION_REQUIRE_STARTED: bool = os.environ.get("SESSION_REQUIRE_STARTED", "False").lower() == "true"
+    # Seconds a session is remembered as started after its last activity, so a timed-out session
+    # is rejected instead of started again; keep it above the longest token lifetime
+    SESSION_STARTED_TTL: int = int(os.environ.get("SESSION_STARTED_TTL", 30 * 24 * 3600))
+
+    # Outbound HTTP client configuration (shared pooled client, retries, circuit breaker)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.environ.get("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(os.environ.get("HTTP_CLIENT_KEEPALIVE_EXPIRY", 30))
+    HTTP_CLIENT_TIMEOUT: float = float(os.environ.get("HTTP_CLIENT_TIMEOUT", 10))
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = float(os.environ.get("HTTP_CLIENT_CONNECT_TIMEOUT", 5))
+    HTTP_CLIENT_HTTP2: bool = os.environ.get("HTTP_CLIENT_HTTP2", "False").lower() == "true"
+    HTTP_CLIENT_MAX_RETRIES: int = int(os.environ.get("HTTP_CLIENT_MAX_RETRIES", 2))
+    HTTP_CLIENT_BACKOFF_BASE: float = float(os.environ.get("HTTP_CLIENT_BACKOFF_BASE", 0.2))
+    HTTP_CLIENT_BACKOFF_MAX: float = float(os.environ.get("HTTP_CLIENT_BACKOFF_MAX", 2))
+    HTTP_CLIENT_BREAKER_FAILURE_THRESHOLD: int = int(os.environ.get("HTTP_CLIENT_BREAKER_FAILURE_THRESHOLD", 5))
+    HTTP_CLIENT_BREAKER_RESET_TIMEOUT: float = float(os.environ.get("HTTP_CLIENT_BREAKER_RESET_TIMEOUT", 30))
 
     # Postgres configuration
     POSTGRES_ADOOR_SERVER: str = os.environ.get("POSTGRES_ADOOR_SERVER")
@@ -26,6 +79,44 @@ class Env(BaseSettings):
     # SQL Alchemy configuration
     SQLALCHEMY_ADOOR_URI: Optional[PostgresDsn] = None
 
+    # Async engine pool (API) and lazily created sync engine pool (CLI / scripts)
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    # Liveness policy of pooled connections: "idle" (ping only after DB_LIVENESS_IDLE_THRESHOLD
+    # seconds idle), "always" (pre-ping every checkout) or "never" (error-driven invalidation only)
+    DB_LIVENESS_POLICY: str = os.environ.get("DB_LIVENESS_POLICY", "idle")
+    DB_LIVENESS_IDLE_THRESHOLD: float = float(os.environ.get("DB_LIVENESS_IDLE_THRESHOLD", 30))
+    DB_POOL_WARMUP_CONNECTIONS: int = int(os.environ.get("DB_POOL_WARMUP_CONNECTIONS", 5))
+    DB_SYNC_POOL_SIZE: int = int(os.environ.get("DB_SYNC_POOL_SIZE", 5))
+    DB_SYNC_MAX_OVERFLOW: int = int(os.environ.get("DB_SYNC_MAX_OVERFLOW", 10))
+
+    # Read replicas (comma-separated SQLAlchemy URIs, empty = primary only)
+    SQLALCHEMY_ADOOR_REPLICA_URIS: str = os.environ.get("SQLALCHEMY_ADOOR_REPLICA_URIS", "")
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = float(os.environ.get("DB_REPLICA_HEALTH_CHECK_INTERVAL", 5))
+    DB_READ_YOUR_WRITES_WINDOW: float = float(os.environ.get("DB_READ_YOUR_WRITES_WINDOW", 5))
+
+    # Query instrumentation: statements slower than the threshold are logged; outside production
+    # a sampled share of slow SELECTs is re-run with EXPLAIN ANALYZE (Postgres only)
+    DB_SLOW_QUERY_THRESHOLD_MS: float = float(os.environ.get("DB_SLOW_QUERY_THRESHOLD_MS", 200))
+    DB_SLOW_QUERY_EXPLAIN: bool = os.environ.get("DB_SLOW_QUERY_EXPLAIN", "False").lower() == "true"
+    DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(os.environ.get("DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+
+    # N+1 detection (statements counted per request), on by default in local/dev/test only
+    DB_N_PLUS_ONE_DETECTION: bool = os.environ.get(
+        "DB_N_PLUS_ONE_DETECTION", str(os.environ.get("ENV") in ("local", "dev", "test"))
+    ).lower() == "true"
+    DB_N_PLUS_ONE_THRESHOLD: int = int(os.environ.get("DB_N_PLUS_ONE_THRESHOLD", 5))
+
+    # Request timing (spans sent in the Server-Timing header), on by default in local/dev/test
+    # only; the timing log records requests slower than the threshold
+    REQUEST_TIMING: bool = os.environ.get(
+        "REQUEST_TIMING", str(os.environ.get("ENV") in ("local", "dev", "test"))
+    ).lower() == "true"
+    REQUEST_TIMING_LOG: bool = os.environ.get("REQUEST_TIMING_LOG", "False").lower() == "true"
+    REQUEST_TIMING_LOG_THRESHOLD_MS: float = float(os.environ.get("REQUEST_TIMING_LOG_THRESHOLD_MS", 0))
+
     # JWT configuration
     JWT_SECRET_KEY: str = os.environ.get("JWT_SECRET_KEY")
     JWT_ALGORITHM: str = os.environ.get("JWT_ALGORITHM")
@@ -58,12 +149,43 @@ class Env(BaseSettings):
     MAIL_SSL_TLS: bool = os.environ.get("MAIL_SSL_TLS")
     USE_CREDENTIALS: bool = os.environ.get("USE_CREDENTIALS")
 
+    # Email outbox (Redis stream drained by background workers, one SMTP connection per worker)
+    EMAIL_OUTBOX_WORKER: bool = os.environ.get("EMAIL_OUTBOX_WORKER", "True").lower() == "true"
+    EMAIL_OUTBOX_CONCURRENCY: int = int(os.environ.get("EMAIL_OUTBOX_CONCURRENCY", 2))
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 20))
+    # Messages per second for the whole process (0 = unlimited)
+    EMAIL_OUTBOX_RATE_LIMIT: float = float(os.environ.get("EMAIL_OUTBOX_RATE_LIMIT", 10))
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+    EMAIL_OUTBOX_BACKOFF_BASE: float = float(os.environ.get("EMAIL_OUTBOX_BACKOFF_BASE", 5))
+    EMAIL_OUTBOX_BACKOFF_MAX: float = float(os.environ.get("EMAIL_OUTBOX_BACKOFF_MAX", 300))
+    # Seconds before a message left unacknowledged by a dead worker is delivered again
+    EMAIL_OUTBOX_CLAIM_IDLE: int = int(os.environ.get("EMAIL_OUTBOX_CLAIM_IDLE", 300))
+    # Seconds the secret template variables (passwords, tokens) of a queued message are kept
+    EMAIL_OUTBOX_SECRET_TTL: int = int(os.environ.get("EMAIL_OUTBOX_SECRET_TTL", 3600))
+    # Seconds the dead-letter list is kept after its last message
+    EMAIL_OUTBOX_DEAD_LETTER_TTL: int = int(os.environ.get("EMAIL_OUTBOX_DEAD_LETTER_TTL", 7 * 24 * 3600))
+    # Seconds an unused SMTP connection stays open
+    EMAIL_SMTP_IDLE_TIMEOUT: float = float(os.environ.get("EMAIL_SMTP_IDLE_TIMEOUT", 30))
+
+    # Email templates: on-disk Jinja bytecode cache (empty = disabled), rendered fragment LRU size
+    # and source size (bytes) above which rendering runs in a worker thread
+    EMAIL_TEMPLATE_BYTECODE_CACHE_DIR: str = os.environ.get("EMAIL_TEMPLATE_BYTECODE_CACHE_DIR", "")
+    EMAIL_TEMPLATE_FRAGMENT_CACHE_SIZE: int = int(os.environ.get("EMAIL_TEMPLATE_FRAGMENT_CACHE_SIZE", 256))
+    EMAIL_TEMPLATE_THREAD_THRESHOLD: int = int(os.environ.get("EMAIL_TEMPLATE_THREAD_THRESHOLD", 16 * 1024))
+
     # WARN: Remember to configure these two environment variables in docker-compose.yml after removing them
     # AWS_ACCESS_KEY_ID: str = os.environ.get("AWS_ACCESS_KEY_ID")
     # AWS_SECRET_ACCESS_KEY: str = os.environ.get("AWS_SECRET_ACCESS_KEY")
     AWS_BUCKET: str = os.environ.get("AWS_BUCKET")
     CLOUDFRONT_DOMAIN: str = os.environ.get("CLOUDFRONT_DOMAIN")
     USE_CLOUDFRONT: bool = os.environ.get("USE_CLOUDFRONT", "True").lower() == "true"
+    # S3-compatible endpoint (MinIO, moto server); empty = AWS
+    AWS_S3_ENDPOINT_URL: str = os.environ.get("AWS_S3_ENDPOINT_URL", "")
+    # S3 I/O runs in a dedicated thread pool; multipart parts are uploaded in parallel
+    CDN_MAX_WORKERS: int = int(os.environ.get("CDN_MAX_WORKERS", 16))
+    CDN_MULTIPART_CHUNK_SIZE: int = int(os.environ.get("CDN_MULTIPART_CHUNK_SIZE", 8 * 1024 * 1024))
+    CDN_MULTIPART_CONCURRENCY: int = int(os.environ.get("CDN_MULTIPART_CONCURRENCY", 4))
+    CDN_DOWNLOAD_CHUNK_SIZE: int = int(os.environ.get("CDN_DOWNLOAD_CHUNK_SIZE", 1024 * 1024))
 
     # CDN configuration
     CHECK_IP_URL: str = os.environ.get("CHECK_IP_URL")
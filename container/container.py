@@ -1,16 +1,16 @@
 # Standard library imports
 from typing import Any, Dict
 
+from redis.asyncio import Redis
+
 # Models
 from databases.user_sessions import UserSessions
 from databases.users import Users
 
-# Third-party imports
-from redis import asyncio as aioredis
-
 # Application constants
 from constants.common import AppTranslationKeys
 from config.env import Env
+from dependencies.database_redis import get_redis
 
 # Repositories - ORM
 from repositories.orm.orm_crud_user import ORMCRUDUser
@@ -58,11 +58,9 @@ class Container:
             logger=self._utils["logger"], translation=self._utils["translation"]
         )
 
-        # Initialize Redis client
-        redis_url = self._utils["env"].REDIS_URL
-        self._utils["redis"] = aioredis.from_url(
-            redis_url, encoding="utf-8", decode_responses=True
-        )
+        # Shared Redis client (one connection pool per process), resolved per use: the pool
+        # is created by the lifespan (or on first use) and replaced after close_redis_pool
+        self._utils["redis_factory"] = get_redis
 
         # Initialize user management service
         self._services["user_management"] = UserManagementServiceImpl(
@@ -83,6 +81,10 @@ class Container:
         """Get a utility by name"""
         return self._utils.get(name)
 
+    def get_redis(self) -> Redis:
+        """Get the shared Redis client (never held by the container)"""
+        return self._utils["redis_factory"]()
+
     def get_email_service(self) -> EmailService:
         """Get email service with proper type annotation"""
         return self._services["email"]
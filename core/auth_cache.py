@@ -0,0 +1,307 @@
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Iterable, Optional, Union
+
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from config.env import env
+from dependencies.database_redis import get_redis
+from repositories.cache.cache_crud_user_role import CacheCRUDUserRole
+from schema.user_schema import UserRoleDepartmentPermissionDto
+from utils import serializer
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Channel used to fan invalidations out to every worker process
+USER_ROLE_INVALIDATION_CHANNEL = "user_role:invalidate"
+
+# Invalidation message (and version key suffix) standing for every user, e.g. after a
+# role-permission edit that changes the payload of all the users holding the role
+ALL_USERS = "*"
+
+# Seconds to wait before re-subscribing after the pub/sub connection drops
+LISTENER_RETRY_DELAY = 1.0
+
+# Seconds a single pub/sub read may block; kept below the pool socket timeout so an
+# idle channel is not mistaken for a dropped connection
+LISTENER_POLL_TIMEOUT = 1.0
+
+# Write a loaded entry back only if neither the user nor every user was invalidated since
+# the load started.
+# KEYS[1] = entry key, KEYS[2] = user version key, KEYS[3] = all-users version key
+# ARGV[1] = serialized entry, ARGV[2] = user version read before the load, ARGV[3] = TTL (seconds),
+# ARGV[4] = all-users version read before the load
+# Returns 1 if written, 0 if the entry is stale
+STORE_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] or (redis.call('GET', KEYS[3]) or '0') ~= ARGV[4] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+class UserRoleCache:
+    """
+    Two-tier cache for `UserRoleDepartmentPermissionDto` lookups made on every authenticated request.
+
+    Tier 1 is an in-process TTL/LRU map, tier 2 is Redis (through `CacheCRUDUserRole`).
+    Postgres is only queried when both tiers miss. Invalidations evict the local entry,
+    delete the Redis entry and are published on a Redis channel so other workers evict too.
+
+    A load that started before an invalidation never writes its (stale) result back: each
+    invalidation bumps a per-user version in Redis, and the write-back is skipped when the
+    version changed since the load started. Locally, a load only fills the in-process tier
+    if no eviction happened in this process while it ran.
+
+    Every write that changes the payload must invalidate it: user writes go through
+    `ORMCRUDUser`; role, department or permission assignments of a user call `invalidate`
+    (or `invalidate_many`), and edits reaching every holder of a role call `invalidate_all`,
+    which bumps an all-users version that Redis entries are stamped with.
+
+    Callers get their own copy of a cached DTO, so mutating it never alters the cache.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        local_ttl: int = env.AUTH_CACHE_LOCAL_TTL,
+        local_max_size: int = env.AUTH_CACHE_LOCAL_MAX_SIZE,
+        redis_ttl: int = env.AUTH_CACHE_REDIS_TTL,
+        redis_factory: Callable[[], Redis] = get_redis,
+    ):
+        """
+        Args:
+            local_ttl (int): Lifetime of in-process entries in seconds.
+            local_max_size (int): Maximum number of in-process entries (LRU evicted).
+            redis_ttl (int): Lifetime of Redis entries in seconds.
+            redis_factory (Callable[[], Redis]): Factory returning the Redis client to use.
+        """
+        self._local: TTLCache = TTLCache(maxsize=local_max_size, ttl=local_ttl)
+        self._cache_crud = CacheCRUDUserRole(expire_time=redis_ttl)
+        self._redis_factory = redis_factory
+        self._store_script: Optional[AsyncScript] = None
+        # Local evictions so far; a load started before one does not fill the local tier
+        self._evictions = 0
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> Redis:
+        """The shared Redis client (resolved per use, so importing never opens a connection)."""
+        return self._redis_factory()
+
+    async def get_or_load(
+        self,
+        user_id: Union[str, uuid.UUID],
+        loader: Callable[[], Awaitable[Optional[UserRoleDepartmentPermissionDto]]],
+    ) -> Optional[UserRoleDepartmentPermissionDto]:
+        """
+        Return the cached DTO for `user_id`, calling `loader` only when both tiers miss.
+
+        Redis failures are logged and treated as a miss so authentication keeps working
+        (against Postgres) while Redis is unavailable.
+
+        Args:
+            user_id (Union[str, UUID]): User identifier.
+            loader (Callable): Coroutine factory that loads the DTO from the database.
+
+        Returns:
+            Optional[UserRoleDepartmentPermissionDto]: The user-role DTO, or None if the user does not exist.
+
+        Example:
+            >>> user_data = await user_role_cache.get_or_load(
+            ...     user_id, lambda: get_user_role_by_user_id(db, user_id)
+            ... )
+        """
+        key = str(user_id)
+
+        user_data = self._local.get(key)
+        if user_data is not None:
+            return user_data.model_copy(deep=True)
+
+        evictions = self._evictions
+        try:
+            cached, version, all_version = await self._cache_crud.mget(
+                self.redis, [key, self._version_key(key), self._version_key(ALL_USERS)]
+            )
+        except RedisError as e:
+            logger.warning(f"Auth cache read failed for user {key}: {str(e)}")
+            cached, version, all_version = None, None, None
+
+        # Entries written before the last `invalidate_all` are stale
+        if cached and cached.get("all_version") == (all_version or 0):
+            user_data = UserRoleDepartmentPermissionDto(**cached["data"])
+            self._store_local(key, user_data, evictions)
+            return user_data
+
+        user_data = await loader()
+        if user_data is None:
+            return None
+
+        self._store_local(key, user_data, evictions)
+        try:
+            await self._store_if_current(key, user_data, version or 0, all_version or 0)
+        except RedisError as e:
+            logger.warning(f"Auth cache write failed for user {key}: {str(e)}")
+        return user_data
+
+    async def invalidate(self, user_id: Union[str, uuid.UUID]) -> None:
+        """
+        Evict `user_id` from both tiers and notify the other workers.
+
+        Args:
+            user_id (Union[str, UUID]): User identifier.
+        """
+        key = str(user_id)
+        self._evict_local(key)
+        try:
+            async with self._cache_crud.pipeline(self.redis, transaction=True) as pipe:
+                pipe.incr(self._version_key(key))
+                pipe.expire(self._version_key(key), self._cache_crud.expire_time)
+                pipe.delete(key)
+            await self.redis.publish(USER_ROLE_INVALIDATION_CHANNEL, key)
+        except RedisError as e:
+            logger.warning(f"Auth cache invalidation failed for user {key}: {str(e)}")
+
+    async def invalidate_many(self, user_ids: Iterable[Union[str, uuid.UUID]]) -> None:
+        """
+        Evict several users from both tiers and notify the other workers, in one round trip.
+
+        Args:
+            user_ids (Iterable[Union[str, UUID]]): User identifiers, e.g. the users whose
+                department changed.
+        """
+        keys = [str(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        for key in keys:
+            self._evict_local(key)
+        try:
+            async with self._cache_crud.pipeline(self.redis, transaction=True) as pipe:
+                for key in keys:
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self._cache_crud.expire_time)
+                    pipe.delete(key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.publish(USER_ROLE_INVALIDATION_CHANNEL, key)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Auth cache invalidation failed for {len(keys)} user(s): {str(e)}")
+
+    async def invalidate_all(self) -> None:
+        """
+        Evict every user from both tiers and notify the other workers, e.g. after the
+        permissions of a role changed.
+
+        Redis entries are not deleted one by one: bumping the all-users version makes every
+        entry written before it stale.
+        """
+        self.clear_local()
+        try:
+            await self._cache_crud.incr(self.redis, self._version_key(ALL_USERS))
+            await self.redis.publish(USER_ROLE_INVALIDATION_CHANNEL, ALL_USERS)
+        except RedisError as e:
+            logger.warning(f"Auth cache invalidation failed for all users: {str(e)}")
+
+    def clear_local(self) -> None:
+        """Drop every in-process entry."""
+        self._evictions += 1
+        self._local.clear()
+
+    def _evict_local(self, key: str) -> None:
+        self._evictions += 1
+        self._local.pop(key, None)
+
+    def _store_local(
+        self, key: str, user_data: UserRoleDepartmentPermissionDto, evictions: int
+    ) -> None:
+        # An eviction since the lookup started may concern this user: do not cache a stale entry
+        if self._evictions == evictions:
+            # A copy: the caller's instance may be mutated after this
+            self._local[key] = user_data.model_copy(deep=True)
+
+    def _version_key(self, key: str) -> str:
+        return f"version:{key}"
+
+    async def _store_if_current(
+        self, key: str, user_data: UserRoleDepartmentPermissionDto, version: int, all_version: int
+    ) -> None:
+        """
+        Write `user_data` to Redis unless the user (or every user) was invalidated after
+        `version` (`all_version`) was read.
+        """
+        if self._store_script is None:
+            self._store_script = self.redis.register_script(STORE_IF_CURRENT_SCRIPT)
+        entry = {"all_version": all_version, "data": user_data.model_dump(mode="json")}
+        await self._store_script(
+            keys=[
+                self._cache_crud._get_key(key),
+                self._cache_crud._get_key(self._version_key(key)),
+                self._cache_crud._get_key(self._version_key(ALL_USERS)),
+            ],
+            args=[serializer.dumps(entry), version, self._cache_crud.expire_time, all_version],
+            client=self.redis,
+        )
+
+    async def start_listener(self) -> None:
+        """Start the background task consuming invalidation messages (idempotent)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Cancel the background invalidation listener."""
+        if self._listener_task is None:
+            return
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass
+        self._listener_task = None
+
+    async def _listen(self) -> None:
+        """
+        Subscribe to the invalidation channel and evict local entries as messages arrive.
+
+        Messages may be lost while the subscription is down, so the local tier is
+        cleared every time the subscription is (re-)established.
+        """
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(USER_ROLE_INVALIDATION_CHANNEL)
+                self.clear_local()
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=LISTENER_POLL_TIMEOUT
+                    )
+                    if message is None or message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    if data == ALL_USERS:
+                        self.clear_local()
+                    else:
+                        self._evict_local(data)
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                logger.warning(f"Auth cache invalidation listener disconnected: {str(e)}")
+                await asyncio.sleep(LISTENER_RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except RedisError:
+                    pass
+
+
+# Create a singleton instance
+user_role_cache = UserRoleCache()
@@ -1,11 +1,19 @@
+import asyncio
+import functools
 import os
+import re
 import uuid
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, TypeVar
 
 import boto3
 import filetype
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from config.env import env
@@ -14,6 +22,12 @@ from config.env import env
 KB = 1024
 MB = 1024 * KB
 MAX_FILE_SIZE = 150 * MB
+MIN_PART_SIZE = 5 * MB
+
+# Single byte range: "bytes=0-499", "bytes=500-" or "bytes=-500" (last 500 bytes)
+BYTE_RANGE_PATTERN = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+T = TypeVar("T")
 
 # File type configurations
 SUPPORTED_FILE_TYPES = {
@@ -45,16 +59,54 @@ EXCEL_SIGNATURES = {
 
 
 class CDNHandler:
+    """
+    S3 / CloudFront file storage.
+
+    boto3 is blocking, so every S3 call runs in a dedicated thread pool (CDN_MAX_WORKERS)
+    through one thread-safe client, never on the event loop. Uploads stream from the
+    `UploadFile` in CDN_MULTIPART_CHUNK_SIZE parts, CDN_MULTIPART_CONCURRENCY at a time, so
+    memory stays bounded by (concurrency + 1) chunks whatever the file size.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
     def __init__(self):
         self.session = boto3.Session()
-        self.cdn_resource = self.session.resource("s3")
-        self.bucket = self.cdn_resource.Bucket(env.AWS_BUCKET)
+        self.bucket_name = env.AWS_BUCKET
+        self.cdn_client = self.session.client(
+            "s3",
+            endpoint_url=env.AWS_S3_ENDPOINT_URL or None,
+            config=Config(max_pool_connections=env.CDN_MAX_WORKERS),
+        )
+        # S3 rejects multipart parts below 5 MB (except the last one)
+        self.chunk_size = max(env.CDN_MULTIPART_CHUNK_SIZE, MIN_PART_SIZE)
+        self.concurrency = max(env.CDN_MULTIPART_CONCURRENCY, 1)
+        self.download_chunk_size = env.CDN_DOWNLOAD_CHUNK_SIZE
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking boto3 call in the CDN thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=env.CDN_MAX_WORKERS, thread_name_prefix="cdn"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def close(self) -> None:
+        """Stop the CDN thread pool (application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     async def validate_file_size(self, file: UploadFile) -> None:
-        """Validate file size is within limits"""
-        contents = await file.read()
-        size = len(contents)
-        await file.seek(0)
+        """Validate file size is within limits, without reading the file"""
+        size = file.size
+        if size is None:
+            # Size unknown (file not created by Starlette's form parser): seek to the end
+            size = await self._run(_get_stream_size, file.file)
         if not 0 < size <= MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=400,
@@ -92,20 +144,161 @@ class CDNHandler:
     async def upload_file(
         self, contents: bytes, key: str, content_type: Optional[str] = None
     ) -> None:
-        """Upload file to CDN"""
+        """Upload file contents already in memory to CDN"""
         try:
             extra_args = {"ContentType": content_type} if content_type else {}
-            self.bucket.put_object(Key=key, Body=contents, **extra_args)
+            await self._run(
+                self.cdn_client.put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=contents,
+                **extra_args,
+            )
 
             # Verify upload
-            obj = self.cdn_resource.Object(bucket_name=env.AWS_BUCKET, key=key)
-            if obj.content_length == 0:
+            head = await self._run(self.cdn_client.head_object, Bucket=self.bucket_name, Key=key)
+            if head["ContentLength"] == 0:
                 raise HTTPException(status_code=500, detail="Failed to upload file")
 
         except ClientError as err:
             logger.error(f"CDN upload error: {str(err)}")
             raise HTTPException(status_code=500, detail="Failed to upload file")
 
+    async def upload_stream(
+        self,
+        file: UploadFile,
+        key: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stream an `UploadFile` to CDN, chunk by chunk.
+
+        The file type is detected from the first chunk (unless `content_type` is given) and
+        the size is checked while streaming: the upload is aborted as soon as it exceeds
+        MAX_FILE_SIZE. A file of one chunk is sent with a single PUT; larger files use a
+        multipart upload whose parts are sent in parallel.
+
+        Args:
+            file (UploadFile): File received by the endpoint.
+            key (Optional[str]): Object key; generated from the file type if not given.
+            content_type (Optional[str]): Content type; detected if not given.
+
+        Returns:
+            Dict[str, Any]: {"key", "content_type", "size"} of the uploaded object.
+
+        Raises:
+            HTTPException: 400 for an empty, too large or unsupported file, 500 on S3 errors.
+
+        Example:
+            >>> result = await cdn_handler.upload_stream(file)
+            >>> url = cdn_handler.generate_presigned_url(result["key"])
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        await file.seek(0)
+        first_chunk = await file.read(self.chunk_size)
+        if not first_chunk:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File size must be between 0 and {MAX_FILE_SIZE/MB:.0f}MB",
+            )
+        content_type = content_type or self.get_file_type(first_chunk, file.filename or "")
+        key = key or self.generate_file_location(file.filename or "", content_type)
+
+        second_chunk = await file.read(self.chunk_size)
+        if not second_chunk:
+            await self.upload_file(first_chunk, key, content_type)
+            return {"key": key, "content_type": content_type, "size": len(first_chunk)}
+
+        size = await self._upload_multipart(file, key, content_type, [first_chunk, second_chunk])
+        return {"key": key, "content_type": content_type, "size": size}
+
+    async def _upload_multipart(
+        self, file: UploadFile, key: str, content_type: str, first_chunks: List[bytes]
+    ) -> int:
+        """Multipart upload of `first_chunks` then the rest of `file`; returns the total size"""
+        try:
+            upload = await self._run(
+                self.cdn_client.create_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                ContentType=content_type,
+            )
+        except ClientError as err:
+            logger.error(f"CDN upload error: {str(err)}")
+            raise HTTPException(status_code=500, detail="Failed to upload file")
+        upload_id = upload["UploadId"]
+
+        # Bounds the parts in flight, hence the chunks held in memory
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def upload_part(part_number: int, chunk: bytes) -> Dict[str, Any]:
+            try:
+                response = await self._run(
+                    self.cdn_client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        size = 0
+        try:
+            part_number = 0
+            pending = list(first_chunks)
+            while True:
+                chunk = pending.pop(0) if pending else await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size must be between 0 and {MAX_FILE_SIZE/MB:.0f}MB",
+                    )
+                await slots.acquire()
+                # Fail fast: stop reading once a part failed
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        slots.release()
+                        raise task.exception()
+                part_number += 1
+                tasks.append(asyncio.create_task(upload_part(part_number, chunk)))
+
+            parts = await asyncio.gather(*tasks)
+            await self._run(
+                self.cdn_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            return size
+
+        except BaseException as err:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self._run(
+                    self.cdn_client.abort_multipart_upload,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            except ClientError as abort_err:
+                logger.error(f"CDN multipart abort error: {str(abort_err)}")
+            if isinstance(err, ClientError):
+                logger.error(f"CDN upload error: {str(err)}")
+                raise HTTPException(status_code=500, detail="Failed to upload file")
+            raise
+
     def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
         """Generate URL for file access (CloudFront or CDN presigned URL)"""
         try:
@@ -113,11 +306,10 @@ class CDNHandler:
             if env.USE_CLOUDFRONT and env.CLOUDFRONT_DOMAIN:
                 return self._get_cloudfront_url(key)
 
-            # Fall back to CDN presigned URL if CloudFront is not enabled
-            cdn_client = self.session.client("s3")
-            return cdn_client.generate_presigned_url(
+            # Fall back to CDN presigned URL if CloudFront is not enabled (signed locally, no I/O)
+            return self.cdn_client.generate_presigned_url(
                 "get_object",
-                Params={"Bucket": env.AWS_BUCKET, "Key": key},
+                Params={"Bucket": self.bucket_name, "Key": key},
                 ExpiresIn=expires_in,
             )
         except Exception as err:
@@ -127,29 +319,143 @@ class CDNHandler:
     async def delete_file(self, key: str) -> bool:
         """Delete file from CDN"""
         try:
-            self.cdn_resource.Object(bucket_name=env.AWS_BUCKET, key=key).delete()
+            await self._run(self.cdn_client.delete_object, Bucket=self.bucket_name, Key=key)
             return True
         except ClientError as err:
             logger.error(f"CDN delete error: {str(err)}")
             return False
 
     async def download_file(self, key: str) -> Optional[bytes]:
-        """Download file from CDN"""
+        """Download a whole file from CDN into memory (use `stream_response` for large files)"""
         try:
-            obj = self.cdn_resource.Object(bucket_name=env.AWS_BUCKET, key=key)
-            return obj.get()["Body"].read()
+            obj = await self._run(self.cdn_client.get_object, Bucket=self.bucket_name, Key=key)
+            return await self._run(obj["Body"].read)
         except ClientError as err:
             logger.error(f"CDN download error: {str(err)}")
             return None
 
+    async def open_download(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> "CDNDownload":
+        """
+        Open an object for streaming, honouring an HTTP `Range` and `If-None-Match`.
+
+        S3 evaluates both: a matching ETag gives a 304 without body, a single satisfiable
+        range a 206 with `Content-Range`, an unsatisfiable one a 416. Multi-range or
+        malformed `Range` headers are ignored (full 200 response), as RFC 9110 allows.
+
+        Args:
+            key (str): Object key.
+            range_header (Optional[str]): Value of the request `Range` header.
+            if_none_match (Optional[str]): Value of the request `If-None-Match` header.
+
+        Returns:
+            CDNDownload: Status, response headers and chunk iterator of the object.
+
+        Raises:
+            HTTPException: 404 if the object does not exist, 500 on other S3 errors.
+
+        Example:
+            >>> download = await cdn_handler.open_download(key, "bytes=0-1023")
+            >>> download.status_code
+            206
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if range_header and BYTE_RANGE_PATTERN.match(range_header.strip()):
+            params["Range"] = range_header.strip()
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+
+        try:
+            obj = await self._run(self.cdn_client.get_object, **params)
+        except ClientError as err:
+            status_code = err.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            code = err.response.get("Error", {}).get("Code")
+            if status_code == 304 or code == "304":
+                etag = err.response["ResponseMetadata"].get("HTTPHeaders", {}).get("etag")
+                return CDNDownload(self, 304, {"ETag": etag or if_none_match})
+            if code in ("NoSuchKey", "404"):
+                raise HTTPException(status_code=404, detail="File not found")
+            if code == "InvalidRange":
+                head = await self._run(self.cdn_client.head_object, Bucket=self.bucket_name, Key=key)
+                return CDNDownload(self, 416, {"Content-Range": f"bytes */{head['ContentLength']}"})
+            logger.error(f"CDN download error: {str(err)}")
+            raise HTTPException(status_code=500, detail="Failed to download file")
+
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(obj["ContentLength"]),
+            "ETag": obj["ETag"],
+        }
+        if obj.get("ContentType"):
+            headers["Content-Type"] = obj["ContentType"]
+        if obj.get("LastModified"):
+            headers["Last-Modified"] = format_datetime(
+                obj["LastModified"].astimezone(timezone.utc), usegmt=True
+            )
+        if obj.get("ContentRange"):
+            headers["Content-Range"] = obj["ContentRange"]
+            return CDNDownload(self, 206, headers, obj["Body"])
+        return CDNDownload(self, 200, headers, obj["Body"])
+
+    async def stream_response(self, key: str, request: Request) -> StreamingResponse:
+        """
+        `StreamingResponse` serving an object to `request`, with Range and ETag support.
+
+        Memory per download is one chunk (CDN_DOWNLOAD_CHUNK_SIZE) whatever the object size.
+
+        Args:
+            key (str): Object key.
+            request (Request): Incoming request (its `Range` and `If-None-Match` headers are used).
+
+        Returns:
+            StreamingResponse: 200, 206, 304 or 416 response.
+
+        Example:
+            >>> @router.get("/files/{key:path}")
+            ... async def get_file(key: str, request: Request):
+            ...     return await cdn_handler.stream_response(key, request)
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        download = await self.open_download(
+            key, request.headers.get("range"), request.headers.get("if-none-match")
+        )
+        media_type = download.headers.pop("Content-Type", None)
+        # Bodies are sent as stored: GZipMiddleware skips responses with a Content-Encoding,
+        # so it neither breaks Content-Length / Content-Range nor recompresses media
+        download.headers["Content-Encoding"] = "identity"
+        return StreamingResponse(
+            download.iter_chunks(),
+            status_code=download.status_code,
+            headers=download.headers,
+            media_type=media_type,
+        )
+
     async def list_files(self) -> Optional[list]:
         """List all files in bucket"""
         try:
-            return [obj.key for obj in self.bucket.objects.all()]
+            return await self._run(self._list_keys)
         except ClientError as err:
             logger.error(f"CDN list error: {str(err)}")
             return None
 
+    def _list_keys(self) -> List[str]:
+        """Every key of the bucket, page by page (runs in the CDN thread pool)"""
+        paginator = self.cdn_client.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket_name)
+            for obj in page.get("Contents", [])
+        ]
+
     async def cdn_delete_file(self, key: str) -> bool:
         """Alias for delete_file for backward compatibility"""
         return await self.delete_file(key)
@@ -163,5 +469,48 @@ class CDNHandler:
         return f"{domain}/{clean_key}"
 
 
+class CDNDownload:
+    """
+    An opened CDN object: HTTP status, response headers and the (not yet read) S3 body.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        handler: CDNHandler,
+        status_code: int,
+        headers: Dict[str, str],
+        body: Optional[Any] = None,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self._handler = handler
+        self._body = body
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield the body chunk by chunk (each read runs in the CDN thread pool), then release it"""
+        if self._body is None:
+            return
+        try:
+            while True:
+                chunk = await self._handler._run(self._body.read, self._handler.download_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            # Also reached when the client disconnects: give the connection back to the pool
+            await self._handler._run(self._body.close)
+
+
+def _get_stream_size(stream: BinaryIO) -> int:
+    """Size of a seekable stream, keeping its position"""
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return size
+
+
 # Initialize CDN handler
 cdn_handler = CDNHandler()
@@ -0,0 +1,672 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from email.message import Message
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig, MessageSchema
+from fastapi_mail.msg import MailMsg
+from jinja2 import TemplateError
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import ResponseError
+
+from config.env import env
+from core.email_connection import conf
+from dependencies.database_redis import get_redis
+from templates.utils import template_manager
+from utils import serializer
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+OUTBOX_STREAM_KEY = "email:outbox"
+OUTBOX_GROUP = "email-workers"
+RETRY_KEY = "email:outbox:retry"
+DEAD_LETTER_KEY = "email:outbox:dead"
+DEAD_LETTER_MAX_LENGTH = 10000
+# Secret template variables of a message, kept apart from the stream, retries and dead letters
+SECRET_KEY = "email:outbox:secret:{message_id}"
+# Progress of a bulk send: hash of counters, and hash of recipient -> error of failed messages
+BATCH_KEY = "email:outbox:batch:{batch_id}"
+BATCH_FAILURES_KEY = "email:outbox:batch:{batch_id}:failures"
+# Seconds the progress of a bulk send is kept
+BATCH_TTL = 7 * 24 * 3600
+# Recipients read from the input and appended to the stream per round trip
+BATCH_ENQUEUE_CHUNK_SIZE = 500
+
+# Seconds a worker blocks on the stream; must stay below REDIS_SOCKET_TIMEOUT
+READ_BLOCK_SECONDS = 1
+
+# Move the retries that are due back to the stream, atomically.
+# KEYS[1] = retry sorted set, KEYS[2] = outbox stream
+# ARGV[1] = now (epoch seconds), ARGV[2] = max messages to move
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, payload in ipairs(due) do
+    redis.call('ZREM', KEYS[1], payload)
+    redis.call('XADD', KEYS[2], '*', 'payload', payload)
+end
+return #due
+"""
+
+
+class SecretExpiredError(Exception):
+    """The secret template variables of a message expired (or were deleted) before it was sent."""
+
+
+class BatchEnqueueError(Exception):
+    """
+    Queuing a bulk send failed part-way: the `queued` messages of batch `batch_id` are still
+    sent, so the batch must be followed (`get_batch_status`), not queued again as a whole.
+    """
+
+    def __init__(self, batch_id: str, queued: int, error: Exception):
+        super().__init__(f"batch {batch_id} stopped after {queued} queued message(s): {str(error)}")
+        self.batch_id = batch_id
+        self.queued = queued
+        self.error = error
+
+
+class RateLimiter:
+    """
+    Spaces calls to at most `rate` per second (0 = unlimited), shared by the workers of a process.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        slot = max(self._next_slot, now)
+        self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class SMTPConnection:
+    """
+    One SMTP connection reused for many messages: opened on first send, re-opened once if
+    the server dropped it, closed after `idle_timeout` seconds without sending.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, config: ConnectionConfig = conf, idle_timeout: float = env.EMAIL_SMTP_IDLE_TIMEOUT):
+        self.config = config
+        self.idle_timeout = idle_timeout
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+
+    async def send(self, message: Message) -> None:
+        for attempt in range(2):
+            if self._smtp is None or not self._smtp.is_connected:
+                await self._connect()
+            try:
+                await self._smtp.send_message(message)
+                self._last_used = time.monotonic()
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                # Servers close idle connections; a fresh one gets a second chance
+                await self.close()
+                if attempt:
+                    raise
+
+    async def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used >= self.idle_timeout:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._smtp is None:
+            return
+        smtp, self._smtp = self._smtp, None
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
+
+    async def _connect(self) -> None:
+        self._smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await self._smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            await self._smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD)
+        self._last_used = time.monotonic()
+
+
+class EmailOutbox:
+    """
+    Durable email queue: requests enqueue, background workers render and send.
+
+    - Messages are appended to a Redis stream read by a consumer group, so an enqueued
+      message survives restarts; a message left unacknowledged by a dead worker is claimed
+      again after `claim_idle` seconds.
+    - `concurrency` workers per process read up to `batch_size` messages at a time and send
+      them over their own long-lived SMTP connection, spaced by a shared rate limiter.
+    - Failures are retried with exponential backoff and full jitter (a sorted set of due
+      times); permanent failures (SMTP 5xx, template errors) and messages out of attempts
+      go to a dead-letter list.
+    - Bulk sends (`enqueue_batch`) queue one message per recipient and count the sent and
+      failed messages of the batch, with the error of each failed recipient.
+    - Secret template variables (`secret_keys`: passwords, tokens) never enter the stream,
+      the retries or the dead letters: they are stored under their own key for `secret_ttl`
+      seconds, read at render time and deleted once the message is sent or dead-lettered.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        concurrency: int = env.EMAIL_OUTBOX_CONCURRENCY,
+        batch_size: int = env.EMAIL_OUTBOX_BATCH_SIZE,
+        rate_limit: float = env.EMAIL_OUTBOX_RATE_LIMIT,
+        max_attempts: int = env.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        backoff_base: float = env.EMAIL_OUTBOX_BACKOFF_BASE,
+        backoff_max: float = env.EMAIL_OUTBOX_BACKOFF_MAX,
+        claim_idle: int = env.EMAIL_OUTBOX_CLAIM_IDLE,
+        secret_ttl: int = env.EMAIL_OUTBOX_SECRET_TTL,
+        dead_letter_ttl: int = env.EMAIL_OUTBOX_DEAD_LETTER_TTL,
+        config: ConnectionConfig = conf,
+        redis_factory: Callable[[], Redis] = get_redis,
+    ):
+        """
+        Args:
+            concurrency (int): Workers (and SMTP connections) per process.
+            batch_size (int): Messages a worker reads from the stream at once.
+            rate_limit (float): Messages per second for the whole process (0 = unlimited).
+            max_attempts (int): Delivery attempts before a message is dead-lettered.
+            backoff_base (float): Delay (seconds) before the first retry, doubled on each attempt.
+            backoff_max (float): Longest delay (seconds) between two attempts.
+            claim_idle (int): Seconds before an unacknowledged message is delivered again.
+            secret_ttl (int): Seconds the secret template variables of a message are kept.
+            dead_letter_ttl (int): Seconds the dead-letter list is kept after its last message.
+            config (ConnectionConfig): SMTP configuration.
+            redis_factory (Callable[[], Redis]): Factory returning the Redis client to use.
+        """
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.claim_idle = claim_idle
+        self.secret_ttl = secret_ttl
+        self.dead_letter_ttl = dead_letter_ttl
+        self.config = config
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._redis_factory = redis_factory
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._promote_script: Optional[AsyncScript] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def redis(self) -> Redis:
+        """The shared Redis client (resolved per use, so importing never opens a connection)."""
+        return self._redis_factory()
+
+    async def enqueue(
+        self,
+        subject: str,
+        recipients: List[str],
+        template_path: str,
+        template_data: Dict[str, Any],
+        secret_keys: Iterable[str] = (),
+    ) -> str:
+        """
+        Queue an email; it is rendered and sent by a worker.
+
+        Args:
+            subject (str): Email subject.
+            recipients (List[str]): Recipient email addresses.
+            template_path (str): Template name (relative to the templates directory).
+            template_data (Dict[str, Any]): Template variables (must be serializable).
+            secret_keys (Iterable[str]): Template variables holding credentials, kept out of
+                the queue (see the class docstring).
+
+        Returns:
+            str: Message ID.
+
+        Example:
+            >>> await email_outbox.enqueue(
+            ...     "Account Approved by Adoor", [email], "account_approved.html", {"display_name": name}
+            ... )
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        message_id = str(uuid.uuid4())
+        payload = {
+            "id": message_id,
+            "subject": subject,
+            "recipients": recipients,
+            "template": template_path,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        async with self.redis.pipeline(transaction=False) as pipe:
+            self._add_message(pipe, payload, template_data, secret_keys)
+            await pipe.execute()
+        return message_id
+
+    async def enqueue_batch(
+        self,
+        subject: str,
+        template_path: str,
+        recipients: Union[Iterable[Tuple[str, Dict[str, Any]]], AsyncIterable[Tuple[str, Dict[str, Any]]]],
+        shared_data: Optional[Dict[str, Any]] = None,
+        secret_keys: Iterable[str] = (),
+    ) -> str:
+        """
+        Queue one email per recipient, with per-recipient template variables, and track the
+        progress of the batch (see `get_batch_status`).
+
+        The recipients are consumed as a stream, `BATCH_ENQUEUE_CHUNK_SIZE` at a time with one
+        pipelined round trip per chunk, so the workers start sending (over their pooled SMTP
+        connections, rendering each message as they go) before the whole list is queued.
+
+        Args:
+            subject (str): Email subject (shared by every recipient).
+            template_path (str): Template name (relative to the templates directory).
+            recipients (Union[Iterable, AsyncIterable]): `(email, template_data)` pairs.
+            shared_data (Optional[Dict[str, Any]]): Template variables of every recipient,
+                overridden by the recipient's own.
+            secret_keys (Iterable[str]): Template variables holding credentials, kept out of
+                the queue (see the class docstring).
+
+        Returns:
+            str: Batch ID.
+
+        Raises:
+            BatchEnqueueError: If queuing fails after the batch was created; the batch is closed
+                with the messages queued so far as its total, and keeps being sent.
+
+        Example:
+            >>> batch_id = await email_outbox.enqueue_batch(
+            ...     f"Invitation to join {org_name}",
+            ...     "invite_user_no_credentials.html",
+            ...     ((user.email, {"display_name": user.name}) for user in users),
+            ...     shared_data={"org_name": org_name},
+            ... )
+            >>> await email_outbox.get_batch_status(batch_id)
+            {'total': 2000, 'sent': 1850, 'failed': 3, 'pending': 147, 'complete': False, ...}
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        batch_id = str(uuid.uuid4())
+        batch_key = BATCH_KEY.format(batch_id=batch_id)
+        await self.redis.hset(
+            batch_key,
+            mapping={"total": 0, "sent": 0, "failed": 0, "queuing": 1, "created_at": time.time()},
+        )
+        await self.redis.expire(batch_key, BATCH_TTL)
+
+        secret_keys = tuple(secret_keys)
+        queued = 0
+        chunk: List[Tuple[str, Dict[str, Any]]] = []
+        try:
+            async for recipient in as_async_iterable(recipients):
+                chunk.append(recipient)
+                if len(chunk) >= BATCH_ENQUEUE_CHUNK_SIZE:
+                    await self._enqueue_chunk(
+                        batch_id, subject, template_path, chunk, shared_data, secret_keys
+                    )
+                    queued += len(chunk)
+                    chunk = []
+            if chunk:
+                await self._enqueue_chunk(batch_id, subject, template_path, chunk, shared_data, secret_keys)
+                queued += len(chunk)
+        except Exception as e:
+            # Close the batch with what was actually queued, so it can still complete
+            try:
+                await self.redis.hset(
+                    batch_key, mapping={"total": queued, "queuing": 0, "error": str(e)}
+                )
+            except Exception as close_error:
+                logger.error(f"Failed to close email batch {batch_id}: {str(close_error)}")
+            raise BatchEnqueueError(batch_id, queued, e) from e
+        await self.redis.hset(batch_key, "queuing", 0)
+        return batch_id
+
+    async def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress of a bulk send: counts and the error of every failed recipient.
+
+        Args:
+            batch_id (str): ID returned by `enqueue_batch`.
+
+        Returns:
+            Optional[Dict[str, Any]]: `total`, `sent`, `failed`, `pending` (queued or retrying),
+            `complete`, `failures` (recipient -> error) and `error` (why queuing stopped early,
+            None if every recipient was queued), or None if unknown or expired.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(BATCH_KEY.format(batch_id=batch_id))
+            pipe.hgetall(BATCH_FAILURES_KEY.format(batch_id=batch_id))
+            counters, failures = await pipe.execute()
+        if not counters:
+            return None
+        total, sent, failed = (int(counters[field]) for field in ("total", "sent", "failed"))
+        return {
+            "total": total,
+            "sent": sent,
+            "failed": failed,
+            "pending": total - sent - failed,
+            "complete": counters["queuing"] == "0" and sent + failed >= total,
+            "failures": failures,
+            "error": counters.get("error"),
+        }
+
+    async def _enqueue_chunk(
+        self,
+        batch_id: str,
+        subject: str,
+        template_path: str,
+        chunk: List[Tuple[str, Dict[str, Any]]],
+        shared_data: Optional[Dict[str, Any]],
+        secret_keys: Tuple[str, ...],
+    ) -> None:
+        enqueued_at = time.time()
+        # Transactional: a chunk is queued and counted entirely or not at all
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # Count first: a worker may finish a message before the count is updated otherwise
+            pipe.hincrby(BATCH_KEY.format(batch_id=batch_id), "total", len(chunk))
+            for email, template_data in chunk:
+                payload = {
+                    "id": str(uuid.uuid4()),
+                    "batch": batch_id,
+                    "subject": subject,
+                    "recipients": [email],
+                    "template": template_path,
+                    "attempts": 0,
+                    "enqueued_at": enqueued_at,
+                }
+                self._add_message(pipe, payload, {**(shared_data or {}), **template_data}, secret_keys)
+            await pipe.execute()
+
+    def _add_message(
+        self,
+        pipe: Any,
+        payload: Dict[str, Any],
+        template_data: Dict[str, Any],
+        secret_keys: Iterable[str],
+    ) -> None:
+        """Append a message to the stream, storing its secret template variables apart."""
+        secrets = {key: template_data[key] for key in secret_keys if key in template_data}
+        payload["data"] = {key: value for key, value in template_data.items() if key not in secrets}
+        if secrets:
+            payload["secret"] = True
+            pipe.set(
+                SECRET_KEY.format(message_id=payload["id"]),
+                serializer.dumps_str(secrets),
+                ex=self.secret_ttl,
+            )
+        pipe.xadd(OUTBOX_STREAM_KEY, {"payload": serializer.dumps_str(payload)})
+
+    async def start(self) -> None:
+        """Start the workers and the retry / reclaim loop (idempotent)."""
+        if self._tasks:
+            return
+        try:
+            await self.redis.xgroup_create(OUTBOX_STREAM_KEY, OUTBOX_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._tasks = [asyncio.create_task(self._run_worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._run_maintenance()))
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Messages being sent stay unacknowledged in the stream and are
+        delivered again after `claim_idle` seconds.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def get_stats(self) -> Dict[str, int]:
+        """Queued, in-flight (read but not acknowledged), scheduled retry and dead-letter counts."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(OUTBOX_STREAM_KEY)
+            pipe.zcard(RETRY_KEY)
+            pipe.llen(DEAD_LETTER_KEY)
+            length, retrying, dead = await pipe.execute()
+        try:
+            in_flight = (await self.redis.xpending(OUTBOX_STREAM_KEY, OUTBOX_GROUP))["pending"]
+        except ResponseError:
+            in_flight = 0
+        return {
+            "queued": length - in_flight,
+            "in_flight": in_flight,
+            "retrying": retrying,
+            "dead": dead,
+        }
+
+    async def requeue_dead_letters(self, limit: int = 100) -> int:
+        """
+        Move up to `limit` dead-lettered messages back to the stream with fresh attempts.
+
+        The secret template variables of a dead-lettered message are already deleted, so such
+        a message fails again (`SecretExpiredError`): send it anew (e.g. a new invitation).
+        """
+        moved = 0
+        for _ in range(limit):
+            raw = await self.redis.rpop(DEAD_LETTER_KEY)
+            if raw is None:
+                break
+            payload = serializer.loads(raw)
+            payload.pop("error", None)
+            payload.pop("failed_at", None)
+            payload["attempts"] = 0
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if payload.get("batch"):
+                    # Pending again in its batch
+                    pipe.hincrby(BATCH_KEY.format(batch_id=payload["batch"]), "failed", -1)
+                    pipe.hdel(
+                        BATCH_FAILURES_KEY.format(batch_id=payload["batch"]),
+                        ",".join(payload["recipients"]),
+                    )
+                pipe.xadd(OUTBOX_STREAM_KEY, {"payload": serializer.dumps_str(payload)})
+                await pipe.execute()
+            moved += 1
+        return moved
+
+    async def _run_worker(self) -> None:
+        smtp = SMTPConnection(self.config)
+        try:
+            while True:
+                try:
+                    response = await self.redis.xreadgroup(
+                        OUTBOX_GROUP,
+                        self.consumer,
+                        {OUTBOX_STREAM_KEY: ">"},
+                        count=self.batch_size,
+                        block=int(READ_BLOCK_SECONDS * 1000),
+                    )
+                    entries = response[0][1] if response else []
+                    for entry_id, fields in entries:
+                        await self._deliver(smtp, entry_id, fields["payload"])
+                    if not entries:
+                        await smtp.close_if_idle()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Redis unavailable: keep the worker alive and try again
+                    logger.error(f"Email outbox worker error: {str(e)}")
+                    await asyncio.sleep(READ_BLOCK_SECONDS)
+        finally:
+            await smtp.close()
+
+    async def _deliver(self, smtp: SMTPConnection, entry_id: str, raw_payload: str) -> None:
+        payload = serializer.loads(raw_payload)
+        try:
+            message = await self._build_message(payload)
+            await self._rate_limiter.acquire()
+            await smtp.send(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._retry_or_dead_letter(entry_id, payload, e)
+            return
+        pipe = self._acknowledge(self.redis.pipeline(transaction=True), entry_id)
+        if payload.get("secret"):
+            pipe.delete(SECRET_KEY.format(message_id=payload["id"]))
+        if payload.get("batch"):
+            pipe.hincrby(BATCH_KEY.format(batch_id=payload["batch"]), "sent", 1)
+        await pipe.execute()
+        logger.info(f"Email {payload['id']} sent to {payload['recipients']}")
+
+    async def _build_message(self, payload: Dict[str, Any]) -> Message:
+        template_data = payload["data"]
+        if payload.get("secret"):
+            secrets = await self.redis.get(SECRET_KEY.format(message_id=payload["id"]))
+            if secrets is None:
+                raise SecretExpiredError(f"secret template variables expired after {self.secret_ttl}s")
+            template_data = {**template_data, **serializer.loads(secrets)}
+        html_content = await template_manager.render_template_async(
+            payload["template"], **template_data
+        )
+        message = MessageSchema(
+            subject=payload["subject"],
+            recipients=payload["recipients"],
+            body=html_content,
+            subtype="html",
+        )
+        sender = self.config.MAIL_FROM
+        if self.config.MAIL_FROM_NAME is not None:
+            sender = f"{self.config.MAIL_FROM_NAME} <{self.config.MAIL_FROM}>"
+        return await MailMsg(message)._message(sender)
+
+    async def _retry_or_dead_letter(
+        self, entry_id: str, payload: Dict[str, Any], error: Exception
+    ) -> None:
+        payload["attempts"] += 1
+        permanent = _is_permanent_error(error)
+        pipe = self._acknowledge(self.redis.pipeline(transaction=True), entry_id)
+        if permanent or payload["attempts"] >= self.max_attempts:
+            payload["error"] = str(error)
+            payload["failed_at"] = time.time()
+            pipe.lpush(DEAD_LETTER_KEY, serializer.dumps_str(payload))
+            pipe.ltrim(DEAD_LETTER_KEY, 0, DEAD_LETTER_MAX_LENGTH - 1)
+            pipe.expire(DEAD_LETTER_KEY, self.dead_letter_ttl)
+            if payload.get("secret"):
+                # Never kept for a message that will not be sent
+                pipe.delete(SECRET_KEY.format(message_id=payload["id"]))
+            if payload.get("batch"):
+                self._record_batch_failure(pipe, payload)
+            logger.error(
+                f"Email {payload['id']} to {payload['recipients']} dead-lettered after "
+                f"{payload['attempts']} attempt(s): {str(error)}"
+            )
+        else:
+            delay = random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2 ** (payload["attempts"] - 1))
+            )
+            pipe.zadd(RETRY_KEY, {serializer.dumps_str(payload): time.time() + delay})
+            logger.warning(
+                f"Email {payload['id']} to {payload['recipients']} failed "
+                f"(attempt {payload['attempts']}), retrying in {delay:.1f}s: {str(error)}"
+            )
+        await pipe.execute()
+
+    @staticmethod
+    def _record_batch_failure(pipe: Any, payload: Dict[str, Any]) -> None:
+        failures_key = BATCH_FAILURES_KEY.format(batch_id=payload["batch"])
+        pipe.hincrby(BATCH_KEY.format(batch_id=payload["batch"]), "failed", 1)
+        pipe.hset(failures_key, ",".join(payload["recipients"]), payload["error"])
+        pipe.expire(failures_key, BATCH_TTL)
+
+    @staticmethod
+    def _acknowledge(pipe: Any, entry_id: str) -> Any:
+        # Delete as well: the stream only holds messages still to deliver
+        pipe.xack(OUTBOX_STREAM_KEY, OUTBOX_GROUP, entry_id)
+        pipe.xdel(OUTBOX_STREAM_KEY, entry_id)
+        return pipe
+
+    async def _run_maintenance(self) -> None:
+        last_claim = 0.0
+        while True:
+            try:
+                await self._promote_due_retries()
+                if time.monotonic() - last_claim >= self.claim_idle / 2:
+                    last_claim = time.monotonic()
+                    await self._reclaim_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox maintenance error: {str(e)}")
+            await asyncio.sleep(1)
+
+    async def _promote_due_retries(self) -> int:
+        if self._promote_script is None:
+            self._promote_script = self.redis.register_script(PROMOTE_RETRIES_SCRIPT)
+        return await self._promote_script(
+            keys=[RETRY_KEY, OUTBOX_STREAM_KEY],
+            args=[time.time(), self.batch_size * self.concurrency],
+            client=self.redis,
+        )
+
+    async def _reclaim_stale(self) -> None:
+        """Re-queue messages read by a worker that died before acknowledging them (counts as an attempt)."""
+        cursor = "0-0"
+        while True:
+            # Redis 7 appends the IDs of deleted entries, Redis 6.2 does not
+            result = await self.redis.xautoclaim(
+                OUTBOX_STREAM_KEY,
+                OUTBOX_GROUP,
+                self.consumer,
+                min_idle_time=self.claim_idle * 1000,
+                start_id=cursor,
+                count=self.batch_size,
+            )
+            cursor, entries = result[0], result[1]
+            for entry_id, fields in entries:
+                if not fields:
+                    continue
+                payload = serializer.loads(fields["payload"])
+                await self._retry_or_dead_letter(
+                    entry_id, payload, RuntimeError("not acknowledged by its worker")
+                )
+            if cursor == "0-0" or not entries:
+                return
+
+
+async def as_async_iterable(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterable[Any]:
+    """Iterate a sync or async iterable with `async for` (e.g. recipients streamed from a query)."""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def _is_permanent_error(error: Exception) -> bool:
+    """Errors that a retry cannot fix: rejected by the SMTP server (5xx) or a broken template."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= refused.code < 600 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 500 <= error.code < 600
+    return isinstance(error, (TemplateError, SecretExpiredError, KeyError, TypeError, ValueError))
+
+
+email_outbox = EmailOutbox()
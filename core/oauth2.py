@@ -9,9 +9,11 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from constants.common import AppTranslationKeys
 from config.env import env
+from core.auth_cache import user_role_cache
 from dependencies import database_postgresql
 from repositories.orm.get_user_role_by_user_id import get_user_role_by_user_id
 from schema.user_schema import UserRoleDepartmentPermissionDto
+from utils.request_timing import span, timed
 
 # Initialize translation
 translation = AppTranslationKeys()
@@ -151,6 +153,7 @@ def create_refresh_token(user_id: Union[str, UUID], **additional_data) -> str:
     )
 
 
+@timed("auth.decode_token")
 async def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and validate JWT token
@@ -180,6 +183,7 @@ async def decode_token(token: str) -> Dict[str, Any]:
         raise CREDENTIALS_EXCEPTION
 
 
+@timed("auth.current_user")
 async def get_current_user_data(
     token: str = Depends(oauth2_scheme),
     session_factory: async_sessionmaker[AsyncSession] = Depends(
@@ -207,14 +211,17 @@ async def get_current_user_data(
 
     user_id = UUID(payload["user_id"])
 
-    # Get user with role using async session
-    async with session_factory() as db:
-        user_data = await get_user_role_by_user_id(db, user_id)
+    async def load_user_data() -> Optional[UserRoleDepartmentPermissionDto]:
+        # Only reached when both the in-process and the Redis cache miss
+        async with session_factory() as db:
+            return await get_user_role_by_user_id(db, user_id)
 
-        if not user_data:
-            raise USER_NOT_FOUND_EXCEPTION
+    user_data = await user_role_cache.get_or_load(user_id, load_user_data)
 
-        return user_data
+    if not user_data:
+        raise USER_NOT_FOUND_EXCEPTION
+
+    return user_data
 
 
 class RBACDependency:
@@ -256,23 +263,24 @@ class RBACDependency:
         Raises:
             HTTPException: If user doesn't have required roles
         """
-        # Check if user is active
-        if not user_data.user.is_active:
-            raise INACTIVE_USER_EXCEPTION
+        with span("auth.rbac"):
+            # Check if user is active
+            if not user_data.user.is_active:
+                raise INACTIVE_USER_EXCEPTION
 
-        # Check if user is verified
-        if not user_data.user.is_verified:
-            raise UNVERIFIED_USER_EXCEPTION
+            # Check if user is verified
+            if not user_data.user.is_verified:
+                raise UNVERIFIED_USER_EXCEPTION
 
-        # Check role-based access
-        if self.required_roles and user_data.role.name not in self.required_roles:
-            raise PERMISSION_EXCEPTION
+            # Check role-based access
+            if self.required_roles and user_data.role.name not in self.required_roles:
+                raise PERMISSION_EXCEPTION
 
-        # Store organization ID in request state for service layer verification
-        if self.verify_org and user_data.user.org_id:
-            request.state.org_id = user_data.user.org_id
+            # Store organization ID in request state for service layer verification
+            if self.verify_org and user_data.user.org_id:
+                request.state.org_id = user_data.user.org_id
 
-        return user_data
+            return user_data
 
 
 # Predefined RBAC dependencies for common use cases
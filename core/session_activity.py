@@ -0,0 +1,241 @@
+import asyncio
+import time
+import uuid
+from typing import Callable, Dict, Optional, Union
+
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from config.env import env
+from dependencies.database_redis import get_redis
+from repositories.cache.cache_crud_session_activity import CacheCRUDSessionActivity
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Validate a session and, only if it is about to expire, refresh it in the same round trip.
+# KEYS[1] = activity key, KEYS[2] = started marker
+# ARGV[1] = now (epoch seconds), ARGV[2] = idle timeout, ARGV[3] = refresh threshold (seconds of TTL left),
+# ARGV[4] = "1" to start a session that was never started instead of rejecting it,
+# ARGV[5] = lifetime of the started marker (seconds)
+# Returns 0 if the session is missing/expired, 1 if valid, 2 if valid and refreshed inline
+# (or started).
+VALIDATE_AND_TOUCH_SCRIPT = """
+local ttl = redis.call('TTL', KEYS[1])
+if ttl == -2 then
+    -- Timed out or revoked (the marker remains): rejected; never started: started if allowed
+    if ARGV[4] ~= '1' or redis.call('EXISTS', KEYS[2]) == 1 then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    redis.call('SET', KEYS[2], 1, 'EX', ARGV[5])
+    return 2
+end
+if ttl ~= -1 and ttl <= tonumber(ARGV[3]) then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    redis.call('SET', KEYS[2], 1, 'EX', ARGV[5])
+    return 2
+end
+return 1
+"""
+
+
+class SessionActivityEngine:
+    """
+    Validates user sessions and records their last activity with one Redis round trip per request.
+
+    - Validation runs as a single atomic Lua script (TTL check plus an inline refresh
+      only when the session is close to timing out). A "started" marker outlives the
+      activity key by `started_ttl` seconds, so a session that timed out (or was ended) is
+      rejected until `start_session` is called again. Until sign-in calls `start_session`,
+      a session that was never started is started by the first authenticated request
+      (SESSION_REQUIRE_STARTED=false, the default).
+    - Last-activity writes are write-behind: they are coalesced in-process (at most one
+      per user every `touch_interval` seconds) and flushed in one pipeline every
+      `flush_interval` seconds by a background task. Flushes use `SET ... XX`, so a
+      session revoked in the meantime is never resurrected, and extend the started marker.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        idle_timeout: int = env.SESSION_IDLE_TIMEOUT,
+        touch_interval: int = env.SESSION_ACTIVITY_TOUCH_INTERVAL,
+        flush_interval: int = env.SESSION_ACTIVITY_FLUSH_INTERVAL,
+        require_started: bool = env.SESSION_REQUIRE_STARTED,
+        started_ttl: int = env.SESSION_STARTED_TTL,
+        redis_factory: Callable[[], Redis] = get_redis,
+    ):
+        """
+        Args:
+            idle_timeout (int): Seconds of inactivity after which a session expires.
+            touch_interval (int): Minimum seconds between two last-activity writes for a user.
+            flush_interval (int): Seconds between two write-behind flushes.
+            require_started (bool): Reject sessions never started with `start_session`; when
+                False, the first authenticated request starts the session.
+            started_ttl (int): Seconds a session is remembered as started after its last
+                activity (a timed-out session is rejected, not started again, meanwhile).
+            redis_factory (Callable[[], Redis]): Factory returning the Redis client to use.
+        """
+        self.idle_timeout = idle_timeout
+        self.touch_interval = touch_interval
+        self.flush_interval = flush_interval
+        self.require_started = require_started
+        self.started_ttl = started_ttl
+        # Refresh inline when the session could otherwise expire before the next flush lands
+        self.refresh_threshold = touch_interval + 2 * flush_interval
+        self._cache_crud = CacheCRUDSessionActivity(expire_time=idle_timeout)
+        self._redis_factory = redis_factory
+        self._validate_script: Optional[AsyncScript] = None
+        self._pending: Dict[str, int] = {}
+        self._last_touched: Dict[str, float] = {}
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> Redis:
+        """The shared Redis client (resolved per use, so importing never opens a connection)."""
+        return self._redis_factory()
+
+    async def start_session(self, user_id: Union[str, uuid.UUID]) -> None:
+        """
+        Mark a session as active, e.g. right after sign-in.
+
+        Args:
+            user_id (Union[str, UUID]): User identifier.
+        """
+        key = str(user_id)
+        now = int(time.time())
+        async with self._cache_crud.pipeline(self.redis) as pipe:
+            pipe.set(key, now)
+            pipe.set(self._started_key(key), 1, expire_time=self.started_ttl)
+        self._last_touched[key] = time.monotonic()
+        self._pending.pop(key, None)
+
+    async def end_session(self, user_id: Union[str, uuid.UUID]) -> None:
+        """
+        Revoke a session, e.g. on sign-out. Pending write-behind touches are dropped; the
+        started marker is kept, so the session is rejected until `start_session`.
+
+        Args:
+            user_id (Union[str, UUID]): User identifier.
+        """
+        key = str(user_id)
+        self._pending.pop(key, None)
+        self._last_touched.pop(key, None)
+        async with self._cache_crud.pipeline(self.redis) as pipe:
+            pipe.delete(key)
+            pipe.set(self._started_key(key), 1, expire_time=self.started_ttl)
+
+    async def validate_and_touch(self, user_id: Union[str, uuid.UUID]) -> bool:
+        """
+        Check that the session of `user_id` has not timed out and record activity.
+
+        Args:
+            user_id (Union[str, UUID]): User identifier.
+
+        Returns:
+            bool: True if the session is still valid.
+
+        Example:
+            >>> if not await session_activity.validate_and_touch(user_id):
+            ...     raise SESSION_EXPIRED_EXCEPTION
+        """
+        key = str(user_id)
+        if self._validate_script is None:
+            self._validate_script = self.redis.register_script(VALIDATE_AND_TOUCH_SCRIPT)
+
+        status = await self._validate_script(
+            keys=[self._cache_crud._get_key(key), self._cache_crud._get_key(self._started_key(key))],
+            args=[
+                int(time.time()),
+                self.idle_timeout,
+                self.refresh_threshold,
+                "1" if not self.require_started else "0",
+                self.started_ttl,
+            ],
+            client=self.redis,
+        )
+        if not status:
+            self._pending.pop(key, None)
+            return False
+
+        now = time.monotonic()
+        if status == 2:
+            self._last_touched[key] = now
+            self._pending.pop(key, None)
+        elif now - self._last_touched.get(key, 0.0) >= self.touch_interval:
+            self._pending[key] = int(time.time())
+            self._last_touched[key] = now
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write all pending last-activity timestamps in a single pipeline.
+
+        Returns:
+            int: Number of sessions written.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, timestamp in pending.items():
+                    pipe.set(
+                        self._cache_crud._get_key(key), timestamp, ex=self.idle_timeout, xx=True
+                    )
+                    pipe.expire(self._cache_crud._get_key(self._started_key(key)), self.started_ttl)
+                await pipe.execute()
+        except RedisError:
+            # Keep the touches for the next flush, unless newer ones were queued meanwhile
+            for key, timestamp in pending.items():
+                self._pending.setdefault(key, timestamp)
+            raise
+
+        self._prune_last_touched()
+        return len(pending)
+
+    @staticmethod
+    def _started_key(key: str) -> str:
+        return f"started:{key}"
+
+    def _prune_last_touched(self) -> None:
+        """Forget users whose last touch is older than the idle timeout, bounding memory."""
+        horizon = time.monotonic() - self.idle_timeout
+        for key in [k for k, t in self._last_touched.items() if t < horizon]:
+            del self._last_touched[key]
+
+    async def start_flusher(self) -> None:
+        """Start the background write-behind flusher (idempotent)."""
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._run_flusher())
+
+    async def stop_flusher(self) -> None:
+        """Stop the background flusher and write whatever is still pending."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        try:
+            await self.flush()
+        except RedisError as e:
+            logger.warning(f"Final session activity flush failed: {str(e)}")
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except RedisError as e:
+                logger.warning(f"Session activity flush failed: {str(e)}")
+
+
+# Create a singleton instance
+session_activity = SessionActivityEngine()
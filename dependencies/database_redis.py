@@ -1,17 +1,95 @@
-from redis.asyncio import Redis
+from typing import Any, Dict, Optional
+
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from config.env import env
 
+# Process-wide pool and client, created on first use (or by the application lifespan)
+_pool: Optional[BlockingConnectionPool] = None
+_client: Optional[Redis] = None
+
+
+def init_redis_pool() -> Redis:
+    """
+    Description:
+        Create the process-wide Redis connection pool and client, if not created yet.
+        Called from the application lifespan; `get_redis` also calls it lazily so scripts
+        and CLI commands work without a lifespan.
+    Args: None
+    Returns:
+        Redis: The shared Redis client.
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    global _pool, _client
+    if _client is None:
+        # Blocking pool: when every connection is busy, wait (up to REDIS_POOL_TIMEOUT)
+        # instead of failing or opening a connection that would be thrown away
+        _pool = BlockingConnectionPool.from_url(
+            env.REDIS_URL,
+            max_connections=env.REDIS_MAX_CONNECTIONS,
+            timeout=env.REDIS_POOL_TIMEOUT,
+            health_check_interval=env.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_timeout=env.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=env.REDIS_SOCKET_CONNECT_TIMEOUT,
+            socket_keepalive=True,
+            decode_responses=True,
+        )
+        _client = Redis(connection_pool=_pool)
+    return _client
+
+
+async def close_redis_pool() -> None:
+    """
+    Description:
+        Close the shared Redis client and disconnect every pooled connection (application shutdown).
+    Args: None
+    Returns: None
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    global _pool, _client
+    if _client is not None:
+        await _client.aclose()
+        await _pool.disconnect()
+        _pool = None
+        _client = None
+
+
+def get_redis_pool_stats() -> Dict[str, Any]:
+    """
+    Description:
+        Usage of the shared Redis connection pool.
+    Args: None
+    Returns:
+        Dict[str, Any]: max_connections, in_use, idle and created connection counts.
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    if _pool is None:
+        return {"initialized": False}
+    in_use = len(_pool._in_use_connections)
+    idle = len(_pool._available_connections)
+    return {
+        "initialized": True,
+        "max_connections": _pool.max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "created": in_use + idle,
+        "utilization": round(in_use / _pool.max_connections, 4) if _pool.max_connections else None,
+    }
+
 
 def get_redis() -> Redis:
     """
     Description:
-        This function is a dependency for FastAPI routes. It provides an instance of Redis client.
+        This function is a dependency for FastAPI routes. It provides the shared Redis client.
         The Redis client is used to interact with the Redis database for caching purposes.
+        Every call returns the same client, backed by one connection pool.
     Args: None
     Returns:
-        Redis: An instance of the Redis client.
+        Redis: The shared Redis client.
     Author:
         tranvanphuc.dev.it.2002@gmail.com
     """
-    return Redis.from_url(env.REDIS_URL, decode_responses=True)
+    return _client if _client is not None else init_redis_pool()
@@ -0,0 +1,212 @@
+import time
+from typing import Any, Dict, Union
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config.env import env
+from utils.logger import setup_logger
+from utils.metrics import COUNT_BUCKETS, LATENCY_BUCKETS, Histogram
+
+logger = setup_logger()
+
+LIVENESS_ALWAYS = "always"
+LIVENESS_IDLE = "idle"
+LIVENESS_NEVER = "never"
+
+
+class PoolMetrics:
+    """
+    Histograms of one connection pool: how long a checkout waited for a connection, how
+    long the connection was then held, and how many overflow connections were in use.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = Histogram(LATENCY_BUCKETS)
+        self.checkout_duration = Histogram(LATENCY_BUCKETS)
+        self.overflow = Histogram(COUNT_BUCKETS)
+        self.pings = 0
+        self.ping_failures = 0
+        self.pool_size = 0
+        self.max_overflow = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "checkout_duration_seconds": self.checkout_duration.snapshot(),
+            "overflow_in_use": self.overflow.snapshot(),
+            "liveness_pings": self.pings,
+            "liveness_ping_failures": self.ping_failures,
+        }
+
+
+# Metrics per pool logging name ("primary", "replica-0", "sync"); survives pool recreation
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    metrics = _pool_metrics.get(name)
+    if metrics is None:
+        metrics = _pool_metrics[name] = PoolMetrics(name)
+    return metrics
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every instrumented pool, keyed by pool name."""
+    return {name: metrics.snapshot() for name, metrics in _pool_metrics.items()}
+
+
+class _CheckoutWaitMixin:
+    """Times `_do_get`, i.e. the wait for a free (or newly opened) connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            get_pool_metrics(self._orig_logging_name).checkout_wait.observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedQueuePool(_CheckoutWaitMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutWaitMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class LivenessPolicy:
+    """
+    Decides when a pooled connection is checked before being handed out.
+
+    Whatever the policy, a statement failing with a disconnect error invalidates the
+    connection and every older connection of the pool (SQLAlchemy's error-driven
+    invalidation), so a dead server is detected at most once per pool.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        """Extra `create_engine` keyword arguments required by the policy."""
+        return {"pool_pre_ping": False}
+
+    def attach(self, engine: Union[Engine, AsyncEngine], name: str) -> None:
+        """Register the pool listeners of the policy on `engine`."""
+
+
+class AlwaysPingPolicy(LivenessPolicy):
+    """Ping on every checkout (SQLAlchemy's `pool_pre_ping`): one extra round trip per checkout."""
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        return {"pool_pre_ping": True}
+
+
+class NeverPingPolicy(LivenessPolicy):
+    """Never ping; rely on error-driven invalidation only."""
+
+
+class IdlePingPolicy(LivenessPolicy):
+    """
+    Ping only connections that sat idle in the pool longer than `idle_threshold` seconds.
+    Connections in steady use (the common case under load) are handed out without a round trip.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, idle_threshold: float = env.DB_LIVENESS_IDLE_THRESHOLD):
+        self.idle_threshold = idle_threshold
+
+    def attach(self, engine: Union[Engine, AsyncEngine], name: str) -> None:
+        sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        dialect = sync_engine.dialect
+        metrics = get_pool_metrics(name)
+        threshold = self.idle_threshold
+
+        @event.listens_for(sync_engine, "checkin")
+        def remember_checkin(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(sync_engine, "checkout")
+        def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < threshold:
+                return
+            metrics.pings += 1
+            try:
+                dialect.do_ping(dbapi_connection)
+            except Exception as e:
+                metrics.ping_failures += 1
+                logger.warning(f"Discarding stale {name} database connection: {str(e)}")
+                # The pool discards this connection and retries with a fresh one
+                raise DisconnectionError() from e
+
+
+LIVENESS_POLICIES = {
+    LIVENESS_ALWAYS: AlwaysPingPolicy,
+    LIVENESS_IDLE: IdlePingPolicy,
+    LIVENESS_NEVER: NeverPingPolicy,
+}
+
+
+def get_liveness_policy(name: str = env.DB_LIVENESS_POLICY) -> LivenessPolicy:
+    """
+    Return the liveness policy configured by `DB_LIVENESS_POLICY`.
+
+    Args:
+        name (str): "always", "idle" or "never".
+
+    Returns:
+        LivenessPolicy: Policy instance.
+    """
+    if name not in LIVENESS_POLICIES:
+        raise ValueError(f"Unknown DB_LIVENESS_POLICY '{name}', expected one of {list(LIVENESS_POLICIES)}")
+    return LIVENESS_POLICIES[name]()
+
+
+def instrument_engine(engine: Union[Engine, AsyncEngine], name: str) -> None:
+    """
+    Record checkout duration and overflow usage of `engine`'s pool into `PoolMetrics(name)`.
+
+    The checkout wait is recorded by the pool class itself (`Instrumented*QueuePool`); the
+    engine must be created with `pool_logging_name=name` for both to land in the same metrics.
+
+    Args:
+        engine (Union[Engine, AsyncEngine]): Engine to instrument.
+        name (str): Pool name.
+
+    Example:
+        >>> engine = create_async_engine(
+        ...     uri, poolclass=InstrumentedAsyncAdaptedQueuePool, pool_logging_name="primary"
+        ... )
+        >>> instrument_engine(engine, "primary")
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    metrics = get_pool_metrics(name)
+    metrics.pool_size = sync_engine.pool.size()
+    metrics.max_overflow = sync_engine.pool._max_overflow
+
+    @event.listens_for(sync_engine, "checkout")
+    def start_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        metrics.overflow.observe(max(sync_engine.pool.overflow(), 0))
+
+    @event.listens_for(sync_engine, "checkin")
+    def end_checkout(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.checkout_duration.observe(time.perf_counter() - checked_out_at)
@@ -0,0 +1,148 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.env import env
+from dependencies.query_monitor import normalize_sql
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class NPlusOneError(Exception):
+    """Raised by `count_queries(raise_on_n_plus_one=True)` when an N+1 pattern is detected."""
+
+
+class RequestQueries:
+    """
+    Statements and lazy relationship loads issued within one `count_queries` block.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self):
+        self.total = 0
+        # Raw statement text -> executions; SQLAlchemy statements are parameterized, so the
+        # same text means the same shape (expanded IN lists are merged in `repeated_shapes`)
+        self.statements: Counter = Counter()
+        # "<Model>.<relationship>" -> lazy loads
+        self.lazy_loads: Counter = Counter()
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        """Normalized statements executed at least `threshold` times."""
+        shapes: Counter = Counter()
+        for statement, count in self.statements.items():
+            shapes[normalize_sql(statement)] += count
+        return {shape: count for shape, count in shapes.most_common() if count >= threshold}
+
+    def problems(self, threshold: int) -> List[str]:
+        """Human readable N+1 findings: repeated same-shape statements and lazy loads."""
+        problems = [
+            f"{count}x same statement: {shape}"
+            for shape, count in self.repeated_shapes(threshold).items()
+        ]
+        problems.extend(
+            f"{count}x lazy load of {relationship}: add it to `include` or use a batch loader"
+            for relationship, count in self.lazy_loads.most_common()
+        )
+        return problems
+
+
+# Statements of the current request, set by `count_queries` (None = not counting)
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def get_request_queries() -> Optional[RequestQueries]:
+    """Statements counted so far in the current `count_queries` block, or None."""
+    return _request_queries.get()
+
+
+@contextmanager
+def count_queries(
+    label: str = "block",
+    threshold: int = env.DB_N_PLUS_ONE_THRESHOLD,
+    raise_on_n_plus_one: bool = False,
+) -> Iterator[RequestQueries]:
+    """
+    Count the statements of the block and flag N+1 patterns when it ends.
+
+    A statement shape executed `threshold` times or more, or any lazy relationship load,
+    is logged as a warning (or raised as `NPlusOneError`, e.g. in tests).
+
+    Args:
+        label (str): Name of the block in the warning, e.g. "GET /api/v1/users".
+        threshold (int): Executions of one statement shape that count as N+1.
+        raise_on_n_plus_one (bool): Raise `NPlusOneError` instead of logging.
+
+    Example:
+        >>> with count_queries("list users", raise_on_n_plus_one=True) as queries:
+        ...     users = await orm_crud_user.get_multi(db)
+        >>> queries.total
+        2
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    queries = RequestQueries()
+    token = _request_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        _request_queries.reset(token)
+
+    problems = queries.problems(threshold)
+    if problems:
+        message = f"Possible N+1 in {label} ({queries.total} statements): " + "; ".join(problems)
+        if raise_on_n_plus_one:
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def attach_lazy_load_detection(session_class: type) -> None:
+    """
+    Count the lazy relationship loads of `session_class` in the current `count_queries` block.
+
+    Under `AsyncSession` a lazy load outside a greenlet fails with `MissingGreenlet`; the
+    load is still counted (the event fires first), so the warning names the relationship.
+
+    Args:
+        session_class (type): Sync `Session` class, e.g. the `sync_session_class` of `AsyncSessionLocal`.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    @event.listens_for(session_class, "do_orm_execute")
+    def count_lazy_load(orm_execute_state: Any) -> None:
+        queries = _request_queries.get()
+        if queries is None or orm_execute_state.lazy_loaded_from is None:
+            return
+        path = orm_execute_state.loader_strategy_path
+        relationship = path[-1] if path is not None and len(path) else None
+        name = getattr(relationship, "key", None) or "<relationship>"
+        queries.lazy_loads[f"{orm_execute_state.lazy_loaded_from.class_.__name__}.{name}"] += 1
+
+
+def attach_statement_counting(engine: Union[Engine, AsyncEngine]) -> None:
+    """
+    Count the statements of `engine` in the current `count_queries` block.
+
+    Args:
+        engine (Union[Engine, AsyncEngine]): Engine to watch.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.total += 1
+            queries.statements[statement] += 1
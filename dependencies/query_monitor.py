@@ -0,0 +1,307 @@
+import functools
+import inspect
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Union
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.env import env
+from utils import serializer
+from utils.logger import setup_logger
+from utils.metrics import LATENCY_BUCKETS, ROW_BUCKETS, Histogram
+from utils.request_timing import span
+
+logger = setup_logger()
+
+# Tag of statements issued outside any repository method
+UNTAGGED = "untagged"
+
+# Longest normalized SQL kept in logs and slow query records
+MAX_SQL_LENGTH = 2000
+
+# Number of recent slow queries kept for /monitoring/db-queries
+SLOW_QUERY_HISTORY = 50
+
+# "<Repository>.<method>" currently issuing statements, set by `tag_queries`
+_query_tag: ContextVar[Optional[str]] = ContextVar("query_tag", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$:%])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|\$\d+|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%s|%\(\w+\)s|:\w+))+\s*\)"
+)
+_VALUES_ROWS = re.compile(r"(VALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Normalize a statement so that executions differing only by values look the same.
+
+    Literals become `?`, lists of placeholders (expanded `IN`) and multi-row `VALUES`
+    collapse, whitespace is squeezed and the result is truncated to MAX_SQL_LENGTH.
+
+    Args:
+        statement (str): SQL as sent to the driver.
+
+    Returns:
+        str: Normalized SQL.
+
+    Example:
+        >>> normalize_sql("SELECT * FROM users WHERE id IN ($1, $2, $3) AND age > 18")
+        'SELECT * FROM users WHERE id IN (...) AND age > ?'
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1, ...", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return sql if len(sql) <= MAX_SQL_LENGTH else sql[:MAX_SQL_LENGTH] + "..."
+
+
+@contextmanager
+def query_tag(tag: str) -> Iterator[None]:
+    """
+    Tag the statements of the block, unless an enclosing block already tagged them.
+
+    Example:
+        >>> with query_tag("get_user_role_by_user_id"):
+        ...     await db.execute(text(GET_USER_ROLE_ROLE_BY_USER_ID), params)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    if _query_tag.get() is not None:
+        yield
+        return
+    token = _query_tag.set(tag)
+    try:
+        yield
+    finally:
+        _query_tag.reset(token)
+
+
+def tag_queries(func: Callable) -> Callable:
+    """
+    Tag the statements of a repository method with "<Repository>.<method>", and time the
+    method as the request span "db.<Repository>.<method>".
+
+    The outermost tagged call wins: `get_one_by_or_fail` calling `get_one_by` is reported as
+    `get_one_by_or_fail`, the method the caller actually used. Async generator methods
+    (`stream_multi`) are tagged around every step, so the tag never leaks to the consumer.
+
+    Args:
+        func (Callable): Coroutine or async generator method.
+
+    Returns:
+        Callable: Wrapped method.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    name = func.__name__
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def generator_wrapper(self, *args: Any, **kwargs: Any):
+            tag = f"{type(self).__name__}.{name}"
+            iterator = func(self, *args, **kwargs).__aiter__()
+            try:
+                while True:
+                    with query_tag(tag), span(f"db.{tag}"):
+                        try:
+                            item = await iterator.__anext__()
+                        except StopAsyncIteration:
+                            return
+                    yield item
+            finally:
+                with query_tag(tag):
+                    await iterator.aclose()
+
+        generator_wrapper.__query_tagged__ = True
+        return generator_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any):
+        tag = f"{type(self).__name__}.{name}"
+        with query_tag(tag), span(f"db.{tag}"):
+            return await func(self, *args, **kwargs)
+
+    wrapper.__query_tagged__ = True
+    return wrapper
+
+
+def tag_repository_methods(cls: type) -> None:
+    """Wrap every public async method of a repository class (inherited ones included) with `tag_queries`."""
+    for name in dir(cls):
+        if name.startswith("_"):
+            continue
+        attribute = getattr(cls, name)
+        if getattr(attribute, "__query_tagged__", False):
+            continue
+        if inspect.iscoroutinefunction(attribute) or inspect.isasyncgenfunction(attribute):
+            setattr(cls, name, tag_queries(attribute))
+
+
+class QueryMetrics:
+    """
+    Latency and row count histograms of the statements issued under one tag.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.slow = 0
+        self.errors = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "latency_seconds": self.latency.snapshot(),
+            "rows": self.rows.snapshot(),
+            "slow": self.slow,
+            "errors": self.errors,
+        }
+
+
+_query_metrics: Dict[str, QueryMetrics] = {}
+_slow_queries: Deque[Dict[str, Any]] = deque(maxlen=SLOW_QUERY_HISTORY)
+
+
+def get_query_metrics(tag: str) -> QueryMetrics:
+    metrics = _query_metrics.get(tag)
+    if metrics is None:
+        metrics = _query_metrics.setdefault(tag, QueryMetrics(tag))
+    return metrics
+
+
+def get_query_stats() -> Dict[str, Any]:
+    """
+    Snapshot of every tag (most total time first) and of the most recent slow queries.
+
+    Returns:
+        Dict[str, Any]: {"queries": {tag: metrics}, "slow_queries": [...]}.
+    """
+    snapshots = [(tag, metrics.snapshot()) for tag, metrics in list(_query_metrics.items())]
+    snapshots.sort(key=lambda item: item[1]["latency_seconds"]["sum"], reverse=True)
+    return {"queries": dict(snapshots), "slow_queries": list(_slow_queries)}
+
+
+def _get_row_count(cursor: Any) -> Optional[int]:
+    """Rows affected or returned; asyncpg reports -1 for SELECT but keeps the fetched rows."""
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount is not None and rowcount >= 0:
+        return rowcount
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if isinstance(rows, list) else None
+
+
+def _explain_analyze(dbapi_connection: Any, statement: str, parameters: Any) -> str:
+    """
+    Re-run a SELECT with EXPLAIN ANALYZE on the same connection, inside a savepoint that is
+    rolled back so neither a side effect nor an error can leak into the caller's transaction.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SAVEPOINT slow_query_explain")
+    try:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    finally:
+        cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        cursor.close()
+
+
+def instrument_queries(
+    engine: Union[Engine, AsyncEngine],
+    name: str,
+    slow_threshold_ms: float = env.DB_SLOW_QUERY_THRESHOLD_MS,
+    explain: bool = env.DB_SLOW_QUERY_EXPLAIN and env.ENV != "production",
+    explain_sample_rate: float = env.DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+) -> None:
+    """
+    Record latency and row count of every statement of `engine` under its query tag, and log
+    statements slower than `slow_threshold_ms` as one JSON record with the normalized SQL.
+
+    With `explain` (never in production), a sampled share of the slow SELECTs on Postgres is
+    re-run with EXPLAIN ANALYZE and the plan is added to the record. The statement runs twice,
+    so keep the sample rate low.
+
+    Args:
+        engine (Union[Engine, AsyncEngine]): Engine to instrument.
+        name (str): Engine name in the slow query records ("primary", "replica-0", "sync").
+        slow_threshold_ms (float): Slow query threshold in milliseconds.
+        explain (bool): Whether slow SELECTs may be explained.
+        explain_sample_rate (float): Share (0..1) of slow SELECTs explained.
+
+    Example:
+        >>> instrument_queries(async_engine, "primary")
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    slow_threshold = slow_threshold_ms / 1000
+    explain = explain and sync_engine.dialect.name == "postgresql"
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        tag = _query_tag.get() or UNTAGGED
+        metrics = get_query_metrics(tag)
+        metrics.latency.observe(elapsed)
+        rows = _get_row_count(cursor)
+        if rows is not None:
+            metrics.rows.observe(rows)
+        if elapsed < slow_threshold:
+            return
+
+        metrics.slow += 1
+        record = {
+            "event": "slow_query",
+            "engine": name,
+            "tag": tag,
+            "duration_ms": round(elapsed * 1000, 2),
+            "rows": rows,
+            "executemany": executemany,
+            "sql": normalize_sql(statement),
+        }
+        if (
+            explain
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < explain_sample_rate
+        ):
+            try:
+                record["plan"] = _explain_analyze(
+                    conn.connection.dbapi_connection, statement, parameters
+                )
+            except Exception as e:
+                record["plan_error"] = str(e)
+        _slow_queries.append(record)
+        logger.warning(serializer.dumps_str(record))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def count_error(exception_context):
+        get_query_metrics(_query_tag.get() or UNTAGGED).errors += 1
+
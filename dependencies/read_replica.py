@@ -0,0 +1,235 @@
+import asyncio
+import functools
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from config.env import env
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+# Set while an ORMCRUDBase read method runs: only those reads may go to a replica
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+# Set inside `use_primary()`: overrides `replica_read`
+_force_primary: ContextVar[bool] = ContextVar("force_primary", default=False)
+
+# Monotonic time of the last committed write in this request (read-your-writes window)
+_last_write_at: ContextVar[float] = ContextVar("last_write_at", default=0.0)
+
+# Session.info key marking a session whose current transaction has written
+_WROTE_KEY = "routing_wrote"
+
+
+def replica_read(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Mark a repository read method as safe to serve from a read replica.
+
+    Example:
+        >>> @replica_read
+        ... async def get(self, db, id): ...
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        token = _replica_reads.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """
+    Force the reads of the block to the primary, e.g. a read that decides a write.
+
+    Example:
+        >>> with use_primary():
+        ...     user = await orm_crud_user.get(db, user_id)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def has_pending_writes(session: Session) -> bool:
+    """
+    Whether the session holds writes that another connection could not see yet.
+
+    True for unflushed changes and for DML already flushed/executed in the current
+    transaction (tracked by the routing session until commit or rollback).
+
+    Example:
+        >>> if not has_pending_writes(db.sync_session):
+        ...     ...  # safe to read on a second session
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    return bool(session.new or session.dirty or session.deleted or session.info.get(_WROTE_KEY))
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the healthy read replicas, kept up to date by a background health check.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        health_check_interval: float = env.DB_REPLICA_HEALTH_CHECK_INTERVAL,
+        read_your_writes_window: float = env.DB_READ_YOUR_WRITES_WINDOW,
+    ):
+        """
+        Args:
+            engines (List[AsyncEngine]): One engine per replica.
+            health_check_interval (float): Seconds between two health checks of every replica.
+            read_your_writes_window (float): Seconds after a commit during which reads of the
+                same request stay on the primary.
+        """
+        self.engines = engines
+        self.health_check_interval = health_check_interval
+        self.read_your_writes_window = read_your_writes_window
+        # Optimistically healthy until the first check says otherwise
+        self._healthy: Dict[AsyncEngine, bool] = {engine: True for engine in engines}
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._health_task: Optional[asyncio.Task] = None
+
+    def next_replica(self) -> Optional[AsyncEngine]:
+        """Return the next healthy replica, or None if there is none."""
+        for _ in range(len(self.engines)):
+            engine = next(self._cycle)
+            if self._healthy[engine]:
+                return engine
+        return None
+
+    def should_use_replica(self, session: Session) -> bool:
+        """True if a read issued now by `session` may be served by a replica."""
+        if not self.engines or not _replica_reads.get() or _force_primary.get():
+            return False
+        if session._flushing or session.info.get(_WROTE_KEY):
+            return False
+        return time.monotonic() - _last_write_at.get() >= self.read_your_writes_window
+
+    def get_health(self) -> List[Dict[str, Any]]:
+        """Health of every replica (host and database only, never credentials)."""
+        return [
+            {
+                "host": engine.url.host,
+                "database": engine.url.database,
+                "healthy": self._healthy[engine],
+            }
+            for engine in self.engines
+        ]
+
+    async def check_health(self) -> None:
+        """Run `SELECT 1` on every replica and update its health."""
+        for engine in self.engines:
+            try:
+                async with engine.connect() as connection:
+                    await asyncio.wait_for(
+                        connection.execute(text("SELECT 1")), self.health_check_interval
+                    )
+                healthy = True
+            except Exception as e:
+                healthy = False
+                error = str(e)
+            if healthy != self._healthy[engine]:
+                if healthy:
+                    logger.info(f"Read replica {engine.url.host} is back")
+                else:
+                    logger.warning(f"Read replica {engine.url.host} is unhealthy: {error}")
+            self._healthy[engine] = healthy
+
+    async def start_health_check(self) -> None:
+        """Start the background health check (idempotent, no-op without replicas)."""
+        if self.engines and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._run_health_check())
+
+    async def stop_health_check(self) -> None:
+        """Stop the background health check."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def dispose(self) -> None:
+        """Close every replica connection pool."""
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run_health_check(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+
+def create_routing_session_class(router: ReplicaRouter) -> type:
+    """
+    Build the sync `Session` class used by `AsyncSessionLocal` (via `sync_session_class`).
+
+    Statements go to the session bind (the primary) unless `router.should_use_replica`
+    allows a healthy replica. DML statements and flushes always hit the primary and mark
+    the session as having written until its transaction ends; a commit after a write also
+    starts the read-your-writes window of the current request.
+
+    Args:
+        router (ReplicaRouter): Replica router.
+
+    Returns:
+        type: `Session` subclass.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    class RoutingSession(Session):
+        def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+            if bind is None and clause is not None and getattr(clause, "is_dml", False):
+                self.info[_WROTE_KEY] = True
+            elif bind is None and clause is not None and router.should_use_replica(self):
+                replica = router.next_replica()
+                if replica is not None:
+                    return replica.sync_engine
+            return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @event.listens_for(RoutingSession, "after_flush")
+    def mark_write(session: Session, flush_context: Any) -> None:
+        session.info[_WROTE_KEY] = True
+
+    @event.listens_for(RoutingSession, "after_commit")
+    def start_read_your_writes_window(session: Session) -> None:
+        if session.info.pop(_WROTE_KEY, False):
+            _last_write_at.set(time.monotonic())
+
+    @event.listens_for(RoutingSession, "after_rollback")
+    def clear_write(session: Session) -> None:
+        session.info.pop(_WROTE_KEY, None)
+
+    return RoutingSession
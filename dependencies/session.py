@@ -1,37 +1,190 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+import time
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import Engine, create_engine, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from config.env import Env, env
+from databases.base.class_base import Base
+from dependencies.pool_monitor import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    get_liveness_policy,
+    instrument_engine,
+)
+from dependencies.query_counter import attach_lazy_load_detection, attach_statement_counting
+from dependencies.query_monitor import instrument_queries
+from dependencies.read_replica import ReplicaRouter, create_routing_session_class
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Checks connections on checkout (by default only those idle for a while), see DB_LIVENESS_POLICY
+liveness_policy = get_liveness_policy()
+
+
+def _create_instrumented_async_engine(uri: str, name: str) -> AsyncEngine:
+    """Create an async engine with the configured pool sizes, liveness policy, pool and query metrics."""
+    engine = create_async_engine(
+        uri,
+        pool_size=env.DB_POOL_SIZE,  # Default number of connections to keep in the pool
+        max_overflow=env.DB_MAX_OVERFLOW,  # Extra connections allowed when pool is full
+        pool_timeout=env.DB_POOL_TIMEOUT,  # Max seconds to wait for a connection before timing out
+        pool_recycle=env.DB_POOL_RECYCLE,  # Reconnect if a connection is older than this (seconds)
+        poolclass=InstrumentedAsyncAdaptedQueuePool,  # Records checkout wait times
+        pool_logging_name=name,  # Names the pool metrics
+        future=True,  # Use the future (SQLAlchemy 2.0) style engine
+        **liveness_policy.engine_kwargs(),
+    )
+    liveness_policy.attach(engine, name)
+    instrument_engine(engine, name)
+    instrument_queries(engine, name)
+    if env.DB_N_PLUS_ONE_DETECTION:
+        attach_statement_counting(engine)
+    return engine
 
-async_engine = create_async_engine(
-    env.SQLALCHEMY_ADOOR_URI.unicode_string(),
-    pool_size=10,  # Default number of connections to keep in the pool
-    max_overflow=20,  # Extra connections allowed when pool is full
-    pool_timeout=30,  # Max seconds to wait for a connection before timing out
-    pool_recycle=1800,  # Reconnect if a connection is older than 1800s (30 min)
-    pool_pre_ping=True,  # Ping the connection before using to ensure it's valid
-    future=True,  # Use the future (SQLAlchemy 2.0) style engine
+
+async_engine = _create_instrumented_async_engine(
+    env.SQLALCHEMY_ADOOR_URI.unicode_string(), "primary"
 )
 
-# Create an async session factory
+# Read replicas: same pool settings as the primary
+replica_engines = [
+    _create_instrumented_async_engine(uri.strip(), f"replica-{index}")
+    for index, uri in enumerate(
+        uri for uri in env.SQLALCHEMY_ADOOR_REPLICA_URIS.split(",") if uri.strip()
+    )
+]
+replica_router = ReplicaRouter(replica_engines)
+RoutingSession = create_routing_session_class(replica_router)
+if env.DB_N_PLUS_ONE_DETECTION:
+    attach_lazy_load_detection(RoutingSession)
+
+# Create an async session factory; ORMCRUDBase reads may be routed to a replica
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False,
 )
 
 
-engine = create_engine(
-    env.SQLALCHEMY_ADOOR_URI.unicode_string(),
-    pool_size=20,
-    max_overflow=40,
-    pool_timeout=60,
-    pool_recycle=3600,
-    pool_pre_ping=True,
-)
+async def _warm_up_connection(connection: AsyncConnection) -> None:
+    """Prime one pooled connection: server round trip plus the by-id lookup of every model."""
+    await connection.execute(text("SELECT 1"))
+    # asyncpg caches prepared statements per connection; the by-id SELECT of each table is
+    # the hottest statement (session.get), so prepare it ahead of the first request
+    for mapper in Base.registry.mappers:
+        model = mapper.class_
+        if hasattr(model, "id"):
+            await connection.execute(select(model).where(model.id == uuid.UUID(int=0)))
+
+
+async def warm_up_engine(connections: int = env.DB_POOL_WARMUP_CONNECTIONS) -> None:
+    """
+    Open `connections` pooled connections ahead of the first requests and prime them.
+
+    The count is capped at the pool size so every warmed connection stays in the pool.
+    Failures are logged, not raised: the application still starts if Postgres is late.
+
+    Args:
+        connections (int): Number of connections to open.
+
+    Example:
+        >>> await warm_up_engine(5)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    connections = min(connections, env.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+
+    start = time.perf_counter()
+    opened = []
+    try:
+        # Check the connections out together so the pool really creates `connections` of them
+        results = await asyncio.gather(
+            *(async_engine.connect() for _ in range(connections)), return_exceptions=True
+        )
+        opened = [result for result in results if isinstance(result, AsyncConnection)]
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        await asyncio.gather(*(_warm_up_connection(connection) for connection in opened))
+        logger.info(
+            f"Database pool warmed up: {connections} connections in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {str(e)}")
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+_engine: Optional[Engine] = None
+_session_local: Optional[sessionmaker] = None
+
+
+def get_sync_engine() -> Engine:
+    """
+    Return the sync engine (psycopg2), created on first use.
+
+    The API only uses `async_engine`; the sync engine is meant for CLI commands and scripts.
+
+    Returns:
+        Engine: The sync SQLAlchemy engine.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            env.SQLALCHEMY_ADOOR_URI.unicode_string().replace(
+                "postgresql+asyncpg://", "postgresql+psycopg2://", 1
+            ),
+            pool_size=env.DB_SYNC_POOL_SIZE,
+            max_overflow=env.DB_SYNC_MAX_OVERFLOW,
+            pool_timeout=60,
+            pool_recycle=3600,
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name="sync",
+            **liveness_policy.engine_kwargs(),
+        )
+        liveness_policy.attach(_engine, "sync")
+        instrument_engine(_engine, "sync")
+        instrument_queries(_engine, "sync")
+    return _engine
+
+
+def get_sync_session_factory() -> sessionmaker:
+    """
+    Return the sync session factory bound to `get_sync_engine()`, created on first use.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    global _session_local
+    if _session_local is None:
+        _session_local = sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
+    return _session_local
 
 
-# Create a session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str) -> Any:
+    # Backwards compatible lazy access to `engine` / `SessionLocal`
+    if name == "engine":
+        return get_sync_engine()
+    if name == "SessionLocal":
+        return get_sync_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
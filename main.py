@@ -1,16 +1,66 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.gzip import GZipMiddleware
 
 from api.v1.api import api_router
 from config.env import env
-from middleware.auth_session_middleware import check_auth_session_middleware
+from core.auth_cache import user_role_cache
+from core.cdn import cdn_handler
+from core.email_outbox import email_outbox
+from core.session_activity import session_activity
+from dependencies.database_redis import close_redis_pool, init_redis_pool
+from dependencies.session import async_engine, replica_router, warm_up_engine
+from middleware.auth_session_middleware import add_auth_session_middleware
 from middleware.cookie_session_middleware import add_cookie_session_middleware
 from middleware.cors_middleware import add_cors_middleware
+from middleware.query_counter_middleware import add_query_counter_middleware
+from middleware.request_timing_middleware import add_request_timing_middleware
+from utils.http_client import http_client
 from utils.logger import setup_logger
+from utils.serializer import FastJSONResponse
 
 logger = setup_logger()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop application-wide background resources"""
+    # One Redis connection pool shared by the whole process
+    init_redis_pool()
+
+    # Open and prime database connections before the first request needs them
+    await warm_up_engine()
+
+    # Track read replica health (no-op without replicas)
+    await replica_router.start_health_check()
+
+    # Listen for auth cache invalidations published by other workers
+    await user_role_cache.start_listener()
+
+    # Flush coalesced session last-activity writes in the background
+    await session_activity.start_flusher()
+
+    # Open the shared outbound HTTP connection pool
+    await http_client.start()
+
+    # Send queued emails in the background (may run in dedicated worker processes only)
+    if env.EMAIL_OUTBOX_WORKER:
+        await email_outbox.start()
+
+    yield
+
+    await email_outbox.stop()
+    await http_client.aclose()
+    cdn_handler.close()
+    await session_activity.stop_flusher()
+    await user_role_cache.stop_listener()
+    await close_redis_pool()
+    await replica_router.stop_health_check()
+    await replica_router.dispose()
+    await async_engine.dispose()
+
+
 def create_application():
     """Create and configure the FastAPI application"""
     # Create FastAPI application
@@ -20,6 +70,8 @@ def create_application():
         version="1.0.0",
         docs_url="/docs" if env.ENV != "production" else None,
         redoc_url="/redoc" if env.ENV != "production" else None,
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
 
     # Configure middleware (order matters)
@@ -46,8 +98,14 @@ def configure_middleware(app):
     # Compression middleware
     app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-    # Auth session last
-    app.middleware("http")(check_auth_session_middleware)
+    # Auth session last (pure ASGI, no BaseHTTPMiddleware task/stream wrapping)
+    add_auth_session_middleware(app)
+
+    # N+1 detection (dev/test only): counts the database statements of each request
+    add_query_counter_middleware(app)
+
+    # Request timing (Server-Timing header) last, so it wraps the whole stack
+    add_request_timing_middleware(app)
 
 
 def configure_routes(app):
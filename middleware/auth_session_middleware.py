@@ -1,21 +1,122 @@
+from typing import Optional
+
 from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from container.container import container
+from core.session_activity import session_activity
+from utils.prefix_trie import PrefixTrie
+from utils.request_timing import span
 
-auth_service = container.get_service("auth")
 translation = container.get_util("translation")
 logger = container.get_util("logger")
 
+# Public endpoints that don't require authentication, compiled once into a prefix trie
+PUBLIC_ENDPOINTS = PrefixTrie(
+    [
+        "/api/v1/health",
+        "/api/v1/users/assign-role",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+    ]
+)
+
+
+class AuthSessionMiddleware:
+    """
+    Pure ASGI middleware checking authentication session validity and recording user activity.
+
+    Same checks as `check_auth_session_middleware`, without the `BaseHTTPMiddleware`
+    machinery: no extra task per request, no wrapping of the response body stream, and
+    public endpoints are passed straight through. Rejections are sent as the JSON body an
+    `HTTPException` would produce (`{"detail": ...}`).
+
+    Example:
+        >>> app.add_middleware(AuthSessionMiddleware)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or PUBLIC_ENDPOINTS.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self._check_session(scope)
+        if rejection is not None:
+            await rejection(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _check_session(self, scope: Scope) -> Optional[JSONResponse]:
+        """
+        Validate the session of the request.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+
+        Returns:
+            Optional[JSONResponse]: Error response to send, or None if the request may proceed.
+        """
+        try:
+            # `request.state` is backed by scope["state"]
+            state = scope.get("state") or {}
+            if "user_id" not in state:
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": translation.Auth["UnauthorizedAccess"]},
+                )
+
+            user_id = state["user_id"]
+
+            # Check session validity and record activity (write-behind)
+            with span("auth.session"):
+                is_valid = await session_activity.validate_and_touch(user_id)
+            if not is_valid:
+                logger.info(f"Session expired for user {user_id}")
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": translation.Auth["SessionExpired"]},
+                )
+            return None
+
+        except Exception as e:
+            logger.error(f"Error in auth session middleware: {str(e)}")
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"detail": translation.Auth["SessionCreationFailed"]},
+            )
+
+
+def add_auth_session_middleware(app):
+    """
+    Add the pure ASGI auth session middleware to the FastAPI application.
+
+    Args:
+        app: FastAPI application instance
+    """
+    app.add_middleware(AuthSessionMiddleware)
+
 
 async def check_auth_session_middleware(request: Request, call_next):
     """
     Middleware to check authentication session validity and manage user activity timeouts.
 
+    `BaseHTTPMiddleware` flavour (registered with `app.middleware("http")`), kept for
+    comparison in `cli/benchmark/middleware_stack.py`; the application uses `AuthSessionMiddleware`.
+
     This middleware:
     1. Skips authentication for public endpoints
     2. Verifies user is authenticated
-    3. Checks if the session is still valid (not timed out)
-    4. Updates the user's last activity timestamp
+    3. Checks if the session is still valid (not timed out) and records the
+       user's activity, in a single Redis round trip (see `SessionActivityEngine`)
 
     Args:
         request: FastAPI request object
@@ -24,17 +125,8 @@ async def check_auth_session_middleware(request: Request, call_next):
     Returns:
         Response from the next middleware
     """
-    # List of public endpoints that don't require authentication
-    public_endpoints = [
-        "/api/v1/health",
-        "/api/v1/users/assign-role",
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-    ]
-
     # Skip session checks for public endpoints
-    if any(request.url.path.startswith(endpoint) for endpoint in public_endpoints):
+    if PUBLIC_ENDPOINTS.match(request.url.path):
         return await call_next(request)
 
     # Continue processing for protected endpoints
@@ -49,8 +141,9 @@ async def check_auth_session_middleware(request: Request, call_next):
         # Get user_id from token
         user_id = request.state.user_id
 
-        # Check session validity
-        is_valid = await auth_service._check_session_validity(user_id)
+        # Check session validity and record activity (write-behind)
+        with span("auth.session"):
+            is_valid = await session_activity.validate_and_touch(user_id)
         if not is_valid:
             logger.info(f"Session expired for user {user_id}")
             raise HTTPException(
@@ -58,9 +151,6 @@ async def check_auth_session_middleware(request: Request, call_next):
                 detail=translation.Auth["SessionExpired"],
             )
 
-        # Update last activity timestamp
-        await auth_service._update_user_activity(user_id)
-
         # Continue with the request
         response = await call_next(request)
         return response
@@ -1,18 +1,205 @@
-from starlette.middleware.sessions import SessionMiddleware
+import json
+from base64 import b64decode, b64encode
+from typing import Any, Dict, Iterator, MutableMapping, Optional
+
+import itsdangerous
+from itsdangerous.exc import BadSignature
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config.env import env
 
+# Signed payload of an empty session (`{}`), which Starlette does not send back
+EMPTY_SESSION = b64encode(b"{}")
+
+
+class LazySession(MutableMapping[str, Any]):
+    """
+    Session mapping that only reads and verifies the session cookie on first access.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, scope: Scope, middleware: "LazySessionMiddleware"):
+        self._scope = scope
+        self._middleware = middleware
+        self._data: Optional[Dict[str, Any]] = None
+        self.initial_was_empty = True
+
+    @property
+    def loaded(self) -> bool:
+        """True once the cookie has been decoded (i.e. the session was accessed)."""
+        return self._data is not None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._middleware.load(self._scope)
+            self.initial_was_empty = not self._data
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"LazySession({self.data!r})"
+
+
+class LazySessionMiddleware:
+    """
+    Pure ASGI cookie session middleware, compatible with Starlette's `SessionMiddleware`
+    (same cookie format, signer and flags, `request.session` works unchanged).
+
+    The cookie is only JSON-decoded when `request.session` is actually used. Like Starlette,
+    every request carrying a non-empty session gets its cookie back with a fresh `Max-Age`
+    (sliding expiry); when the session was not used, the signed payload is re-signed as is,
+    without decoding it. Requests without a session cookie pay nothing.
+
+    Starlette's `SessionMiddleware` is already pure ASGI: the gain of this class is limited
+    to the JSON decode/encode skipped on requests that do not use the session.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: Optional[int] = 14 * 24 * 60 * 60,  # 14 days, in seconds
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+        domain: Optional[str] = None,
+    ):
+        self.app = app
+        self.signer = itsdangerous.TimestampSigner(str(secret_key))
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:  # Secure flag can be used with HTTPS only
+            self.security_flags += "; secure"
+        if domain is not None:
+            self.security_flags += f"; domain={domain}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        session = LazySession(scope, self)
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                if session.loaded:
+                    header_value = self.build_cookie(session)
+                else:
+                    header_value = self.refresh_cookie(scope)
+                if header_value is not None:
+                    MutableHeaders(scope=message).append("Set-Cookie", header_value)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def load(self, scope: Scope) -> Dict[str, Any]:
+        """
+        Decode the session cookie of the request.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+
+        Returns:
+            Dict[str, Any]: Session data, empty if the cookie is missing or its signature is invalid.
+        """
+        cookie = HTTPConnection(scope).cookies.get(self.session_cookie)
+        if cookie is None:
+            return {}
+        try:
+            data = self.signer.unsign(cookie.encode("utf-8"), max_age=self.max_age)
+            return json.loads(b64decode(data))
+        except BadSignature:
+            return {}
+
+    def refresh_cookie(self, scope: Scope) -> Optional[str]:
+        """
+        Build the `Set-Cookie` value renewing the `Max-Age` of an unused, non-empty session.
+
+        Args:
+            scope (Scope): ASGI connection scope.
+
+        Returns:
+            Optional[str]: Header value, or None if the request has no valid, non-empty session.
+        """
+        cookie = HTTPConnection(scope).cookies.get(self.session_cookie)
+        if cookie is None:
+            return None
+        try:
+            data = self.signer.unsign(cookie.encode("utf-8"), max_age=self.max_age)
+        except BadSignature:
+            return None
+        if data == EMPTY_SESSION:
+            return None
+        return self._cookie_header(self.signer.sign(data))
+
+    def build_cookie(self, session: LazySession) -> Optional[str]:
+        """
+        Build the `Set-Cookie` value persisting (or clearing) a loaded session.
+
+        Args:
+            session (LazySession): Session of the request.
+
+        Returns:
+            Optional[str]: Header value, or None if there is nothing to send.
+        """
+        if session.data:
+            # We have session data to persist
+            return self._cookie_header(
+                self.signer.sign(b64encode(json.dumps(session.data).encode("utf-8")))
+            )
+        if not session.initial_was_empty:
+            # The session has been cleared
+            return (
+                f"{self.session_cookie}=null; path={self.path}; "
+                f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}"
+            )
+        return None
+
+    def _cookie_header(self, signed: bytes) -> str:
+        max_age = f"Max-Age={self.max_age}; " if self.max_age else ""
+        return (
+            f"{self.session_cookie}={signed.decode('utf-8')}; path={self.path}; "
+            f"{max_age}{self.security_flags}"
+        )
+
 
 def add_cookie_session_middleware(app):
     """
     Add cookie-based session middleware to the FastAPI application.
-    This middleware handles client-side session storage using encrypted cookies.
+    This middleware handles client-side session storage using signed cookies,
+    decoded lazily on first access (see `LazySessionMiddleware`).
 
     Args:
         app: FastAPI application instance
     """
     app.add_middleware(
-        SessionMiddleware,
+        LazySessionMiddleware,
         secret_key=env.JWT_SECRET_KEY,
         # session_cookie="ally_session",
         # max_age=1800,  # 30 minutes
@@ -0,0 +1,48 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.env import env
+from dependencies.query_counter import count_queries
+
+
+class QueryCounterMiddleware:
+    """
+    Pure ASGI middleware counting the database statements of every request (dev/test only).
+
+    Repeated same-shape statements and lazy relationship loads are logged as a possible N+1
+    when the request ends, and the count at response start is sent in `X-Query-Count`.
+
+    Example:
+        >>> app.add_middleware(QueryCounterMiddleware)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries(f"{scope['method']} {scope['path']}") as queries:
+
+            async def send_with_query_count(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-Query-Count", str(queries.total))
+                await send(message)
+
+            await self.app(scope, receive, send_with_query_count)
+
+
+def add_query_counter_middleware(app):
+    """
+    Add the N+1 detection middleware to the FastAPI application, if DB_N_PLUS_ONE_DETECTION is on.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if env.DB_N_PLUS_ONE_DETECTION:
+        app.add_middleware(QueryCounterMiddleware)
@@ -0,0 +1,75 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.env import env
+from utils.logger import setup_logger
+from utils.request_timing import request_timing
+
+logger = setup_logger()
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware timing every request: the spans recorded while handling it (auth,
+    repositories, cache, outbound HTTP) are sent in the `Server-Timing` header and, with
+    REQUEST_TIMING_LOG, logged when the request ends.
+
+    Added last, so it wraps (and times) the whole middleware stack.
+
+    Example:
+        >>> app.add_middleware(RequestTimingMiddleware)
+        >>> # Server-Timing: total;dur=14.2, auth.current_user;dur=3.1;desc="1x", ...
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        log: bool = env.REQUEST_TIMING_LOG,
+        log_threshold_ms: float = env.REQUEST_TIMING_LOG_THRESHOLD_MS,
+    ):
+        self.app = app
+        self.log = log
+        self.log_threshold_ms = log_threshold_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        with request_timing() as timing:
+
+            async def send_with_server_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    MutableHeaders(scope=message).append("Server-Timing", timing.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_server_timing)
+            finally:
+                if self.log and timing.elapsed() * 1000 >= self.log_threshold_ms:
+                    logger.info(
+                        {
+                            "event": "request_timing",
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status_code,
+                            **timing.to_dict(),
+                        }
+                    )
+
+
+def add_request_timing_middleware(app):
+    """
+    Add the request timing middleware to the FastAPI application, if REQUEST_TIMING is on.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if env.REQUEST_TIMING:
+        app.add_middleware(RequestTimingMiddleware)
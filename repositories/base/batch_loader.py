@@ -0,0 +1,118 @@
+import asyncio
+from functools import partial
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    DataLoader-style batching: every `load` issued in the same event loop iteration is
+    served by one call of `batch_load_fn`, and each key is loaded at most once per loader.
+
+    Create one loader per request (per `AsyncSession`); its cache is never invalidated.
+
+    Example:
+        >>> loader = orm_crud_user_session.loader(db)
+        >>> sessions = await asyncio.gather(*(loader.load(user.id) for user in users))
+        >>> # one SELECT ... WHERE user_id IN (...) for the whole page
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        default_factory: Optional[Callable[[], V]] = None,
+        max_batch_size: int = 1000,
+    ):
+        """
+        Args:
+            batch_load_fn (Callable[[List[K]], Awaitable[Dict[K, V]]]): Loads many keys at once
+                and returns their values by key; missing keys get `default_factory()`.
+            default_factory (Optional[Callable[[], V]]): Value of keys missing from the batch
+                result (None if not given).
+            max_batch_size (int): Keys per `batch_load_fn` call.
+        """
+        self._batch_load_fn = batch_load_fn
+        self._default_factory = default_factory
+        self._max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # Running batch tasks: the event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """Schedule the load of `key` with the current batch and return its (awaitable) future."""
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._futures[key] = loop.create_future()
+        self._queue.append(key)
+        if len(self._queue) == 1:
+            # Dispatch once every task already scheduled had the chance to add its keys
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[V]:
+        """Load `keys` in one batch and return their values in order."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Cache a value loaded elsewhere, so `load(key)` does not query it again."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._load_batches(keys))
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._on_batches_done, keys))
+
+    def _on_batches_done(self, keys: List[K], task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            error: BaseException = asyncio.CancelledError()
+        elif task.exception() is not None:
+            error = task.exception()
+            logger.error(f"Batch load of {len(keys)} key(s) failed: {error!r}")
+        else:
+            return
+        # Never leave a waiter hanging: fail the keys the task did not get to
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                del self._futures[key]
+                future.set_exception(error)
+
+    async def _load_batches(self, keys: List[K]) -> None:
+        # One batch after the other: the batches usually share one AsyncSession
+        for start in range(0, len(keys), self._max_batch_size):
+            batch = keys[start : start + self._max_batch_size]
+            try:
+                values = await self._batch_load_fn(batch)
+            except Exception as e:
+                for key in batch:
+                    # Forget failed keys so a later load retries them
+                    future = self._futures.pop(key)
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for key in batch:
+                future = self._futures[key]
+                if not future.done():
+                    future.set_result(
+                        values[key]
+                        if key in values
+                        else (self._default_factory() if self._default_factory else None)
+                    )
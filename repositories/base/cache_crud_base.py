@@ -1,8 +1,11 @@
-import json
-import uuid
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from utils import serializer
+from utils.request_timing import span, time_methods
 
 
 class CacheCRUDBase:
@@ -35,25 +38,6 @@ class CacheCRUDBase:
         """
         return f"{self.prefix}:{key}"
     
-    def _convert_uuids_to_strings(self, data: Dict) -> Dict:
-        """Convert UUID objects to strings in a dictionary."""
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, uuid.UUID):
-                result[key] = str(value)
-            elif isinstance(value, dict):
-                result[key] = self._convert_uuids_to_strings(value)
-            elif isinstance(value, list):
-                result[key] = [
-                    self._convert_uuids_to_strings(item) if isinstance(item, dict)
-                    else str(item) if isinstance(item, uuid.UUID)
-                    else item
-                    for item in value
-                ]
-            else:
-                result[key] = value
-        return result
-
     async def get(self, redis: Redis, key: str) -> Optional[Any]:
         """
         Retrieve a value from Redis.
@@ -72,7 +56,7 @@ class CacheCRUDBase:
             tranvanphuc.dev.it.2002@gmail.com
         """
         value = await redis.get(self._get_key(key))
-        return json.loads(value) if value else None
+        return serializer.loads(value) if value else None
 
     async def set(
         self, 
@@ -99,11 +83,8 @@ class CacheCRUDBase:
         Author:
             tranvanphuc.dev.it.2002@gmail.com    
         """
-        if isinstance(value, dict):
-            # Convert any UUID objects to strings in the dictionary
-            value = self._convert_uuids_to_strings(value)
-        
-        serialized = json.dumps(value)
+        # UUID/datetime values are encoded natively by the serializer, no pre-walk needed
+        serialized = serializer.dumps(value)
         expiry = expire_time if expire_time is not None else self.expire_time
         return await redis.set(self._get_key(key), serialized, ex=expiry)
 
@@ -241,4 +222,262 @@ class CacheCRUDBase:
         Author:
             tranvanphuc.dev.it.2002@gmail.com
         """
-        return await redis.hget(self._get_key(key), field)
\ No newline at end of file
+        return await redis.hget(self._get_key(key), field)
+
+    async def hgetall(self, redis: Redis, key: str) -> Dict[str, str]:
+        """
+        Get all fields and values of a hash.
+
+        Args:
+            redis (Redis): Redis connection instance
+            key (str): Hash key
+
+        Returns:
+            Dict[str, str]: Field-value mapping, empty if the key doesn't exist
+
+        Example:
+            >>> user = await crud.hgetall(redis, "user:123")
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        return await redis.hgetall(self._get_key(key))
+
+    async def hmset(
+        self,
+        redis: Redis,
+        key: str,
+        mapping: Dict[str, Any],
+        expire_time: Optional[int] = None,
+    ) -> int:
+        """
+        Set multiple hash fields and (optionally) the hash expiration in one round trip.
+
+        Args:
+            redis (Redis): Redis connection instance
+            key (str): Hash key
+            mapping (Dict[str, Any]): Field-value mapping to set
+            expire_time (Optional[int]): Expiration time of the whole hash in seconds
+
+        Returns:
+            int: Number of fields that were added
+
+        Example:
+            >>> count = await crud.hmset(redis, "user:123", {"name": "John"}, expire_time=600)
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        if expire_time is None:
+            return await redis.hset(self._get_key(key), mapping=mapping)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._get_key(key), mapping=mapping)
+            pipe.expire(self._get_key(key), expire_time)
+            added, _ = await pipe.execute()
+        return added
+
+    async def mget(self, redis: Redis, keys: Iterable[str]) -> List[Optional[Any]]:
+        """
+        Retrieve many values in a single round trip.
+
+        Args:
+            redis (Redis): Redis connection instance
+            keys (Iterable[str]): Keys to retrieve
+
+        Returns:
+            List[Optional[Any]]: Decoded values in the order of `keys`, None for missing keys
+
+        Example:
+            >>> sessions = await crud.mget(redis, user_ids)
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        values = await redis.mget([self._get_key(key) for key in keys])
+        return [serializer.loads(value) if value else None for value in values]
+
+    async def mset(
+        self,
+        redis: Redis,
+        mapping: Dict[str, Any],
+        expire_time: Optional[Union[int, Dict[str, int]]] = None,
+    ) -> bool:
+        """
+        Set many values in a single round trip, each with its own expiration.
+
+        Args:
+            redis (Redis): Redis connection instance
+            mapping (Dict[str, Any]): Key-value mapping to store
+            expire_time (Optional[Union[int, Dict[str, int]]]): Expiration time in seconds,
+                either for every key or per key (keys missing from the dict use the default)
+
+        Returns:
+            bool: True if every key was set
+
+        Example:
+            >>> await crud.mset(redis, {"a": 1, "b": 2}, expire_time={"a": 60})
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        if not mapping:
+            return True
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                if isinstance(expire_time, dict):
+                    expiry = expire_time.get(key, self.expire_time)
+                else:
+                    expiry = expire_time if expire_time is not None else self.expire_time
+                pipe.set(self._get_key(key), serializer.dumps(value), ex=expiry)
+            results = await pipe.execute()
+        return all(results)
+
+    async def delete_many(self, redis: Redis, keys: Iterable[str]) -> int:
+        """
+        Delete many keys in a single round trip.
+
+        Args:
+            redis (Redis): Redis connection instance
+            keys (Iterable[str]): Keys to delete
+
+        Returns:
+            int: Number of keys that were deleted
+
+        Example:
+            >>> deleted = await crud.delete_many(redis, ["user:1", "user:2"])
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        prefixed = [self._get_key(key) for key in keys]
+        if not prefixed:
+            return 0
+        return await redis.delete(*prefixed)
+
+    @asynccontextmanager
+    async def pipeline(
+        self, redis: Redis, transaction: bool = False
+    ) -> AsyncIterator["CachePipeline"]:
+        """
+        Queue commands on this repository and send them in one round trip.
+
+        Commands are executed when the block exits without an error (or earlier with
+        `await pipe.execute()`); decoded results are then available on `pipe.results`.
+        With `transaction=True` the commands run atomically in MULTI/EXEC.
+
+        Args:
+            redis (Redis): Redis connection instance
+            transaction (bool): Wrap the commands in MULTI/EXEC
+
+        Yields:
+            CachePipeline: Pipeline exposing the repository commands with key prefixing
+
+        Example:
+            >>> async with crud.pipeline(redis) as pipe:
+            ...     pipe.get("user:1")
+            ...     pipe.set("user:2", {"name": "John"}, expire_time=60)
+            ...     pipe.delete("user:3")
+            >>> user_1, _, _ = pipe.results
+
+        Author:
+            tranvanphuc.dev.it.2002@gmail.com
+        """
+        async with redis.pipeline(transaction=transaction) as pipe:
+            cache_pipe = CachePipeline(self, pipe)
+            yield cache_pipe
+            if cache_pipe.pending:
+                await cache_pipe.execute()
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _decode(value: Any) -> Optional[Any]:
+    return serializer.loads(value) if value else None
+
+
+class CachePipeline:
+    """
+    Command buffer returned by `CacheCRUDBase.pipeline`: same commands as the repository,
+    same key prefixing and serialization, one round trip on `execute`.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, crud: CacheCRUDBase, pipe: Pipeline):
+        self._crud = crud
+        self._pipe = pipe
+        self._decoders: List[Callable[[Any], Any]] = []
+        self.results: List[Any] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of queued commands."""
+        return len(self._decoders)
+
+    def _queue(self, decoder: Callable[[Any], Any] = _identity) -> "CachePipeline":
+        self._decoders.append(decoder)
+        return self
+
+    def get(self, key: str) -> "CachePipeline":
+        self._pipe.get(self._crud._get_key(key))
+        return self._queue(_decode)
+
+    def set(self, key: str, value: Any, expire_time: Optional[int] = None) -> "CachePipeline":
+        expiry = expire_time if expire_time is not None else self._crud.expire_time
+        self._pipe.set(self._crud._get_key(key), serializer.dumps(value), ex=expiry)
+        return self._queue()
+
+    def delete(self, key: str) -> "CachePipeline":
+        self._pipe.delete(self._crud._get_key(key))
+        return self._queue(bool)
+
+    def exists(self, key: str) -> "CachePipeline":
+        self._pipe.exists(self._crud._get_key(key))
+        return self._queue(bool)
+
+    def expire(self, key: str, seconds: int) -> "CachePipeline":
+        self._pipe.expire(self._crud._get_key(key), seconds)
+        return self._queue()
+
+    def ttl(self, key: str) -> "CachePipeline":
+        self._pipe.ttl(self._crud._get_key(key))
+        return self._queue()
+
+    def incr(self, key: str) -> "CachePipeline":
+        self._pipe.incr(self._crud._get_key(key))
+        return self._queue()
+
+    def hset(self, key: str, mapping: Dict[str, Any]) -> "CachePipeline":
+        self._pipe.hset(self._crud._get_key(key), mapping=mapping)
+        return self._queue()
+
+    def hget(self, key: str, field: str) -> "CachePipeline":
+        self._pipe.hget(self._crud._get_key(key), field)
+        return self._queue()
+
+    def hgetall(self, key: str) -> "CachePipeline":
+        self._pipe.hgetall(self._crud._get_key(key))
+        return self._queue()
+
+    async def execute(self) -> List[Any]:
+        """
+        Send the queued commands.
+
+        Returns:
+            List[Any]: Decoded results in queue order (also stored on `results`)
+        """
+        with span("cache.pipeline"):
+            raw = await self._pipe.execute()
+        self.results = [decode(value) for decode, value in zip(self._decoders, raw)]
+        self._decoders = []
+        return self.results
+
+
+# Time every cache call as a request span ("cache.<method>")
+time_methods(CacheCRUDBase, "cache")
@@ -0,0 +1,349 @@
+import asyncio
+import decimal
+import uuid
+from datetime import date, datetime, time
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Union
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from config.env import env
+from dependencies.database_postgresql import get_orgs_db_factory
+from dependencies.database_redis import get_redis
+from repositories.base.orm_crud_base import (
+    CreateSchemaType,
+    ModelType,
+    ORMCRUDBase,
+    UpdateSchemaType,
+)
+from repositories.base.query_builder import get_filter_hash
+from repositories.cache.cache_crud_entity import CacheCRUDEntity
+from utils import serializer
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Key holding the table version that stamps cached get_one_by results
+VERSION_KEY = "version"
+
+# Stored instead of a row when the database has no match (negative caching)
+NEGATIVE_MARKER = {"__miss__": True}
+
+# Stored by `invalidate`: read as a miss that reloads the row, but blocks the NX write-back
+# of a load that started before the invalidation
+STALE_MARKER = {"__stale__": True}
+
+# Converters from JSON values back to column python types
+_COERCERS: Dict[type, Callable[[Any], Any]] = {
+    uuid.UUID: uuid.UUID,
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+    decimal.Decimal: decimal.Decimal,
+}
+
+
+class CachedORMCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    Read-through Redis cache in front of an `ORMCRUDBase` repository.
+
+    - `get` and `get_one_by` read through Redis (`CacheCRUDEntity`). Misses are cached too,
+      with a shorter TTL, so repeated lookups of absent rows do not reach Postgres.
+    - Concurrent misses on the same key in this process share one database load
+      (single-flight), so a hot key expiring costs one query instead of a stampede. The
+      shared load runs on its own short-lived session, so a cancelled caller cannot break it.
+    - `create`/`update`/`patch`/`remove`/`update_one_by` write the fresh row through,
+      `delete`/`delete_obj` replace it with a negative entry. Every write also bumps the
+      table version, which invalidates all cached `get_one_by` results of the table at once.
+    - Cached rows are merged into the caller's session without SQL, so they can be passed
+      to `update`/`patch` like any loaded object. Relationships are not cached.
+
+    Every other attribute (get_multi_by, stream_multi, upsert_many, ...) is delegated
+    uncached to the wrapped repository; after bulk writes call `invalidate(*ids)`.
+
+    Example:
+        >>> cached_user_crud = CachedORMCRUD(ORMCRUDUser(Users))
+        >>> user = await cached_user_crud.get(db, user_id)
+        >>> user = await cached_user_crud.get_one_by(db, {"email": email})
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        repository: ORMCRUDBase[ModelType, CreateSchemaType, UpdateSchemaType],
+        ttl: int = env.ORM_CACHE_TTL,
+        negative_ttl: int = env.ORM_CACHE_NEGATIVE_TTL,
+        redis_factory: Callable[[], Redis] = get_redis,
+        session_factory: Callable[[], async_sessionmaker[AsyncSession]] = get_orgs_db_factory,
+    ):
+        """
+        Args:
+            repository (ORMCRUDBase): Repository to put the cache in front of.
+            ttl (int): Lifetime of cached rows in seconds.
+            negative_ttl (int): Lifetime of cached misses in seconds.
+            redis_factory (Callable[[], Redis]): Factory returning the Redis client to use.
+            session_factory (Callable[[], async_sessionmaker]): Factory returning the session
+                maker of the cache loads.
+        """
+        self.repository = repository
+        self.model = repository.model
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache_crud = CacheCRUDEntity(self.model.__tablename__, expire_time=ttl)
+        self._columns = {attr.key: attr.columns[0] for attr in sa_inspect(self.model).column_attrs}
+        self._redis_factory = redis_factory
+        self._session_factory = session_factory
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repository, name)
+
+    @property
+    def redis(self) -> Redis:
+        """The shared Redis client (resolved per use, so importing never opens a connection)."""
+        return self._redis_factory()
+
+    # Reads
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """
+        Retrieves a single record by its ID through the cache, ignoring soft-deleted records.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            id (Any): The primary key of the record to retrieve.
+
+        Returns:
+            Optional[ModelType]: The record if found, otherwise None.
+        """
+        obj = await self.get_including_soft_deleted(db, id)
+        if obj is not None and getattr(obj, "deleted_at", None) is None:
+            return obj
+        return None
+
+    async def get_including_soft_deleted(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """
+        Retrieves a single record by its ID through the cache, including soft-deleted records.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            id (Any): The primary key of the record to retrieve.
+
+        Returns:
+            Optional[ModelType]: The record if found, otherwise None.
+        """
+        key = str(id)
+        try:
+            entry = await self._cache_crud.get(self.redis, key)
+        except RedisError as e:
+            logger.warning(f"ORM cache read failed for {self._cache_crud._get_key(key)}: {str(e)}")
+            entry = None
+
+        if entry is None or entry == STALE_MARKER:
+            # Over a stale marker the load must overwrite it (no NX)
+            nx = entry is None
+            entry = await self._single_flight(key, lambda: self._load_by_id(id, nx))
+        return await self._materialize(db, entry)
+
+    async def get_one_by(self, db: AsyncSession, filter: dict = {}) -> Optional[ModelType]:
+        """
+        Retrieves a single record by filter criteria through the cache, ignoring soft-deleted records.
+
+        The cached result is only used if it was stored under the current table version,
+        read in the same round trip.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            filter (dict, optional): Filter conditions.
+
+        Returns:
+            Optional[ModelType]: The matched record, if found.
+        """
+        key = "one:" + get_filter_hash(self.model, {"filter": filter}).rsplit(":", 1)[-1]
+        try:
+            version, entry = await self._cache_crud.mget(self.redis, [VERSION_KEY, key])
+        except RedisError as e:
+            logger.warning(f"ORM cache read failed for {self._cache_crud._get_key(key)}: {str(e)}")
+            return await self.repository.get_one_by(db, filter)
+
+        version = version or 0
+        if entry is not None and entry.get("v") == version:
+            row = entry["row"]
+        else:
+            row = await self._single_flight(
+                f"{key}:{version}", lambda: self._load_one_by(filter, key, version)
+            )
+        return await self._materialize(db, row)
+
+    async def get_one_by_or_fail(self, db: AsyncSession, filter: dict = {}) -> Optional[ModelType]:
+        """
+        Same as `get_one_by`, but raises 404 if no record matches.
+
+        Raises:
+            HTTPException: 404 if not found.
+        """
+        model = await self.get_one_by(db, filter)
+        if not model:
+            self.repository._throw_not_found_exception()
+        return model
+
+    # Writes
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj = await self.repository.create(db, obj_in=obj_in)
+        await self._write_through(obj)
+        return obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        obj = await self.repository.update(db, db_obj=db_obj, obj_in=obj_in)
+        await self._write_through(obj)
+        return obj
+
+    async def patch(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> ModelType:
+        obj = await self.repository.patch(db, db_obj=db_obj, obj_in=obj_in)
+        await self._write_through(obj)
+        return obj
+
+    async def update_one_by(
+        self,
+        db: AsyncSession,
+        filter: dict = {},
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]] = "{}",
+    ) -> Optional[ModelType]:
+        obj = await self.repository.update_one_by(db, filter=filter, obj_in=obj_in)
+        if obj is not None:
+            await self._write_through(obj)
+        return obj
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> ModelType:
+        obj = await self.repository.remove(db, id=id)
+        await self._write_through(obj)
+        return obj
+
+    async def delete(self, db: AsyncSession, *, id: Any) -> ModelType:
+        obj = await self.repository.delete(db, id=id)
+        await self._replace(id, NEGATIVE_MARKER)
+        return obj
+
+    async def delete_obj(self, db: AsyncSession, *, obj: ModelType) -> ModelType:
+        id = obj.id
+        obj = await self.repository.delete_obj(db, obj=obj)
+        await self._replace(id, NEGATIVE_MARKER)
+        return obj
+
+    async def invalidate(self, *ids: Any) -> None:
+        """
+        Mark the cached rows of `ids` stale and invalidate every cached `get_one_by` result
+        of the table.
+
+        The next read of a stale row reloads it from the database. A stale marker (rather
+        than a plain delete) stops a load that started before the write from putting the old
+        row back.
+
+        Args:
+            *ids (Any): Primary keys of the changed records.
+        """
+        await self._replace(*ids, marker=STALE_MARKER)
+
+    # Internals
+
+    async def _replace(self, *ids: Any, marker: Dict[str, Any]) -> None:
+        """Replace the cached rows of `ids` with `marker` and bump the table version."""
+        try:
+            async with self._cache_crud.pipeline(self.redis) as pipe:
+                for id in ids:
+                    pipe.set(str(id), marker, expire_time=self.negative_ttl)
+                pipe.incr(VERSION_KEY)
+        except RedisError as e:
+            logger.warning(f"ORM cache invalidation failed for {self.model.__tablename__}: {str(e)}")
+
+    async def _write_through(self, obj: ModelType) -> None:
+        try:
+            async with self._cache_crud.pipeline(self.redis) as pipe:
+                pipe.set(str(obj.id), self._serialize(obj))
+                pipe.incr(VERSION_KEY)
+        except RedisError as e:
+            logger.warning(f"ORM cache write failed for {self.model.__tablename__}: {str(e)}")
+
+    async def _load_by_id(self, id: Any, nx: bool = True) -> Dict[str, Any]:
+        async with self._session_factory()() as db:
+            obj = await self.repository.get_including_soft_deleted(db, id)
+        entry = self._serialize(obj) if obj is not None else NEGATIVE_MARKER
+        # NX: never overwrite a row written through (or invalidated) while we were loading
+        await self._store(str(id), entry, obj is not None, nx=nx)
+        return entry
+
+    async def _load_one_by(self, filter: dict, key: str, version: int) -> Dict[str, Any]:
+        async with self._session_factory()() as db:
+            obj = await self.repository.get_one_by(db, filter)
+        row = self._serialize(obj) if obj is not None else NEGATIVE_MARKER
+        # Stamped with the version read before the query: a concurrent write makes it stale
+        await self._store(key, {"v": version, "row": row}, obj is not None)
+        return row
+
+    async def _store(self, key: str, value: Any, found: bool, nx: bool = False) -> None:
+        try:
+            await self.redis.set(
+                self._cache_crud._get_key(key),
+                serializer.dumps(value),
+                ex=self.ttl if found else self.negative_ttl,
+                nx=nx,
+            )
+        except RedisError as e:
+            logger.warning(f"ORM cache write failed for {self._cache_crud._get_key(key)}: {str(e)}")
+
+    async def _single_flight(
+        self, key: str, loader: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run `loader` once for all concurrent callers asking for the same key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(
+                lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None
+            )
+        # Shielded: a cancelled caller must not cancel the load the others are waiting on.
+        # The load uses its own session, never a caller's.
+        return await asyncio.shield(task)
+
+    def _serialize(self, obj: ModelType) -> Dict[str, Any]:
+        return {key: getattr(obj, key) for key in self._columns}
+
+    async def _materialize(self, db: AsyncSession, row: Dict[str, Any]) -> Optional[ModelType]:
+        """Turn a cached row into a persistent instance of `db`, without emitting SQL."""
+        if row == NEGATIVE_MARKER:
+            return None
+
+        values = {}
+        for key, column in self._columns.items():
+            value = row.get(key)
+            if isinstance(value, str):
+                try:
+                    coerce = _COERCERS.get(column.type.python_type)
+                except NotImplementedError:
+                    coerce = None
+                if coerce is not None:
+                    value = coerce(value)
+            values[key] = value
+
+        obj = self.model(**values)
+        make_transient_to_detached(obj)
+        return await db.merge(obj, load=False)
@@ -1,15 +1,51 @@
+import asyncio
+import time
 from datetime import datetime
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from databases.base.class_base import Base
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import and_, func, select
+from redis.exceptions import RedisError
+from sqlalchemy import Result, Select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from repositories.base.query_builder import get_filter, query_builder
+from dependencies.database_redis import get_redis
+from dependencies.query_monitor import tag_repository_methods
+from dependencies.read_replica import has_pending_writes, replica_read
+from repositories.base.query_builder import (
+    COUNT_CACHED,
+    COUNT_ESTIMATE,
+    COUNT_EXACT,
+    COUNT_SKIP,
+    COUNT_STRATEGIES,
+    apply_keyset_pagination,
+    get_count,
+    get_filter_hash,
+    get_keyset_page,
+    is_cursor_pagination,
+    query_builder,
+)
+from repositories.cache.cache_crud_count import CacheCRUDCount
 from utils.crypto import clone_model
 from utils.string_case import decamelize
 
@@ -17,6 +53,11 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+count_cache = CacheCRUDCount()
+
+# Postgres rejects statements with more bind parameters than this
+POSTGRES_MAX_BIND_PARAMS = 32767
+
 
 class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
@@ -25,6 +66,8 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     This class supports typical operations such as:
     - get / get_including_soft_deleted
     - get_multi / get_multi_including_soft_deleted
+    (these reads, get_multi*_by and get_one_*by may be served by a read replica, see `replica_read`)
+    - stream_multi / stream_multi_including_soft_deleted (server-side cursor)
     - create
     - update / patch
     - remove (soft-delete)
@@ -32,6 +75,10 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     - get_one_by / get_one_by_or_fail (filter-based retrieval)
     - clone / save
     - batch_insert_with_objects / batch_insert_with_mappings
+    - upsert_many / copy_from_iterable (bulk ingestion)
+
+    The statements of every public method are tagged "<Repository>.<method>" in the query
+    metrics and slow query log, see `dependencies.query_monitor`.
 
     Author:
         tranvanphuc.dev.it.2002@gmail.com
@@ -46,6 +93,11 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        tag_repository_methods(cls)
+
+    @replica_read
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """
         Retrieves a single record by its ID, ignoring records with non-null `deleted_at`.
@@ -62,6 +114,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return obj
         return None
 
+    @replica_read
     async def get_including_soft_deleted(
         self, db: AsyncSession, id: Any
     ) -> Optional[ModelType]:
@@ -77,6 +130,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return await db.get(self.model, id)
 
+    @replica_read
     async def get_multi(
         self,
         db: AsyncSession,
@@ -85,16 +139,28 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Retrieves multiple records (excluding soft-deleted ones) based on optional filter parameters.
 
+        Keyset (cursor) pagination needs the cursors of the page, which a list cannot carry:
+        use `get_multi_by` with `pagination="cursor"` instead.
+
         Args:
             db (AsyncSession): The active async database session.
             filter_param (dict, optional): Dictionary of filters, ordering, includes, etc.
 
         Returns:
             List[ModelType]: A list of matching records.
+
+        Raises:
+            HTTPException: 400 if cursor pagination is requested.
         """
         if filter_param is None:
             filter_param = {}
 
+        if is_cursor_pagination(filter_param):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is only supported by get_multi_by",
+            )
+
         query = query_builder(
             model=self.model,
             filter=filter_param.get("filter"),
@@ -112,6 +178,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(query)
         return result.scalars().all()
 
+    @replica_read
     async def get_multi_including_soft_deleted(
         self,
         db: AsyncSession,
@@ -142,17 +209,25 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(query)
         return result.scalars().all()
 
+    @replica_read
     async def get_multi_by(
         self,
         db: AsyncSession,
         filter_param: dict = None,
+        count_strategy: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Retrieves multiple records (excluding soft-deleted) and returns total count plus the records.
 
+        Pass `pagination="cursor"` (and the `cursor` of a previous page) in filter_param
+        to use keyset pagination; the result then also carries 'next_cursor' and 'prev_cursor'.
+
         Args:
             db (AsyncSession): The active async database session.
             filter_param (dict, optional): Dictionary of filters, ordering, includes, etc.
+            count_strategy (str, optional): How 'total' is computed: "exact" (default), "skip"
+                (total is None), "estimate" (table statistics; exact for filtered queries) or
+                "cached" (exact, cached in Redis). Falls back to filter_param["count"].
 
         Returns:
             Dict[str, Any]: A dictionary with 'total' and 'results'.
@@ -160,34 +235,45 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if filter_param is None:
             filter_param = {}
 
+        cursor_mode = is_cursor_pagination(filter_param)
         query = query_builder(
             model=self.model,
             filter=filter_param.get("filter"),
-            order_by=filter_param.get("order_by"),
+            order_by=None if cursor_mode else filter_param.get("order_by"),
             include=filter_param.get("include"),
             join=filter_param.get("join"),
         )
 
         # Count total before filtering out soft-deleted
-        stmt_count = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(stmt_count)
+        count_query = query
 
         # Exclude soft-deleted
         query = query.filter(self.model.deleted_at.is_(None))
 
+        if cursor_mode:
+            query, keyset = apply_keyset_pagination(query, self.model, filter_param)
+            total, results = await self._execute_with_total(
+                db, query, count_query, filter_param, count_strategy, "active"
+            )
+            return {"total": total, **get_keyset_page(results.scalars().all(), keyset)}
+
         # Pagination
         query = query.offset(filter_param.get("skip")).limit(filter_param.get("limit"))
 
-        results = await db.execute(query)
+        total, results = await self._execute_with_total(
+            db, query, count_query, filter_param, count_strategy, "active"
+        )
         return {
             "total": total,
             "results": results.scalars().all(),
         }
 
+    @replica_read
     async def get_multi_including_soft_deleted_by(
         self,
         db: AsyncSession,
         filter_param: dict = None,
+        count_strategy: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Retrieves multiple records (including soft-deleted) and returns total count plus the records.
@@ -195,6 +281,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Args:
             db (AsyncSession): The active async database session.
             filter_param (dict, optional): Dictionary of filters, ordering, includes, etc.
+            count_strategy (str, optional): How 'total' is computed, see `get_multi_by`.
 
         Returns:
             Dict[str, Any]: A dictionary with 'total' and 'results'.
@@ -211,19 +298,201 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
 
         # Count total rows, including soft-deleted
-        total = await db.scalar(query.with_entities(func.count()))
+        count_query = query
 
         # Pagination
         query = query.offset(filter_param.get("skip", 0)).limit(
             filter_param.get("limit", 10)
         )
-        results = await db.execute(query)
+        total, results = await self._execute_with_total(
+            db, query, count_query, filter_param, count_strategy, "all"
+        )
 
         return {
             "total": total,
             "results": results.scalars().all(),
         }
 
+    async def _execute_with_total(
+        self,
+        db: AsyncSession,
+        query: Select,
+        count_query: Select,
+        filter_param: dict,
+        count_strategy: Optional[str],
+        scope: str,
+    ) -> Tuple[Optional[int], Result]:
+        """
+        Executes a page query together with its total according to the count strategy.
+
+        When the total has to come from the database and the session holds no pending or
+        flushed writes, the count runs on a second session concurrently with the page query
+        (a second connection would not see uncommitted writes, so they keep it sequential).
+
+        Args:
+            db (AsyncSession): The active async database session.
+            query (Select): The paginated page query.
+            count_query (Select): The unpaginated query to count.
+            filter_param (dict): Dictionary of filters, used to key cached counts.
+            count_strategy (str, optional): One of COUNT_STRATEGIES; falls back to filter_param["count"].
+            scope (str): Cache key discriminator ("active" or "all").
+
+        Returns:
+            Tuple[Optional[int], Result]: The total (None for "skip") and the page result.
+
+        Raises:
+            HTTPException: 400 if the count strategy is unknown.
+        """
+        strategy = count_strategy or filter_param.get("count") or COUNT_EXACT
+        if strategy not in COUNT_STRATEGIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown count strategy '{strategy}', expected one of {list(COUNT_STRATEGIES)}",
+            )
+
+        if strategy == COUNT_SKIP:
+            return None, await db.execute(query)
+
+        count_query = count_query.order_by(None)
+        cache_key = None
+        if strategy == COUNT_CACHED:
+            cache_key = get_filter_hash(self.model, filter_param, scope)
+            total = await self._get_cached_count(cache_key)
+            if total is not None:
+                return total, await db.execute(query)
+
+        async def count(session: AsyncSession) -> int:
+            if strategy == COUNT_ESTIMATE:
+                return await self._estimate_count(session, count_query)
+            total = await session.scalar(get_count(count_query))
+            if cache_key is not None:
+                await self._set_cached_count(cache_key, total)
+            return total
+
+        if db.bind is None or has_pending_writes(db.sync_session):
+            total = await count(db)
+            return total, await db.execute(query)
+
+        async with AsyncSession(
+            bind=db.bind, expire_on_commit=False, sync_session_class=db.sync_session_class
+        ) as count_db:
+            total, results = await asyncio.gather(count(count_db), db.execute(query))
+        return total, results
+
+    async def _estimate_count(self, db: AsyncSession, count_query: Select) -> int:
+        """
+        Estimates the row count of a query from Postgres statistics instead of scanning.
+
+        Only an unfiltered, unjoined query maps to the table's `pg_class.reltuples`; any
+        other query, or a table without statistics, falls back to an exact count.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            count_query (Select): The unpaginated query to estimate.
+
+        Returns:
+            int: Estimated number of rows.
+        """
+        table = self.model.__table__
+        if count_query.whereclause is not None or count_query.get_final_froms() != [table]:
+            return await db.scalar(get_count(count_query))
+
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table.name},
+        )
+        # reltuples is -1 (or 0) for tables that were never vacuumed/analyzed
+        if estimate is None or estimate < 0:
+            return await db.scalar(get_count(count_query))
+        return int(estimate)
+
+    async def _get_cached_count(self, cache_key: str) -> Optional[int]:
+        try:
+            return await count_cache.get(get_redis(), cache_key)
+        except RedisError:
+            return None
+
+    async def _set_cached_count(self, cache_key: str, total: int) -> None:
+        try:
+            await count_cache.set(get_redis(), cache_key, total)
+        except RedisError:
+            pass
+
+    async def stream_multi(
+        self,
+        db: AsyncSession,
+        filter_param: dict = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Streams records (excluding soft-deleted ones) through a server-side cursor.
+
+        Rows are fetched `yield_per` at a time, so exports and background jobs over whole
+        tables run in bounded memory. Uses the same filter/order_by/include handling as
+        `get_multi`, but ignores `skip`/`limit`.
+
+        Args:
+            db (AsyncSession): The active async database session; must stay open while iterating.
+            filter_param (dict, optional): Dictionary of filters, ordering, includes, etc.
+            yield_per (int, optional): Rows fetched per round trip. Defaults to 1000.
+
+        Yields:
+            ModelType: Matching records, one at a time.
+
+        Example:
+            >>> async for user in crud.stream_multi(db, {"order_by": "email"}):
+            ...     process(user)
+        """
+        async for obj in self._stream(db, filter_param, yield_per, soft_deleted=False):
+            yield obj
+
+    async def stream_multi_including_soft_deleted(
+        self,
+        db: AsyncSession,
+        filter_param: dict = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Streams records, including soft-deleted ones, through a server-side cursor.
+
+        Args:
+            db (AsyncSession): The active async database session; must stay open while iterating.
+            filter_param (dict, optional): Dictionary of filters, ordering, includes, etc.
+            yield_per (int, optional): Rows fetched per round trip. Defaults to 1000.
+
+        Yields:
+            ModelType: Matching records, one at a time.
+        """
+        async for obj in self._stream(db, filter_param, yield_per, soft_deleted=True):
+            yield obj
+
+    async def _stream(
+        self,
+        db: AsyncSession,
+        filter_param: Optional[dict],
+        yield_per: int,
+        soft_deleted: bool,
+    ) -> AsyncIterator[ModelType]:
+        if filter_param is None:
+            filter_param = {}
+
+        query = query_builder(
+            model=self.model,
+            filter=filter_param.get("filter"),
+            order_by=filter_param.get("order_by"),
+            include=filter_param.get("include"),
+            join=filter_param.get("join"),
+        )
+        if not soft_deleted:
+            query = query.filter(self.model.deleted_at.is_(None))
+
+        result = await db.stream(query.execution_options(yield_per=yield_per))
+        try:
+            async for obj in result.scalars():
+                yield obj
+        finally:
+            await result.close()
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Creates a new record in the database.
@@ -407,6 +676,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             self._throw_not_found_exception()
         return model
 
+    @replica_read
     async def get_one_by(
         self, db: AsyncSession, filter: dict = {}
     ) -> Optional[ModelType]:
@@ -420,15 +690,13 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Optional[ModelType]: The matched record, if found.
         """
-        stmt = select(self.model).filter(
-            and_(
-                self.model.deleted_at.is_(None),
-                get_filter(self.model, filter),
-            )
+        stmt = query_builder(model=self.model, filter=filter).filter(
+            self.model.deleted_at.is_(None)
         )
         result = await db.execute(stmt)
         return result.scalars().first()
 
+    @replica_read
     async def get_one_including_soft_deleted_by(
         self, db: AsyncSession, filter: dict = {}
     ) -> Optional[ModelType]:
@@ -442,11 +710,7 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Optional[ModelType]: The matched record, if found.
         """
-        stmt = select(self.model).filter(
-            and_(
-                get_filter(self.model, filter),
-            )
-        )
+        stmt = query_builder(model=self.model, filter=filter)
         result = await db.execute(stmt)
         return result.scalars().first()
 
@@ -467,11 +731,8 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Optional[ModelType]: The updated record, or None if not found.
         """
-        stmt = select(self.model).filter(
-            and_(
-                self.model.deleted_at.is_(None),
-                get_filter(self.model, filter),
-            )
+        stmt = query_builder(model=self.model, filter=filter).filter(
+            self.model.deleted_at.is_(None)
         )
         result = await db.execute(stmt)
         model = result.scalars().first()
@@ -583,3 +844,200 @@ class ORMCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             raise HTTPException(
                 status_code=422, detail=f"Batch insert failed: {str(e)}"
             )
+
+    async def upsert_many(
+        self,
+        db: AsyncSession,
+        mappings: List[Dict[str, Any]],
+        conflict_keys: Sequence[str] = ("id",),
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Inserts or updates many rows with `INSERT ... ON CONFLICT DO UPDATE`, in chunks.
+
+        Chunks are sized so a single statement stays under Postgres' bind-parameter limit,
+        and all chunks are committed together.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            mappings (List[Dict[str, Any]]): List of dictionaries mapping column names to values.
+            conflict_keys (Sequence[str], optional): Columns of the unique constraint to upsert on.
+            update_columns (Sequence[str], optional): Columns overwritten on conflict. Defaults to
+                every supplied column except the conflict keys and `id`/`created_at`; when empty,
+                conflicting rows are left untouched (`DO NOTHING`).
+            chunk_size (int, optional): Rows per statement, capped by the bind-parameter limit.
+
+        Returns:
+            Dict[str, Any]: A dictionary with 'rows' and per-chunk 'chunks' timings.
+
+        Raises:
+            HTTPException: If any error occurs during the upsert.
+        """
+        if not mappings:
+            return {"rows": 0, "chunks": []}
+
+        columns = list(dict.fromkeys(key for mapping in mappings for key in mapping))
+        if update_columns is None:
+            update_columns = [
+                column
+                for column in columns
+                if column not in conflict_keys and column not in ("id", "created_at")
+            ]
+
+        # Python-side defaults are bound too, so size chunks by every column of the table
+        params_per_row = max(len(columns), len(self.model.__table__.columns))
+        max_rows = max(1, POSTGRES_MAX_BIND_PARAMS // params_per_row)
+        chunk_size = min(chunk_size or max_rows, max_rows)
+
+        chunks = []
+        try:
+            for index, start in enumerate(range(0, len(mappings), chunk_size)):
+                chunk = mappings[start : start + chunk_size]
+                started_at = time.perf_counter()
+
+                stmt = pg_insert(self.model.__table__).values(chunk)
+                if update_columns:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=list(conflict_keys),
+                        set_={column: stmt.excluded[column] for column in update_columns},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_keys))
+                await db.execute(stmt)
+
+                chunks.append(
+                    {
+                        "chunk": index,
+                        "rows": len(chunk),
+                        "seconds": round(time.perf_counter() - started_at, 6),
+                    }
+                )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=422, detail=f"Batch upsert failed: {str(e)}"
+            )
+
+        return {"rows": len(mappings), "chunks": chunks}
+
+    async def copy_from_iterable(
+        self,
+        db: AsyncSession,
+        records: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 10000,
+    ) -> Dict[str, Any]:
+        """
+        Bulk loads rows with Postgres `COPY` through asyncpg's `copy_records_to_table`.
+
+        Records are streamed in chunks, so memory stays bounded for 100k+ row loads. All
+        chunks run in the session's transaction, committed once at the end: a failure rolls
+        every chunk back. COPY bypasses SQLAlchemy, so Python-side column defaults (e.g. `id`, `created_at`)
+        are filled in here for columns missing from `columns`. Conflicts are not handled;
+        use `upsert_many` for that.
+
+        Args:
+            db (AsyncSession): The active async database session (asyncpg driver).
+            records (Union[Iterable, AsyncIterable]): Dictionaries mapping column names to values.
+            columns (Sequence[str], optional): Columns to load. Defaults to the keys of the first record.
+            chunk_size (int, optional): Rows sent per COPY. Defaults to 10000.
+
+        Returns:
+            Dict[str, Any]: A dictionary with 'rows' and per-chunk 'chunks' timings.
+
+        Raises:
+            HTTPException: If any error occurs during the copy.
+        """
+        table = self.model.__table__
+        connection = await db.connection()
+        # The asyncpg adapter only opens its transaction on the first statement it executes:
+        # run one, so the COPY chunks below are part of it instead of autocommitting each
+        await connection.execute(text("SELECT 1"))
+        raw_connection = (await connection.get_raw_connection()).driver_connection
+
+        chunks = []
+        total = 0
+        copy_columns: List[str] = list(columns) if columns else []
+        defaults: Optional[Dict[str, Callable[[], Any]]] = None
+
+        async def flush(chunk: List[Dict[str, Any]]) -> None:
+            nonlocal total
+            started_at = time.perf_counter()
+            rows = [
+                tuple(
+                    record[column]
+                    if column in record
+                    else (defaults[column]() if column in defaults else None)
+                    for column in copy_columns
+                )
+                for record in chunk
+            ]
+            await raw_connection.copy_records_to_table(
+                table.name, records=rows, columns=copy_columns, schema_name=table.schema
+            )
+            chunks.append(
+                {
+                    "chunk": len(chunks),
+                    "rows": len(rows),
+                    "seconds": round(time.perf_counter() - started_at, 6),
+                }
+            )
+            total += len(rows)
+
+        try:
+            chunk: List[Dict[str, Any]] = []
+            async for record in _iterate(records):
+                if not copy_columns:
+                    copy_columns = list(record.keys())
+                if defaults is None:
+                    defaults = self._get_copy_defaults(copy_columns)
+                    copy_columns += [c for c in defaults if c not in copy_columns]
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    await flush(chunk)
+                    chunk = []
+            if chunk:
+                await flush(chunk)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=422, detail=f"Bulk copy failed: {str(e)}"
+            )
+
+        return {"rows": total, "chunks": chunks}
+
+    def _get_copy_defaults(self, columns: Sequence[str]) -> Dict[str, Callable[[], Any]]:
+        """
+        Collects Python-side defaults of the table columns missing from `columns`.
+
+        Args:
+            columns (Sequence[str]): Columns supplied by the caller.
+
+        Returns:
+            Dict[str, Callable[[], Any]]: Column name -> factory producing its default value.
+        """
+        defaults = {}
+        for column in self.model.__table__.columns:
+            default = column.default
+            if column.name in columns or default is None:
+                continue
+            if default.is_callable:
+                defaults[column.name] = partial(default.arg, None)
+            elif default.is_scalar:
+                defaults[column.name] = partial(lambda value: value, default.arg)
+        return defaults
+
+
+async def _iterate(
+    records: Union[Iterable[Any], AsyncIterable[Any]]
+) -> AsyncIterator[Any]:
+    """Iterates over a sync or async iterable with `async for`."""
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
@@ -1,15 +1,39 @@
+import base64
+import binascii
+import hashlib
 import json
-from typing import Optional, Type, TypeVar, Union
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
 
 import sqlalchemy
 from databases.base.class_base import Base
 from fastapi import HTTPException
-from sqlalchemy import and_, func, or_, select
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, or_, select, tuple_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import cast
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Pagination modes accepted in filter_param["pagination"]
+PAGINATION_OFFSET = "offset"
+PAGINATION_CURSOR = "cursor"
+
+# Column appended to every keyset ordering so the sort key is unique
+KEYSET_TIE_BREAKER = "id"
+
+# Strategies accepted for the `total` of get_multi_by-style methods
+COUNT_EXACT = "exact"
+COUNT_SKIP = "skip"
+COUNT_ESTIMATE = "estimate"
+COUNT_CACHED = "cached"
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_SKIP, COUNT_ESTIMATE, COUNT_CACHED)
+
+# Filter keys ("column__op", "relation.column__op") whose column and operator are memoized
+RESOLVED_KEYS_MAX_SIZE = 1024
+
 # A
 # filter={"title__like":"%a%"}
 # --->>>   SELECT * FROM items WHERE title like '%a%'
@@ -66,6 +90,10 @@ def query_builder(
     """
     Builds a SELECT query (SQLAlchemy 2.x style with AsyncSession) with optional filters, ordering, joins, and includes.
 
+    SQLAlchemy caches the compiled SQL by statement structure, so repeated filter shapes
+    only pay for building the expression; the key -> column/operator resolution of each
+    filter key is memoized (`_resolve_column`).
+
     Args:
         model (Type[ModelType]): The SQLAlchemy model to query.
         filter (Union[str, dict], optional): Filter conditions in JSON string or dictionary format.
@@ -112,7 +140,7 @@ def query_builder(
         includes = include.split(",")
         load_options = []
         for inc in includes:
-            load_options.append(selectinload(inc.strip()))
+            load_options.append(selectinload(_get_relationship(model, inc.strip())))
         if load_options:
             base_query = base_query.options(*load_options)
 
@@ -130,6 +158,22 @@ def query_builder(
     return base_query
 
 
+def _get_relationship(model: Type[ModelType], name: str):
+    """
+    Class-bound relationship attribute for `selectinload` (SQLAlchemy 2.0 rejects string names).
+
+    Raises:
+        HTTPException: 400 if `name` is not a relationship of `model`.
+    """
+    relationship = sqlalchemy.inspect(model).relationships.get(name)
+    if relationship is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include relationship '{name}' for {model.__name__}",
+        )
+    return relationship.class_attribute
+
+
 def get_class_by_tablename(tablename: str):
     """
     Return class reference mapped to a specific table name.
@@ -232,6 +276,42 @@ def get_count(query: sqlalchemy.sql.Select):
     return select(func.count()).select_from(query.subquery())
 
 
+def get_filter_hash(model: Type[ModelType], filter_param: dict, scope: str = "") -> str:
+    """
+    Hashes the normalized filter of a list query, e.g. to key a cached count.
+
+    Filters given as JSON strings or dictionaries with different key order hash the same.
+
+    Args:
+        model (Type[ModelType]): The SQLAlchemy model being queried.
+        filter_param (dict): Dictionary with 'filter' and 'join'.
+        scope (str, optional): Extra discriminator, e.g. whether soft-deleted rows are included.
+
+    Returns:
+        str: "<tablename>:<scope>:<sha1 of the normalized filter>".
+
+    Example:
+        >>> get_filter_hash(ItemModel, {"filter": '{"id__gte": 1}'}, "active")
+        'items:active:0f3c...'
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    normalized = {}
+    for key in ("filter", "join"):
+        value = filter_param.get(key)
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                pass
+        normalized[key] = value or None
+
+    raw = json.dumps(jsonable_encoder(normalized), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"{model.__tablename__}:{scope}:{digest}"
+
+
 def get_include(include: str) -> list:
     """
     Processes include parameter to load related objects with a query.
@@ -326,24 +406,7 @@ def get_op(model: Type[ModelType], key: str, value: str):
     Author:
         tranvanphuc.dev.it.2002@gmail.com
     """
-    from sqlalchemy.sql.expression import cast
-
-    column_name = key.split("__")[0]
-
-    # If there's a dot notation, e.g. "relation.column__op"
-    if "." in key:
-        column_name = column_name.split(".")[1]
-        sub_key = key.split(".")[0]
-        ref_instance = getattr(model, sub_key)
-        instance_table_name = ref_instance.property.entity.mapped_table.name
-        model = get_class_by_tablename(instance_table_name)
-
-    column_obj = getattr(model, column_name)
-
-    op = key.split("__")[-1]
-    if op == column_name:
-        # means no op
-        return column_obj == value
+    column_obj, op = _resolve_column(model, key)
     if op == "lt":
         return column_obj < value
     if op == "lte":
@@ -378,6 +441,53 @@ def get_op(model: Type[ModelType], key: str, value: str):
     return column_obj == value
 
 
+@lru_cache(maxsize=RESOLVED_KEYS_MAX_SIZE)
+def _resolve_column(model: Type[ModelType], key: str) -> Tuple[Any, str]:
+    """
+    Resolves a filter key (e.g. 'title__like' or 'relation.column__op') to its column and
+    operator. Memoized: a key maps to the same column for the life of the process.
+    """
+    column_name = key.split("__")[0]
+
+    # If there's a dot notation, e.g. "relation.column__op"
+    if "." in key:
+        column_name = column_name.split(".")[1]
+        sub_key = key.split(".")[0]
+        ref_instance = getattr(model, sub_key)
+        instance_table_name = ref_instance.property.entity.mapped_table.name
+        model = get_class_by_tablename(instance_table_name)
+
+    column_obj = getattr(model, column_name)
+
+    op = key.split("__")[-1]
+    if op == column_name:
+        # means no op
+        op = "eq"
+    return column_obj, op
+
+
+def get_query_builder_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters of the memoized filter key resolution (`_resolve_column`).
+
+    Returns:
+        Dict[str, Any]: hits, misses, hit_rate, size and max_size.
+
+    Example:
+        >>> get_query_builder_stats()
+        {'hits': 9120, 'misses': 14, 'hit_rate': 0.9985, 'size': 14, 'max_size': 1024}
+    """
+    info = _resolve_column.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
+
+
 def prepare_filter_param(
     common_filter_parameters: dict,
     attribute_id: Optional[str] = None,
@@ -442,3 +552,317 @@ def prepare_pagination(common_filter_parameters: dict) -> dict:
     limit = common_filter_parameters.get("limit", 10)
     skip = common_filter_parameters.get("skip", round((page - 1) * limit))
     return {"skip": skip, "limit": limit}
+
+
+def is_cursor_pagination(filter_param: dict) -> bool:
+    """
+    Tells whether a filter_param dictionary requests keyset (cursor) pagination.
+
+    Args:
+        filter_param (dict): Dictionary of filters, ordering, pagination, etc.
+
+    Returns:
+        bool: True if `pagination` is "cursor" or a `cursor` is supplied.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    return (
+        filter_param.get("pagination") == PAGINATION_CURSOR
+        or bool(filter_param.get("cursor"))
+    )
+
+
+def get_indexed_columns(model: Type[ModelType]) -> Set[str]:
+    """
+    Collects the columns of a model that can drive an index scan on their own.
+
+    A column qualifies if it is part of the primary key, declared `index`/`unique`,
+    or is the leading column of a table index.
+
+    Args:
+        model (Type[ModelType]): The SQLAlchemy model.
+
+    Returns:
+        Set[str]: Names of the indexed columns.
+
+    Example:
+        >>> get_indexed_columns(Users)
+        {'id', 'email', 'phone_number', 'is_verified'}
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    table = model.__table__
+    names = {column.name for column in table.primary_key.columns}
+    names.update(column.name for column in table.columns if column.index or column.unique)
+    for index in table.indexes:
+        columns = list(index.columns)
+        if columns:
+            names.add(columns[0].name)
+    return names
+
+
+def get_keyset_order(model: Type[ModelType], order_by: Optional[str]) -> List[Tuple[str, bool]]:
+    """
+    Parses order_by into keyset sort keys and appends `id` as a tie-breaker.
+
+    Every sort column must be indexed and non-nullable, otherwise keyset pagination
+    would either scan the table or silently skip rows, so those are rejected.
+
+    Args:
+        model (Type[ModelType]): The SQLAlchemy model.
+        order_by (str, optional): Comma-separated columns, prefixed with '-' for descending order.
+
+    Returns:
+        List[Tuple[str, bool]]: (column_name, is_descending) pairs.
+
+    Raises:
+        HTTPException: 400 if a column is unknown, unindexed or nullable.
+
+    Example:
+        >>> get_keyset_order(Users, "-email")
+        [('email', True), ('id', True)]
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    keys = []
+    for od in (order_by or "").split(","):
+        od = od.strip()
+        if not od:
+            continue
+        if od.startswith("-"):
+            keys.append((od[1:], True))
+        else:
+            keys.append((od, False))
+
+    if all(name != KEYSET_TIE_BREAKER for name, _ in keys):
+        keys.append((KEYSET_TIE_BREAKER, keys[-1][1] if keys else False))
+
+    table = model.__table__
+    indexed_columns = get_indexed_columns(model)
+    for name, _ in keys:
+        column = table.columns.get(name)
+        if column is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown order_by column '{name}' for {model.__name__}",
+            )
+        if name not in indexed_columns:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination requires indexed order_by columns; "
+                f"'{name}' is not indexed on '{table.name}'",
+            )
+        if column.nullable and not column.primary_key:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination requires non-nullable order_by columns; "
+                f"'{name}' is nullable on '{table.name}'",
+            )
+    return keys
+
+
+def encode_cursor(values: List[Any], order_by: Optional[str], backwards: bool) -> str:
+    """
+    Encodes the sort key of a boundary row into an opaque, URL-safe cursor.
+
+    Args:
+        values (List[Any]): Values of the keyset columns for the boundary row.
+        order_by (str, optional): The order_by the cursor was produced with.
+        backwards (bool): True if the cursor points to the previous page.
+
+    Returns:
+        str: URL-safe base64 cursor.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    payload = {"o": order_by or "", "v": jsonable_encoder(values), "b": backwards}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor string.
+
+    Returns:
+        Dict[str, Any]: Payload with keys 'o' (order_by), 'v' (values) and 'b' (backwards).
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("v"), list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def _coerce_cursor_value(column: sqlalchemy.Column, value: Any) -> Any:
+    """Converts a JSON-decoded cursor value back to the python type of its column."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is uuid.UUID:
+        return uuid.UUID(str(value))
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def get_keyset_filter(
+    model: Type[ModelType],
+    keys: List[Tuple[str, bool]],
+    values: List[Any],
+    backwards: bool = False,
+):
+    """
+    Builds the WHERE clause selecting rows strictly after (or before) a keyset position.
+
+    Uniform sort directions use a row-value comparison, which Postgres can satisfy with
+    a single index range scan; mixed directions fall back to the expanded OR form.
+
+    Args:
+        model (Type[ModelType]): The SQLAlchemy model.
+        keys (List[Tuple[str, bool]]): Keyset sort keys from `get_keyset_order`.
+        values (List[Any]): Boundary values, one per key.
+        backwards (bool): True to select rows before the boundary.
+
+    Returns:
+        ColumnElement: SQLAlchemy filter condition.
+
+    Example:
+        >>> get_keyset_filter(Users, [("email", False), ("id", False)], ["a@b.c", user_id])
+        (users.email, users.id) > (:param_1, :param_2)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    columns = [getattr(model, name) for name, _ in keys]
+    descending = [is_desc != backwards for _, is_desc in keys]
+
+    if all(descending) or not any(descending):
+        if descending[0]:
+            return tuple_(*columns) < tuple(values)
+        return tuple_(*columns) > tuple(values)
+
+    clauses = []
+    for i, column in enumerate(columns):
+        equals = [columns[j] == values[j] for j in range(i)]
+        compare = column < values[i] if descending[i] else column > values[i]
+        clauses.append(and_(*equals, compare))
+    return or_(*clauses)
+
+
+def apply_keyset_pagination(
+    query: sqlalchemy.sql.Select, model: Type[ModelType], filter_param: dict
+) -> Tuple[sqlalchemy.sql.Select, Dict[str, Any]]:
+    """
+    Applies keyset ordering, boundary filter and limit to a query built without order_by.
+
+    One extra row is fetched so `get_keyset_page` can tell whether another page exists.
+
+    Args:
+        query (Select): Query produced by `query_builder` (with `order_by=None`).
+        model (Type[ModelType]): The SQLAlchemy model.
+        filter_param (dict): Dictionary with 'order_by', 'cursor' and 'limit'.
+
+    Returns:
+        Tuple[Select, Dict[str, Any]]: The paginated query and the keyset state for `get_keyset_page`.
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or was issued for another order_by.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    order_by = filter_param.get("order_by")
+    limit = filter_param.get("limit") or 10
+    keys = get_keyset_order(model, order_by)
+    cursor = filter_param.get("cursor")
+    backwards = False
+
+    if cursor:
+        payload = decode_cursor(cursor)
+        if payload.get("o") != (order_by or "") or len(payload["v"]) != len(keys):
+            raise HTTPException(
+                status_code=400, detail="Cursor does not match the requested order_by"
+            )
+        backwards = bool(payload.get("b"))
+        table = model.__table__
+        try:
+            values = [
+                _coerce_cursor_value(table.columns[name], value)
+                for (name, _), value in zip(keys, payload["v"])
+            ]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(get_keyset_filter(model, keys, values, backwards))
+
+    for name, is_desc in keys:
+        column = getattr(model, name)
+        query = query.order_by(column.desc() if is_desc != backwards else column.asc())
+
+    keyset = {
+        "keys": keys,
+        "order_by": order_by,
+        "limit": limit,
+        "backwards": backwards,
+        "has_cursor": bool(cursor),
+    }
+    return query.limit(limit + 1), keyset
+
+
+def get_keyset_page(rows: List[ModelType], keyset: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Trims the look-ahead row and builds next/prev cursors for a keyset page.
+
+    Args:
+        rows (List[ModelType]): Rows returned by the query from `apply_keyset_pagination`.
+        keyset (Dict[str, Any]): Keyset state returned by `apply_keyset_pagination`.
+
+    Returns:
+        Dict[str, Any]: A dictionary with 'results', 'next_cursor' and 'prev_cursor'.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    rows = list(rows)
+    limit = keyset["limit"]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if keyset["backwards"]:
+        rows.reverse()
+
+    def cursor_for(row: ModelType, backwards: bool) -> str:
+        values = [getattr(row, name) for name, _ in keyset["keys"]]
+        return encode_cursor(values, keyset["order_by"], backwards)
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if keyset["backwards"]:
+            next_cursor = cursor_for(rows[-1], False)
+            prev_cursor = cursor_for(rows[0], True) if has_more else None
+        else:
+            next_cursor = cursor_for(rows[-1], False) if has_more else None
+            prev_cursor = cursor_for(rows[0], True) if keyset["has_cursor"] else None
+
+    return {"results": rows, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
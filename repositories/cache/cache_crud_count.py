@@ -0,0 +1,17 @@
+from config.env import env
+from repositories.base.cache_crud_base import CacheCRUDBase
+
+
+class CacheCRUDCount(CacheCRUDBase):
+    """
+    Redis repository for short-lived exact counts of list queries, keyed by the normalized filter hash.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, expire_time: int = env.COUNT_CACHE_TTL):
+        super().__init__(prefix="count", expire_time=expire_time)
+
+
+# Instance will be created in repositories.base.orm_crud_base
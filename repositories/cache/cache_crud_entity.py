@@ -0,0 +1,22 @@
+from config.env import env
+from repositories.base.cache_crud_base import CacheCRUDBase
+
+
+class CacheCRUDEntity(CacheCRUDBase):
+    """
+    Redis repository for cached ORM rows of one table (see `CachedORMCRUD`).
+
+    Keys:
+        entity:<table>:<id>           row of a primary key (or a negative-cache marker)
+        entity:<table>:one:<hash>     result of a get_one_by filter, stamped with the table version
+        entity:<table>:version        table version, bumped on every write
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, table: str, expire_time: int = env.ORM_CACHE_TTL):
+        super().__init__(prefix=f"entity:{table}", expire_time=expire_time)
+
+
+# Instances will be created in repositories.base.cached_orm_crud
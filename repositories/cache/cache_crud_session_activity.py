@@ -0,0 +1,18 @@
+from config.env import env
+from repositories.base.cache_crud_base import CacheCRUDBase
+
+
+class CacheCRUDSessionActivity(CacheCRUDBase):
+    """
+    Redis repository holding the last-activity timestamp of each user session, keyed by user_id.
+    The key expires after the idle timeout, so a missing key means the session timed out.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, expire_time: int = env.SESSION_IDLE_TIMEOUT):
+        super().__init__(prefix="session_activity", expire_time=expire_time)
+
+
+# Instance will be created in core.session_activity
@@ -0,0 +1,16 @@
+from repositories.base.cache_crud_base import CacheCRUDBase
+
+
+class CacheCRUDUserRole(CacheCRUDBase):
+    """
+    Redis repository for cached `UserRoleDepartmentPermissionDto` payloads, keyed by user_id.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, expire_time: int = 300):
+        super().__init__(prefix="user_role", expire_time=expire_time)
+
+
+# Instance will be created in core.auth_cache
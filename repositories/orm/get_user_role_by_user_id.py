@@ -4,8 +4,10 @@ from typing import Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from dependencies.query_monitor import query_tag
 from schema.user_schema import UserResponseSchema, UserRoleDepartmentPermissionDto
 from utils.logger import setup_logger
+from utils.request_timing import span
 
 logger = setup_logger()
 
@@ -47,12 +49,14 @@ async def get_user_role_by_user_id(
         Optional[UserRoleDepartmentPermissionDto]: The user-role details
         mapped to a DTO, or None if no data is found.
     """
-    result = await db.execute(
-        text(GET_USER_ROLE_ROLE_BY_USER_ID), {"user_id": str(user_id)}
-    )
+    with query_tag("get_user_role_by_user_id"), span("db.get_user_role_by_user_id"):
+        result = await db.execute(
+            text(GET_USER_ROLE_ROLE_BY_USER_ID), {"user_id": str(user_id)}
+        )
     row = result.fetchone()
 
     if row and row[0]:
-        logger.info(f"UserRoleDepartmentPermissionDto: {row[0]}")
+        # Runs on every authenticated request: log the ID only, and only at DEBUG
+        logger.debug("UserRoleDepartmentPermissionDto loaded for user %s", user_id)
         return UserRoleDepartmentPermissionDto(**row[0])
     return None
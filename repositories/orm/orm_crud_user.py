@@ -1,11 +1,62 @@
+from typing import Any, Dict, Union
+
 from databases.users import Users
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.auth_cache import user_role_cache
 from repositories.base.orm_crud_base import ORMCRUDBase
 from schema.user_schema import UserCreateSchema, UserUpdateSchema
 
 
 class ORMCRUDUser(ORMCRUDBase[Users, UserCreateSchema, UserUpdateSchema]):
-    pass
+    """
+    User repository. Every single-row write invalidates the cached auth payload of the
+    affected user; after bulk writes (upsert_many, batch inserts) call
+    `user_role_cache.invalidate_many` for the changed users.
+    """
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Users,
+        obj_in: Union[UserUpdateSchema, Dict[str, Any]],
+    ) -> Users:
+        user = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        await user_role_cache.invalidate(user.id)
+        return user
+
+    async def patch(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Users,
+        obj_in: Union[UserUpdateSchema, Dict[str, Any]],
+    ) -> Users:
+        user = await super().patch(db, db_obj=db_obj, obj_in=obj_in)
+        await user_role_cache.invalidate(user.id)
+        return user
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> Users:
+        user = await super().remove(db, id=id)
+        await user_role_cache.invalidate(id)
+        return user
+
+    async def delete(self, db: AsyncSession, *, id: Any) -> Users:
+        user = await super().delete(db, id=id)
+        await user_role_cache.invalidate(id)
+        return user
+
+    async def delete_obj(self, db: AsyncSession, *, obj: Users) -> Users:
+        id = obj.id
+        user = await super().delete_obj(db, obj=obj)
+        await user_role_cache.invalidate(id)
+        return user
+
+    async def save(self, db: AsyncSession, model_obj: Users) -> Users:
+        user = await super().save(db, model_obj)
+        await user_role_cache.invalidate(user.id)
+        return user
 
 
 # Instance will be created in the container
@@ -1,5 +1,15 @@
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+
 from databases.user_sessions import UserSessions
+from databases.users import Users
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from dependencies.read_replica import replica_read
+from repositories.base.batch_loader import BatchLoader
 from repositories.base.orm_crud_base import ORMCRUDBase
 from schema.user_session_schema import UserSessionCreateSchema, UserSessionUpdateSchema
 
@@ -7,7 +17,67 @@ from schema.user_session_schema import UserSessionCreateSchema, UserSessionUpdat
 class ORMCRUDUserSession(
     ORMCRUDBase[UserSessions, UserSessionCreateSchema, UserSessionUpdateSchema]
 ):
-    pass
+    """
+    User session repository, with batched loading of the sessions of many users
+    (instead of one lazy `Users.user_sessions` load per user).
+    """
+
+    @replica_read
+    async def get_multi_by_user_ids(
+        self, db: AsyncSession, user_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, List[UserSessions]]:
+        """
+        Retrieves the sessions (excluding soft-deleted ones) of many users in one query.
+
+        Args:
+            db (AsyncSession): The active async database session.
+            user_ids (Iterable[uuid.UUID]): User IDs.
+
+        Returns:
+            Dict[uuid.UUID, List[UserSessions]]: Sessions by user ID, oldest first; users
+            without sessions are absent.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        result = await db.execute(
+            select(UserSessions)
+            .where(UserSessions.user_id.in_(user_ids), UserSessions.deleted_at.is_(None))
+            .order_by(UserSessions.created_at)
+        )
+        sessions_by_user: Dict[uuid.UUID, List[UserSessions]] = defaultdict(list)
+        for user_session in result.scalars():
+            sessions_by_user[user_session.user_id].append(user_session)
+        return dict(sessions_by_user)
+
+    async def load_for_users(self, db: AsyncSession, users: Sequence[Users]) -> None:
+        """
+        Populates `user.user_sessions` of a page of users with one query, so accessing the
+        relationship afterwards does not lazy-load (or fail under async).
+
+        Args:
+            db (AsyncSession): The active async database session.
+            users (Sequence[Users]): Users to populate.
+        """
+        sessions_by_user = await self.get_multi_by_user_ids(db, (user.id for user in users))
+        for user in users:
+            set_committed_value(user, "user_sessions", sessions_by_user.get(user.id, []))
+
+    def loader(self, db: AsyncSession) -> BatchLoader[uuid.UUID, List[UserSessions]]:
+        """
+        Batch loader of sessions by user ID, for code that resolves users one at a time
+        (create one per request).
+
+        Args:
+            db (AsyncSession): The active async database session.
+
+        Returns:
+            BatchLoader[uuid.UUID, List[UserSessions]]: `await loader.load(user_id)` returns the
+            sessions of the user; concurrent loads share one query.
+        """
+        return BatchLoader(
+            lambda user_ids: self.get_multi_by_user_ids(db, user_ids), default_factory=list
+        )
 
 
 # Instance will be created in the container
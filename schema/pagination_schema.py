@@ -1,4 +1,4 @@
-from typing import Generic, List, TypeVar
+from typing import Generic, List, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -9,8 +9,10 @@ class PaginationResponseSchema(BaseModel, Generic[T]):
     Generic pagination response schema for all list endpoints.
     
     Attributes:
-        total (int): The total number of records available.
+        total (Optional[int]): The total number of records available (None when counting is skipped).
         results (List[T]): The actual records for the current page.
+        next_cursor (Optional[str]): Opaque cursor of the next page (cursor pagination only).
+        prev_cursor (Optional[str]): Opaque cursor of the previous page (cursor pagination only).
         
     Example:
         >>> PaginationResponseSchema[UserResponseSchema](
@@ -21,8 +23,10 @@ class PaginationResponseSchema(BaseModel, Generic[T]):
     Author:
         tranvanphuc.dev.it.2002@gmail.com
     """
-    total: int = Field(..., description="Total number of records available")
+    total: Optional[int] = Field(..., description="Total number of records available")
     results: List[T] = Field(..., description="Records for the current page")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, if any")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the previous page, if any")
     
     class Config:
         from_attributes = True 
\ No newline at end of file
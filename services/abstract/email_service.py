@@ -1,6 +1,6 @@
 import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, EmailStr
 
@@ -19,7 +19,8 @@ class EmailService(BaseModel, ABC):
         subject: str,
         recipients: List[EmailStr],
         template_path: str,
-        template_data: Dict[str, Any]
+        template_data: Dict[str, Any],
+        secret_keys: Tuple[str, ...] = ()
     ) -> bool:
         """
         Abstract method for sending emails.
@@ -29,6 +30,7 @@ class EmailService(BaseModel, ABC):
             recipients: List of recipient email addresses
             template_path: Path to the HTML template
             template_data: Data to render in the template
+            secret_keys: Template data keys holding credentials, never persisted in the queue
             
         Returns:
             bool: True if email was sent successfully, False otherwise
@@ -156,3 +158,81 @@ class EmailService(BaseModel, ABC):
             bool: True if email was sent successfully, False otherwise
         """
         pass
+
+
+    @abstractmethod
+    async def send_bulk_email(
+        self,
+        subject: str,
+        template_path: str,
+        recipients: Union[Iterable[Tuple[str, Dict[str, Any]]], AsyncIterable[Tuple[str, Dict[str, Any]]]],
+        shared_data: Optional[Dict[str, Any]] = None,
+        secret_keys: Tuple[str, ...] = ()
+    ) -> Optional[str]:
+        """
+        Send one email per recipient (announcements, invitations, ...).
+        
+        Args:
+            subject: Email subject
+            template_path: Path to the HTML template
+            recipients: (email, template data) pairs, consumed as a stream
+            shared_data: Template data of every recipient
+            secret_keys: Template data keys holding credentials, never persisted in the queue
+            
+        Returns:
+            Optional[str]: Batch ID to follow the progress with, None if nothing was queued
+            
+        Raises:
+            BatchEnqueueError: If queuing stopped after some messages were queued (carries the batch ID)
+        """
+        pass
+
+    @abstractmethod
+    async def send_bulk_invitation_organization(
+        self,
+        org_name: str,
+        invitees: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> Optional[str]:
+        """
+        Send organization invitations to many users.
+        
+        Args:
+            org_name: Organization name
+            invitees: Users to invite, each with "email" and "display_name"
+            
+        Returns:
+            Optional[str]: Batch ID, None if nothing was queued
+        """
+        pass
+
+    @abstractmethod
+    async def send_bulk_invitation_with_password_email(
+        self,
+        org_name: str,
+        invitees: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> Optional[str]:
+        """
+        Send invitations with password to many users.
+        
+        Args:
+            org_name: Organization name
+            invitees: Users to invite, each with "email", "display_name", "password_user_invite" and "user_id"
+            
+        Returns:
+            Optional[str]: Batch ID, None if nothing was queued
+        """
+        pass
+
+    @abstractmethod
+    async def get_bulk_email_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress of a bulk send.
+        
+        Args:
+            batch_id: Batch ID returned by a send_bulk_* method
+            
+        Returns:
+            Optional[Dict[str, Any]]: Sent, failed and pending counts and the error of each
+            failed recipient, None if the batch is unknown or expired
+        """
+        pass
@@ -1,10 +1,11 @@
 import uuid
-from typing import Any, Dict, List
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Tuple, Union
 
 from fastapi_mail import FastMail, MessageSchema
 
 from constants.common import AppTranslationKeys
 from core.email_connection import conf
+from core.email_outbox import BatchEnqueueError, as_async_iterable, email_outbox
 from services.abstract.email_service import EmailService
 from templates.utils import template_manager
 from utils.logger import setup_logger
@@ -13,6 +14,9 @@ from utils.logger import setup_logger
 class EmailServiceImpl(EmailService):
     """
     Implementation of the EmailService for handling all email sending operations.
+
+    Emails are queued in the Redis outbox and sent by its background workers (see
+    `core.email_outbox`), so `send_*` methods return without waiting for SMTP.
     """
 
     def __init__(self, **kwargs):
@@ -29,30 +33,64 @@ class EmailServiceImpl(EmailService):
         recipients: List[str],
         template_path: str,
         template_data: Dict[str, Any],
+        secret_keys: Tuple[str, ...] = (),
     ) -> bool:
         """
-        Generic method to send emails.
+        Generic method to send emails: queues the email in the outbox and returns.
+
+        If the outbox cannot be reached, the email is sent inline instead of being lost.
 
         Args:
             subject: Email subject
             recipients: List of recipient email addresses
             template_path: Path to the HTML template
             template_data: Data to render in the template
+            secret_keys: Template data keys holding credentials, never persisted in the queue
 
         Returns:
-            bool: True if email was sent successfully, False otherwise
+            bool: True if email was queued (or sent) successfully, False otherwise
         """
+        # Add base_frontend_url to all templates by default
+        if "base_frontend_url" not in template_data:
+            template_data["base_frontend_url"] = conf.MAIL_FROM
+
         try:
-            # Add base_frontend_url to all templates by default
-            if "base_frontend_url" not in template_data:
-                template_data["base_frontend_url"] = conf.MAIL_FROM
+            message_id = await email_outbox.enqueue(
+                subject, recipients, template_path, template_data, secret_keys
+            )
+            self._logger.info(f"Email {message_id} queued for {recipients}")
+            return True
+        except Exception as e:
+            self._logger.error(f"Email outbox unavailable, sending inline: {str(e)}")
+            return await self._send_now(subject, recipients, template_path, template_data)
+
+    async def _send_now(
+        self,
+        subject: str,
+        recipients: List[str],
+        template_path: str,
+        template_data: Dict[str, Any],
+    ) -> bool:
+        """
+        Render and send an email inline (fallback when the outbox is unavailable).
+
+        Args:
+            subject: Email subject
+            recipients: List of recipient email addresses
+            template_path: Path to the HTML template
+            template_data: Data to render in the template
 
-            # Log template data for debugging
-            self._logger.info(f"Attempting to render template: {template_path}")
-            self._logger.info(f"Template data: {template_data}")
+        Returns:
+            bool: True if email was sent successfully, False otherwise
+        """
+        try:
+            # Template data holds credentials (invitation passwords): log its keys only
+            self._logger.debug(
+                "Rendering template %s with %s", template_path, sorted(template_data)
+            )
 
             # Render the HTML template
-            html_content = template_manager.render_template(
+            html_content = await template_manager.render_template_async(
                 template_path, **template_data
             )
 
@@ -99,6 +137,7 @@ class EmailServiceImpl(EmailService):
                 "phone_number": user_info["phone_number"],
                 "code_number": code_number,
             },
+            secret_keys=("code_number",),
         )
 
     async def send_reset_password_email(
@@ -126,6 +165,7 @@ class EmailServiceImpl(EmailService):
                     "password_reset": password_reset,
                     "reset_url": f"{conf.MAIL_FROM_NAME}/reset-password?token={password_reset}",
                 },
+                secret_keys=("password_reset", "reset_url"),
             )
         except Exception as e:
             self._logger.error(f"Failed to send password reset email: {str(e)}")
@@ -164,6 +204,7 @@ class EmailServiceImpl(EmailService):
                 "email": email,
                 "user_id": user_id,
             },
+            secret_keys=("password_user_invite",),
         )
 
     async def send_invitation_organization(
@@ -236,3 +277,124 @@ class EmailServiceImpl(EmailService):
             template_path="account_approved.html",
             template_data={"display_name": display_name},
         )
+
+    async def send_bulk_email(
+        self,
+        subject: str,
+        template_path: str,
+        recipients: Union[Iterable[Tuple[str, Dict[str, Any]]], AsyncIterable[Tuple[str, Dict[str, Any]]]],
+        shared_data: Optional[Dict[str, Any]] = None,
+        secret_keys: Tuple[str, ...] = (),
+    ) -> Optional[str]:
+        """
+        Send one email per recipient through the outbox, which streams the recipients into
+        the queue and sends them over the workers' pooled SMTP connections.
+
+        There is no inline fallback: sending thousands of emails within a request is what the
+        outbox avoids, so a batch that cannot be queued is reported as None. A batch that fails
+        part-way is not: its queued messages are still sent, so queuing it again would send
+        duplicates.
+
+        Args:
+            subject: Email subject
+            template_path: Path to the HTML template
+            recipients: (email, template data) pairs, consumed as a stream
+            shared_data: Template data of every recipient
+            secret_keys: Template data keys holding credentials, never persisted in the queue
+
+        Returns:
+            Optional[str]: Batch ID to follow the progress with, None if nothing was queued
+
+        Raises:
+            BatchEnqueueError: If queuing stopped after some messages were queued; carries the
+                batch ID (whose status reports the error) and the number of queued messages.
+        """
+        shared_data = {"base_frontend_url": conf.MAIL_FROM, **(shared_data or {})}
+        try:
+            batch_id = await email_outbox.enqueue_batch(
+                subject, template_path, recipients, shared_data, secret_keys
+            )
+        except BatchEnqueueError as e:
+            self._logger.error(f"Failed to queue bulk email '{template_path}': {str(e)}")
+            if e.queued:
+                raise
+            return None
+        except Exception as e:
+            self._logger.error(f"Failed to queue bulk email '{template_path}': {str(e)}")
+            return None
+        self._logger.info(f"Bulk email '{template_path}' queued as batch {batch_id}")
+        return batch_id
+
+    async def send_bulk_invitation_organization(
+        self,
+        org_name: str,
+        invitees: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    ) -> Optional[str]:
+        """
+        Send organization invitations to many users.
+
+        Args:
+            org_name: Organization name
+            invitees: Users to invite, each with "email" and "display_name"
+
+        Returns:
+            Optional[str]: Batch ID, None if nothing was queued
+        """
+        self._logger.info(f"Sending bulk organization invitation for {org_name}")
+        return await self.send_bulk_email(
+            subject=f"Invitation to join {org_name}",
+            template_path="invite_user_no_credentials.html",
+            recipients=(
+                (invitee["email"], {"display_name": invitee["display_name"]})
+                async for invitee in as_async_iterable(invitees)
+            ),
+            shared_data={"org_name": org_name},
+        )
+
+    async def send_bulk_invitation_with_password_email(
+        self,
+        org_name: str,
+        invitees: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    ) -> Optional[str]:
+        """
+        Send invitations with password to many users.
+
+        Args:
+            org_name: Organization name
+            invitees: Users to invite, each with "email", "display_name", "password_user_invite" and "user_id"
+
+        Returns:
+            Optional[str]: Batch ID, None if nothing was queued
+        """
+        self._logger.info(f"Sending bulk invitation with password for {org_name}")
+        return await self.send_bulk_email(
+            subject=f"Invitation to join {org_name}",
+            template_path="invite_user.html",
+            recipients=(
+                (
+                    invitee["email"],
+                    {
+                        "display_name": invitee["display_name"],
+                        "password_user_invite": invitee["password_user_invite"],
+                        "email": invitee["email"],
+                        "user_id": invitee["user_id"],
+                    },
+                )
+                async for invitee in as_async_iterable(invitees)
+            ),
+            shared_data={"org_name": org_name},
+            secret_keys=("password_user_invite",),
+        )
+
+    async def get_bulk_email_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress of a bulk send.
+
+        Args:
+            batch_id: Batch ID returned by a send_bulk_* method
+
+        Returns:
+            Optional[Dict[str, Any]]: Sent, failed and pending counts and the error of each
+            failed recipient, None if the batch is unknown or expired
+        """
+        return await email_outbox.get_batch_status(batch_id)
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from constants.common import AppTranslationKeys
 from repositories.base.orm_crud_base import ORMCRUDBase
+from schema.user_schema import UserRoleDepartmentPermissionDto
 from services.abstract.user_management_service import UserManagementService
 from utils.logger import handle_response
 
@@ -22,13 +23,19 @@ class UserManagementServiceImpl(UserManagementService):
         self._translation = translation
         self._orm_crud_user = orm_crud_user
 
-    async def assign_role():
+    async def assign_role(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        user: UserRoleDepartmentPermissionDto,
+    ):
         """
         Assign a role to a user.
 
         This method is a placeholder for the actual implementation of assigning roles.
         It currently raises a NotImplementedError to indicate that this functionality
-        needs to be implemented in the future.
+        needs to be implemented in the future. The role is part of the cached auth payload:
+        once the assignment is committed, call `user_role_cache.invalidate(user_id)` for the
+        assigned user (`invalidate_all` when a role's permissions change).
 
         Raises:
             NotImplementedError: Indicates that the method is not yet implemented.
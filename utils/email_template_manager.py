@@ -1,19 +1,51 @@
-import os
+import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from markupsafe import Markup
 
+from config.env import env as settings
 from utils.logger import setup_logger
 
+# Files compiled at startup (the templates directory also holds Python modules)
+TEMPLATE_EXTENSIONS = ("html", "txt")
+
 
 class EmailTemplateManager:
     """
     Manager for email templates using Jinja2.
+
+    Every template is compiled once at startup (optionally through an on-disk bytecode cache
+    shared by the workers, EMAIL_TEMPLATE_BYTECODE_CACHE_DIR), so a send only renders.
+    Fragments that do not vary per recipient are rendered once and kept in an LRU
+    (`render_fragment`, also available in templates as `{{ render_fragment("footer.html") }}`),
+    and `render_template_async` renders large templates in a worker thread instead of on the
+    event loop.
+
+    Example:
+        >>> html = await template_manager.render_template_async("verification.html", **data)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
     """
-    def __init__(self):
+    def __init__(
+        self,
+        bytecode_cache_dir: str = settings.EMAIL_TEMPLATE_BYTECODE_CACHE_DIR,
+        fragment_cache_size: int = settings.EMAIL_TEMPLATE_FRAGMENT_CACHE_SIZE,
+        thread_threshold: int = settings.EMAIL_TEMPLATE_THREAD_THRESHOLD,
+    ):
+        """
+        Args:
+            bytecode_cache_dir (str): Directory of the Jinja bytecode cache (empty = disabled).
+            fragment_cache_size (int): Rendered fragments kept by `render_fragment`.
+            thread_threshold (int): Source size (bytes) from which `render_template_async`
+                renders in a worker thread.
+        """
         self._logger = setup_logger()
-        
+        self._thread_threshold = thread_threshold
+
         # Try multiple possible template locations
         possible_paths = [
             # Standard path resolution
@@ -23,51 +55,133 @@ class EmailTemplateManager:
             # Go up one directory (for different module structures)
             Path.cwd().parent / "templates"
         ]
-        
+
         template_dir = None
-        
+
         # Find the first valid template directory
         for path in possible_paths:
             if path.exists() and path.is_dir():
                 template_dir = path
                 self._logger.info(f"Found template directory at: {template_dir}")
                 break
-        
+
         if not template_dir:
             self._logger.error("No template directory found in any of the expected locations")
             # Last resort: just use "templates" and let Jinja handle errors
             template_dir = Path("templates")
-        
-        # Create Jinja2 environment
+
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+        # Create Jinja2 environment; templates are only re-checked on disk while developing
         self.env = Environment(
             loader=FileSystemLoader(template_dir),
-            autoescape=True
+            autoescape=True,
+            auto_reload=settings.ENV in ["local", "dev"],
+            bytecode_cache=bytecode_cache,
         )
-        
-        # List available templates for debugging
+        self.env.globals["render_fragment"] = self.render_fragment
+
+        self._templates: Dict[str, Template] = {}
+        # Template name -> source size in bytes
+        self._sizes: Dict[str, int] = {}
+        self._render_fragment_cached = lru_cache(maxsize=fragment_cache_size)(self._render_fragment)
+        self.precompile()
+
+    def precompile(self) -> None:
+        """Compile every template of the templates directory (logging, not raising, failures)."""
         try:
-            available_templates = self.env.list_templates()
-            self._logger.info(f"Available templates: {available_templates}")
+            template_names = self.env.list_templates(extensions=TEMPLATE_EXTENSIONS)
         except Exception as e:
             self._logger.error(f"Could not list available templates: {str(e)}")
+            return
+
+        for template_name in template_names:
+            try:
+                self._load(template_name)
+            except Exception as e:
+                self._logger.error(f"Could not compile template '{template_name}': {str(e)}")
+        self._logger.info(f"Precompiled templates: {sorted(self._templates)}")
 
     def render_template(self, template_name: str, **context: Any) -> str:
         """
         Render a template with given context.
-        
+
         Args:
             template_name: The name of the template file (relative to templates directory)
             **context: Variables to pass to the template
-            
+
         Returns:
             str: The rendered HTML template
         """
         try:
-            template = self.env.get_template(template_name)
-            return template.render(**context)
+            return self._get_template(template_name).render(**context)
         except Exception as e:
             self._logger.error(f"Error rendering template '{template_name}': {str(e)}")
             raise
 
+    async def render_template_async(self, template_name: str, **context: Any) -> str:
+        """
+        Render a template with given context, in a worker thread if its source is larger than
+        EMAIL_TEMPLATE_THREAD_THRESHOLD (small templates render faster than a thread hop).
+
+        Args:
+            template_name: The name of the template file (relative to templates directory)
+            **context: Variables to pass to the template
+
+        Returns:
+            str: The rendered HTML template
+        """
+        self._get_template(template_name)
+        if self._sizes.get(template_name, 0) < self._thread_threshold:
+            return self.render_template(template_name, **context)
+        return await asyncio.to_thread(self.render_template, template_name, **context)
+
+    def render_fragment(self, template_name: str, **context: Any) -> Markup:
+        """
+        Render a fragment that does not vary per recipient (header, footer, ...), once per
+        distinct context. The context values must be hashable; otherwise the fragment is
+        rendered without caching.
+
+        Args:
+            template_name: The name of the template file (relative to templates directory)
+            **context: Variables to pass to the template
+
+        Returns:
+            Markup: The rendered HTML, safe to embed in another template
+        """
+        key = tuple(sorted(context.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return Markup(self.render_template(template_name, **context))
+        return self._render_fragment_cached(template_name, key)
+
+    def clear_cache(self) -> None:
+        """Forget compiled templates and rendered fragments (they are loaded again on use)."""
+        self._templates.clear()
+        self._sizes.clear()
+        self._render_fragment_cached.cache_clear()
+        if self.env.cache is not None:
+            self.env.cache.clear()
+
+    def _render_fragment(self, template_name: str, key: Tuple[Tuple[str, Any], ...]) -> Markup:
+        return Markup(self.render_template(template_name, **dict(key)))
+
+    def _get_template(self, template_name: str) -> Template:
+        template: Optional[Template] = self._templates.get(template_name)
+        if template is None or (self.env.auto_reload and not template.is_up_to_date):
+            template = self._load(template_name)
+        return template
+
+    def _load(self, template_name: str) -> Template:
+        template = self.env.get_template(template_name)
+        source, _, _ = self.env.loader.get_source(self.env, template_name)
+        self._sizes[template_name] = len(source.encode("utf-8"))
+        self._templates[template_name] = template
+        return template
+
 # Create a singleton instance
-template_manager = EmailTemplateManager()
\ No newline at end of file
+template_manager = EmailTemplateManager()
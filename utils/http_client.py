@@ -4,26 +4,237 @@ import sys
 # Add the project root directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Any, Dict
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import HTTPException
+from fastapi import HTTPException, status
+from config.env import env
 from utils.logger import setup_logger
+from utils.request_timing import span
 
 logger = setup_logger()
 
+# Methods that can be replayed safely after the request may have reached the server
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
 
+# Upstream statuses worth retrying (throttling / transient gateway errors)
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
 
-async def get(
-    url: str, params: Dict[str, Any] = None, headers: Dict[str, Any] = None
-) -> Dict[str, Any]:
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls fail fast
+    for `reset_timeout` seconds. Then a single trial call is let through (half-open):
+    success closes the circuit, failure opens it again. A trial that never reports back
+    expires after another `reset_timeout`, and a new trial is let through.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = env.HTTP_CLIENT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = env.HTTP_CLIENT_BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # Let exactly one trial call through (opened_at then marks the trial start)
+            self.state = CIRCUIT_HALF_OPEN
+            self.opened_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+
+    def release_trial(self) -> None:
+        """Give back the half-open trial slot of a call that ended without an outcome (cancelled)."""
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.state = CIRCUIT_OPEN
+            # The next call may be the new trial right away
+            self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+
+class HTTPClient:
+    """
+    Shared outbound HTTP client: one pooled `httpx.AsyncClient` (keep-alive, optional
+    HTTP/2) for the whole process, jittered exponential retries and a circuit breaker per host.
+
+    The client is opened/closed by the application lifespan; it is also created lazily on
+    first use so scripts can call the helpers without a lifespan.
+
+    Example:
+        >>> data = await http_client.request("GET", "https://graph.facebook.com/me", params=params)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(
+        self,
+        max_retries: int = env.HTTP_CLIENT_MAX_RETRIES,
+        backoff_base: float = env.HTTP_CLIENT_BACKOFF_BASE,
+        backoff_max: float = env.HTTP_CLIENT_BACKOFF_MAX,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[httpx.AsyncClient] = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=env.HTTP_CLIENT_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=env.HTTP_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=env.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=env.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    env.HTTP_CLIENT_TIMEOUT, connect=env.HTTP_CLIENT_CONNECT_TIMEOUT
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Open the shared connection pool."""
+        self.client
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker()
+        return breaker
+
+    def get_breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Return the circuit state of every host contacted so far."""
+        return {
+            host: {"state": breaker.state, "failures": breaker.failures}
+            for host, breaker in self._breakers.items()
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the shared pool.
+
+        Connection failures are retried for every method (the request never reached the
+        server); timeouts and retryable statuses only for idempotent methods.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            **kwargs: Passed to `httpx.AsyncClient.request` (params, json, headers, ...).
+
+        Returns:
+            httpx.Response: Final response, with `raise_for_status` already applied.
+
+        Raises:
+            HTTPException: 503 if the circuit of the host is open.
+            httpx.HTTPStatusError: On a non-success final response.
+            httpx.RequestError: On a transport failure after the last retry.
+        """
+        method = method.upper()
+        host = httpx.URL(url).host
+        with span(f"http.{host}"):
+            return await self._request(method, url, host, **kwargs)
+
+    async def _request(self, method: str, url: str, host: str, **kwargs: Any) -> httpx.Response:
+        breaker = self.get_breaker(host)
+        idempotent = method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                logger.warning(f"Circuit open for host {host}, failing fast")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Upstream {host} is unavailable",
+                )
+
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.RequestError as e:
+                breaker.record_failure()
+                retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) or (
+                    idempotent and isinstance(e, httpx.TransportError)
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise
+            except asyncio.CancelledError:
+                # Aborted by our side (client disconnect, timeout): says nothing about the host
+                breaker.release_trial()
+                raise
+            except BaseException:
+                # Failed unexpectedly: no outcome was recorded, count it as a failure so a
+                # half-open trial cannot leave the circuit stuck
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500 and response.status_code != 429:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or not idempotent
+                    or attempt >= self.max_retries
+                ):
+                    response.raise_for_status()
+                    return response
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            logger.info(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+
+# Create a singleton instance
+http_client = HTTPClient()
+
+
+async def _send(method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
     try:
-        async with httpx.AsyncClient() as client:
-            full_url = httpx.URL(url).copy_with(params=params)
-            logger.info(f"Making GET request to: {full_url}")
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await http_client.request(method, url, **kwargs)
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP Status Error for URL {e.request.url}: {str(e)}")
         raise HTTPException(status_code=e.response.status_code, detail=str(e))
@@ -32,61 +243,40 @@ async def get(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def get(
+    url: str, params: Dict[str, Any] = None, headers: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    full_url = httpx.URL(url).copy_with(params=params)
+    logger.info(f"Making GET request to: {full_url}")
+    return await _send("GET", url, params=params, headers=headers)
+
+
 async def post(
     url: str, data: Dict[str, Any] = None, headers: Dict[str, Any] = None
 ) -> Dict[str, Any]:
-    try:
-        async with httpx.AsyncClient() as client:
-            full_url = httpx.URL(url)
-            logger.info(f"Making POST request to: {full_url}")
-            logger.info(f"Data: {data}")
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP Status Error for URL {e.request.url}: {str(e)}")
-        raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except httpx.RequestError as e:
-        logger.error(f"Request Error for URL {url}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Making POST request to: {httpx.URL(url)}")
+    logger.info(f"Data: {data}")
+    return await _send("POST", url, json=data, headers=headers)
 
 
 async def put(
     url: str, data: Dict[str, Any] = None, headers: Dict[str, Any] = None
 ) -> Dict[str, Any]:
-    try:
-        async with httpx.AsyncClient() as client:
-            full_url = httpx.URL(url)
-            logger.info(f"Making PUT request to: {full_url}")
-            response = await client.put(url, json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP Status Error for URL {e.request.url}: {str(e)}")
-        raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except httpx.RequestError as e:
-        logger.error(f"Request Error for URL {url}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Making PUT request to: {httpx.URL(url)}")
+    return await _send("PUT", url, json=data, headers=headers)
 
 
 async def delete(url: str, headers: Dict[str, Any] = None) -> Dict[str, Any]:
-    try:
-        async with httpx.AsyncClient() as client:
-            full_url = httpx.URL(url)
-            logger.info(f"Making DELETE request to: {full_url}")
-            response = await client.delete(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP Status Error for URL {e.request.url}: {str(e)}")
-        raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except httpx.RequestError as e:
-        logger.error(f"Request Error for URL {url}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Making DELETE request to: {httpx.URL(url)}")
+    return await _send("DELETE", url, headers=headers)
 
 
-import asyncio
-
 if __name__ == "__main__":
-    response = asyncio.run(get(url="http://127.0.0.1:8001/api/v1/health", headers=None, params=None))
-    print(response)
\ No newline at end of file
+
+    async def main():
+        try:
+            return await get(url="http://127.0.0.1:8001/api/v1/health", headers=None, params=None)
+        finally:
+            await http_client.aclose()
+
+    print(asyncio.run(main()))
@@ -1,10 +1,23 @@
-import json
+import atexit
+import copy
 import logging
-import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 import colorlog
 from fastapi.responses import JSONResponse
 
+from config.env import env
+from utils import serializer
+
+LOGGER_NAME = __name__
+
+# Writer thread of the logging pipeline, started by the first `setup_logger` call
+_listener: Optional[QueueListener] = None
+
 
 class UTF8JSONFormatter(logging.Formatter):
     """
@@ -26,20 +39,132 @@ class UTF8JSONFormatter(logging.Formatter):
     """
     def format(self, record):
         if isinstance(record.msg, dict):
-            record.msg = json.dumps(record.msg, ensure_ascii=False)
-        elif isinstance(record.msg, str):
+            record.msg = serializer.dumps_str(record.msg)
+        elif isinstance(record.msg, str) and record.msg[:1] in ("{", "["):
+            # Only strings that can be JSON objects/arrays are worth a parse attempt
             try:
-                json_msg = json.loads(record.msg)
-                record.msg = json.dumps(json_msg, ensure_ascii=False, indent=2)
-            except json.JSONDecodeError:
+                record.msg = serializer.dumps_str(serializer.loads(record.msg), indent=True)
+            except ValueError:
                 pass
         return super().format(record)
 
 
+class JSONLineFormatter(logging.Formatter):
+    """
+    Compact one-line JSON log format for production (one object per line, no pretty-printing
+    and no attempt to parse string messages as JSON).
+
+    Dict messages are embedded as objects; `extra` fields listed in `EXTRA_FIELDS` are kept.
+
+    Example:
+        >>> logger.info({"event": "slow_query", "duration_ms": 250})
+        {"ts":"2024-01-01T00:00:00.000+00:00","level":"INFO","logger":"utils.logger","module":"query_monitor","func":"...","line":42,"msg":{"event":"slow_query","duration_ms":250}}
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    EXTRA_FIELDS = ("request_id", "user_id", "path")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "msg": record.msg if isinstance(record.msg, dict) else record.getMessage(),
+        }
+        for field in self.EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return serializer.dumps_str(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a `rate` share of INFO and DEBUG records (WARNING and above always pass).
+
+    A record logged with `extra={"sample": False}` is never sampled out.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING or not getattr(record, "sample", True):
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without ever waiting: a full queue drops the record
+    (counted in `dropped`) instead of stalling the event loop behind a slow stream.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike `QueueHandler.prepare`, do not format here (formatting happens in the writer
+        # thread); only resolve what cannot cross threads: args and the live traceback
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JSONLineFormatter()
+    return colorlog.ColoredFormatter(
+        "%(log_color)s%(levelname)s:%(name)s:%(pathname)s:"
+        "%(funcName)s:%(lineno)d:%(message)s",
+        log_colors={
+            "DEBUG": "cyan",
+            "INFO": "green",
+            "WARNING": "yellow",
+            "ERROR": "red",
+            "CRITICAL": "red,bg_white",
+        },
+    )
+
+
 def setup_logger() -> logging.Logger:
     """
     Set up and configure a logger that only outputs to the console (no file logging).
 
+    Callers only pay for putting the record on a queue: a `QueueListener` thread formats it
+    (colorized, or compact JSON lines with LOG_FORMAT=json) and writes it to the console.
+    The level comes from LOG_LEVEL (DEBUG in local/dev, INFO elsewhere) and INFO/DEBUG lines
+    are sampled with LOG_INFO_SAMPLE_RATE.
+
     Returns:
         logging.Logger: Configured logger instance.
 
@@ -50,31 +175,37 @@ def setup_logger() -> logging.Logger:
     Author:
         tranvanphuc.dev.it.2002@gmail.com
     """
-    logger = colorlog.getLogger(__name__)
+    global _listener
+    logger = colorlog.getLogger(LOGGER_NAME)
 
     if not logger.handlers:
-        # Console handler for colored logs
+        # Console handler, fed by the queue from the writer thread
         console_handler = colorlog.StreamHandler()
-        console_handler.setFormatter(
-            colorlog.ColoredFormatter(
-                "%(log_color)s%(levelname)s:%(name)s:%(pathname)s:"
-                "%(funcName)s:%(lineno)d:%(message)s",
-                log_colors={
-                    "DEBUG": "cyan",
-                    "INFO": "green",
-                    "WARNING": "yellow",
-                    "ERROR": "red",
-                    "CRITICAL": "red,bg_white",
-                },
-            )
-        )
-        logger.addHandler(console_handler)
-
-        logger.setLevel(logging.DEBUG)
+        console_handler.setFormatter(_build_formatter(env.LOG_FORMAT))
+
+        log_queue: queue.Queue = queue.Queue(maxsize=env.LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(env.LOG_INFO_SAMPLE_RATE))
+        logger.addHandler(queue_handler)
+
+        logger.setLevel(env.LOG_LEVEL)
+
+        _listener = QueueListener(log_queue, console_handler)
+        _listener.start()
+        # Write the records still queued when the process exits
+        atexit.register(stop_logging)
 
     return logger
 
 
+def stop_logging() -> None:
+    """Flush the queued records and stop the writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+
+
 def handle_response(
     message: str, status_code: int = 400
 ) -> JSONResponse:
@@ -9,6 +9,9 @@ async def common_filter_parameters(
     include: str = None,
     join: str = "{}",
     orderBy: str = None,
+    cursor: str = None,
+    pagination: str = "offset",
+    count: str = "exact",
 ):
     if join:
         join_ = convert_filter_to_camel_case(join)
@@ -38,6 +41,9 @@ async def common_filter_parameters(
         "include": include,
         "order_by": orderBy,
         "join": join_,
+        "cursor": cursor,
+        "pagination": pagination,
+        "count": count,
     }
 
 async def common_filter_parameters_and_actions(
@@ -48,6 +54,9 @@ async def common_filter_parameters_and_actions(
     join: str = "{}",
     orderBy: str = None,
     action: str = "",
+    cursor: str = None,
+    pagination: str = "offset",
+    count: str = "exact",
 ):
     if join:
         join_ = convert_filter_to_camel_case(join)
@@ -78,6 +87,9 @@ async def common_filter_parameters_and_actions(
         "order_by": orderBy,
         "join": join_,
         "action": action,
+        "cursor": cursor,
+        "pagination": pagination,
+        "count": count,
     }
 
 async def common_filter_parameters_with_id(
@@ -88,6 +100,9 @@ async def common_filter_parameters_with_id(
     join: str = "{}",
     orderBy: str = None,
     id: str = "",
+    cursor: str = None,
+    pagination: str = "offset",
+    count: str = "exact",
 ):
     if join:
         join_ = convert_filter_to_camel_case(join)
@@ -118,6 +133,9 @@ async def common_filter_parameters_with_id(
         "order_by": orderBy,
         "join": join_,
         "id": id,
+        "cursor": cursor,
+        "pagination": pagination,
+        "count": count,
     }
 
 async def search_pagination(page: int = 1, limit: int = 100, keyword: str = ""):
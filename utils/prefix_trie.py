@@ -0,0 +1,46 @@
+from typing import Dict, Iterable
+
+# Marks a node at which a registered prefix ends
+_TERMINAL = "\0"
+
+
+class PrefixTrie:
+    """
+    Character trie answering "does this string start with any registered prefix?"
+    in O(len(string)), independently of how many prefixes are registered.
+
+    Example:
+        >>> public_routes = PrefixTrie(["/docs", "/api/v1/health"])
+        >>> public_routes.match("/docs/oauth2-redirect")
+        True
+        >>> public_routes.match("/api/v1/users")
+        False
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self, prefixes: Iterable[str] = ()):
+        self._root: Dict[str, dict] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        """Register a prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = {}
+
+    def match(self, value: str) -> bool:
+        """Return True if `value` starts with any registered prefix."""
+        node = self._root
+        if _TERMINAL in node:
+            return True
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                return True
+        return False
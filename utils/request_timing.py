@@ -0,0 +1,179 @@
+import functools
+import inspect
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Most expensive spans sent in `Server-Timing` (the header stays small on chatty requests)
+MAX_SERVER_TIMING_ENTRIES = 20
+
+# Characters not allowed in a Server-Timing metric name (an HTTP token)
+_NON_TOKEN = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+
+class RequestTiming:
+    """
+    Time spent per span name within one `request_timing` block: total seconds and calls.
+
+    Spans may nest (a repository method inside an auth dependency), so the totals can add
+    up to more than the elapsed time.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Span name -> [total seconds, calls]
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [duration, 1]
+        else:
+            entry[0] += duration
+            entry[1] += 1
+
+    def elapsed(self) -> float:
+        """Seconds since the block started."""
+        return time.perf_counter() - self.start
+
+    def server_timing(self, max_entries: int = MAX_SERVER_TIMING_ENTRIES) -> str:
+        """
+        `Server-Timing` header value: the elapsed time as `total`, then the most expensive spans.
+
+        Example:
+            >>> timing.server_timing()
+            'total;dur=12.4, auth.current_user;dur=3.1;desc="1x", db.ORMCRUDUser.get;dur=2.2;desc="2x"'
+        """
+        entries = [f"total;dur={self.elapsed() * 1000:.1f}"]
+        spans = sorted(self.spans.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (duration, calls) in spans[:max_entries]:
+            entries.append(f'{_NON_TOKEN.sub("_", name)};dur={duration * 1000:.1f};desc="{calls}x"')
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Elapsed time and spans in milliseconds, most expensive first (for the timing log)."""
+        spans = sorted(self.spans.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "duration_ms": round(self.elapsed() * 1000, 2),
+            "spans": {
+                name: {"duration_ms": round(duration * 1000, 2), "calls": calls}
+                for name, (duration, calls) in spans
+            },
+        }
+
+
+# Timing of the current request, set by `request_timing` (None = not timing)
+_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def get_request_timing() -> Optional[RequestTiming]:
+    """Timing of the current `request_timing` block, or None."""
+    return _request_timing.get()
+
+
+@contextmanager
+def request_timing() -> Iterator[RequestTiming]:
+    """
+    Collect the spans of the block (one HTTP request in `RequestTimingMiddleware`).
+
+    Example:
+        >>> with request_timing() as timing:
+        ...     await orm_crud_user.get(db, user_id)
+        >>> timing.server_timing()
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    timing = RequestTiming()
+    token = _request_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _request_timing.reset(token)
+
+
+class _Span:
+    __slots__ = ("timing", "name", "start")
+
+    def __init__(self, timing: RequestTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timing.add(self.name, time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str) -> Any:
+    """
+    Time the block under `name` in the current request.
+
+    Outside a `request_timing` block (timing disabled, background tasks) this is one context
+    variable lookup and a shared no-op context manager.
+
+    Example:
+        >>> with span("auth.session"):
+        ...     await session_activity.validate_and_touch(user_id)
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    timing = _request_timing.get()
+    return _NO_SPAN if timing is None else _Span(timing, name)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a coroutine function under `name` (see `span`).
+
+    Example:
+        >>> @timed("auth.decode_token")
+        ... async def decode_token(token: str) -> Dict[str, Any]: ...
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timing = _request_timing.get()
+            if timing is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timing.add(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def time_methods(cls: type, prefix: str) -> type:
+    """Wrap the public coroutine methods of `cls` with `timed(f"{prefix}.{method}")`."""
+    for name, attribute in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(attribute):
+            setattr(cls, name, timed(f"{prefix}.{name}")(attribute))
+    return cls
@@ -0,0 +1,144 @@
+import decimal
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Optional
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types neither backend encodes natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Serializer(ABC):
+    """
+    JSON serializer interface shared by HTTP responses, cache values and logs.
+
+    Implementations must encode `UUID`, `datetime`/`date`/`time`, `Enum`, `Decimal`,
+    sets and pydantic models without a pre-walk of the value.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    @abstractmethod
+    def dumps(self, obj: Any, *, indent: bool = False) -> bytes:
+        """Encode `obj` to UTF-8 JSON bytes (2-space indented if `indent`)."""
+        pass
+
+    @abstractmethod
+    def loads(self, data: Any) -> Any:
+        """Decode JSON from `bytes` or `str`."""
+        pass
+
+    def dumps_str(self, obj: Any, *, indent: bool = False) -> str:
+        """Encode `obj` to a JSON string."""
+        return self.dumps(obj, indent=indent).decode("utf-8")
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Default serializer backed by `orjson` (UUID, datetime and dataclasses are native).
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    # Non-string dict keys are stringified like the stdlib json module does
+    OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, *, indent: bool = False) -> bytes:
+        options = self.OPTIONS | orjson.OPT_INDENT_2 if indent else self.OPTIONS
+        return orjson.dumps(obj, default=_default, option=options)
+
+    def loads(self, data: Any) -> Any:
+        return orjson.loads(data)
+
+
+class StdlibJSONSerializer(Serializer):
+    """
+    Serializer backed by the standard `json` module (slower, no extra dependency).
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    @staticmethod
+    def _std_default(obj: Any) -> Any:
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if isinstance(obj, Enum):
+            return obj.value
+        return _default(obj)
+
+    def dumps(self, obj: Any, *, indent: bool = False) -> bytes:
+        return json.dumps(
+            obj,
+            default=self._std_default,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        ).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        return json.loads(data)
+
+
+_serializer: Serializer = OrjsonSerializer()
+
+
+def get_serializer() -> Serializer:
+    """Return the serializer currently in use."""
+    return _serializer
+
+
+def set_serializer(serializer: Serializer) -> None:
+    """
+    Replace the process-wide serializer (responses, cache values and logs).
+
+    Example:
+        >>> set_serializer(StdlibJSONSerializer())
+    """
+    global _serializer
+    _serializer = serializer
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    return _serializer.dumps(obj, indent=indent)
+
+
+def dumps_str(obj: Any, *, indent: bool = False) -> str:
+    return _serializer.dumps_str(obj, indent=indent)
+
+
+def loads(data: Any) -> Any:
+    return _serializer.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the application: renders with the configured serializer
+    (orjson by default) instead of the stdlib `json` module.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    def render(self, content: Optional[Any]) -> bytes:
+        return dumps(content)
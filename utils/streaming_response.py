@@ -0,0 +1,126 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from utils import serializer
+
+# Flush the response buffer once it grows past this many bytes
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def _to_dict(obj: Any, schema: Optional[Type[BaseModel]]) -> Dict[str, Any]:
+    """Serialize an ORM object (or dict) to a JSON-compatible dictionary."""
+    if schema is not None:
+        return schema.model_validate(obj).model_dump(mode="json")
+    if isinstance(obj, dict):
+        return jsonable_encoder(obj)
+    return jsonable_encoder(
+        {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+    )
+
+
+async def _buffered(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Coalesce small chunks so the server is not asked to send one row at a time."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= STREAM_BUFFER_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_streaming_response(
+    rows: AsyncIterator[Any],
+    schema: Optional[Type[BaseModel]] = None,
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Build a newline-delimited JSON `StreamingResponse` from an async iterator of rows.
+
+    The iterator is consumed after the endpoint returns, so it must own its database
+    session (open it inside the generator) rather than rely on one closed by the endpoint.
+
+    Args:
+        rows (AsyncIterator[Any]): ORM objects or dictionaries, e.g. from `ORMCRUDBase.stream_multi`.
+        schema (Type[BaseModel], optional): Response schema used to serialize each row.
+        filename (str, optional): If set, the response is sent as an attachment.
+
+    Returns:
+        StreamingResponse: `application/x-ndjson` response.
+
+    Example:
+        >>> async def rows():
+        ...     async with session_factory() as db:
+        ...         async for user in orm_crud_user.stream_multi(db, filter_param):
+        ...             yield user
+        >>> return ndjson_streaming_response(rows(), UserResponseSchema, "users.ndjson")
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+
+    async def encode() -> AsyncIterator[bytes]:
+        async for row in rows:
+            yield serializer.dumps(_to_dict(row, schema)) + b"\n"
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(
+        _buffered(encode()), media_type="application/x-ndjson", headers=headers
+    )
+
+
+def csv_streaming_response(
+    rows: AsyncIterator[Any],
+    schema: Optional[Type[BaseModel]] = None,
+    columns: Optional[Sequence[str]] = None,
+    filename: str = "export.csv",
+) -> StreamingResponse:
+    """
+    Build a CSV `StreamingResponse` from an async iterator of rows.
+
+    Args:
+        rows (AsyncIterator[Any]): ORM objects or dictionaries, e.g. from `ORMCRUDBase.stream_multi`.
+        schema (Type[BaseModel], optional): Response schema used to serialize each row.
+        columns (Sequence[str], optional): Columns to export, in order. Defaults to the
+            schema fields, or the keys of the first row.
+        filename (str, optional): Attachment filename. Defaults to "export.csv".
+
+    Returns:
+        StreamingResponse: `text/csv` attachment response.
+
+    Author:
+        tranvanphuc.dev.it.2002@gmail.com
+    """
+    header: List[str] = list(columns or (schema.model_fields.keys() if schema else []))
+
+    async def encode() -> AsyncIterator[bytes]:
+        nonlocal header
+        output = io.StringIO()
+        writer = csv.writer(output)
+        header_written = False
+        async for row in rows:
+            data = _to_dict(row, schema)
+            if not header:
+                header = list(data.keys())
+            if not header_written:
+                writer.writerow(header)
+                header_written = True
+            writer.writerow([data.get(column) for column in header])
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate(0)
+        if not header_written and header:
+            writer.writerow(header)
+            yield output.getvalue().encode()
+
+    return StreamingResponse(
+        _buffered(encode()),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )